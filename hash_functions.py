@@ -0,0 +1,209 @@
+# Course: CS261 - Data Structures
+# Assignment: 6
+# Description: A registry of hash functions that can be selected by name
+#              when constructing either HashMap, plus a report comparing
+#              how well each one spreads a sample of keys over a table.
+#              Includes a basic test suite that runs when file is run as
+#              a script. Depends on a6_include.py.
+
+
+import time
+import zlib
+from functools import wraps
+from hashlib import blake2b
+from itertools import permutations
+
+from a6_include import hash_function_1, hash_function_2
+
+
+# Registered functions return non-negative hashes below 2 ** 63
+HASH_MASK = (1 << 63) - 1
+
+_FNV_OFFSET = 0xcbf29ce484222325
+_FNV_PRIME = 0x100000001b3
+_UINT64_MASK = (1 << 64) - 1
+
+
+def builtin_hash(key: str) -> int:
+    """
+    Python's builtin hash. Fastest of the registered functions, but
+    string hashes are randomized per process (see PYTHONHASHSEED), so
+    it must not be used for anything saved to disk.
+    """
+    return hash(key) & HASH_MASK
+
+
+def make_blake2b_hash(seed: int = 0) -> callable:
+    """
+    :param seed: Integer keying the BLAKE2b digest, so independent
+                 functions can be derived from different seeds
+
+    :return: A hash function returning the first 8 bytes of the keyed
+             BLAKE2b digest of the UTF-8 encoded key
+    """
+    seedBytes = seed.to_bytes(8, 'little')
+
+    def blake2b_hash(key: str) -> int:
+        digest = blake2b(key.encode(), digest_size=8, key=seedBytes).digest()
+        return int.from_bytes(digest, 'little') & HASH_MASK
+
+    return blake2b_hash
+
+
+def fnv1a_hash(key: str) -> int:
+    """64 bit FNV-1a over the UTF-8 encoded key."""
+    hash = _FNV_OFFSET
+    for byte in key.encode():
+        hash = ((hash ^ byte) * _FNV_PRIME) & _UINT64_MASK
+    return hash & HASH_MASK
+
+
+def crc32_hash(key: str) -> int:
+    """CRC-32 of the UTF-8 encoded key, computed in C by zlib."""
+    return zlib.crc32(key.encode())
+
+
+def mix_hash(hash: int) -> int:
+    """
+    MurmurHash3 64 bit finalizer. Spreads every input bit over the low
+    bits of the result, which is what a power of two table indexes by.
+    """
+    hash &= _UINT64_MASK
+    hash = ((hash ^ (hash >> 33)) * 0xff51afd7ed558ccd) & _UINT64_MASK
+    hash = ((hash ^ (hash >> 33)) * 0xc4ceb9fe1a85ec53) & _UINT64_MASK
+    return (hash ^ (hash >> 33)) & HASH_MASK
+
+
+def with_mixing(function: callable) -> callable:
+    """
+    :return: A hash function applying mix_hash to the output of
+             function. The original is available as __wrapped__.
+    """
+    @wraps(function)
+    def mixed(key: str) -> int:
+        return mix_hash(function(key))
+
+    return mixed
+
+
+HASH_FUNCTIONS = {
+    'hash_function_1': hash_function_1,
+    'hash_function_2': hash_function_2,
+    'builtin': builtin_hash,
+    'blake2b': make_blake2b_hash(),
+    'fnv1a': fnv1a_hash,
+    'crc32': crc32_hash,
+}
+
+# Functions whose output differs between processes
+UNSTABLE_HASH_FUNCTIONS = {'builtin'}
+
+
+def register_hash_function(name: str, function: callable,
+                           stable: bool = True) -> None:
+    """
+    Adds function to the registry under name, replacing any function
+    already registered with that name.
+
+    :param stable: False if the function returns different hashes in
+                   different processes
+
+    :return: None
+    """
+    HASH_FUNCTIONS[name] = function
+
+    if stable:
+        UNSTABLE_HASH_FUNCTIONS.discard(name)
+    else:
+        UNSTABLE_HASH_FUNCTIONS.add(name)
+
+
+def get_hash_function(function) -> callable:
+    """
+    :param function: A registered function name, or a callable that is
+                     returned unchanged
+
+    :return: The hash function
+    """
+    if callable(function):
+        return function
+
+    if function not in HASH_FUNCTIONS:
+        raise ValueError(f"Unknown hash function {function!r}, expected "
+                         f"one of {sorted(HASH_FUNCTIONS)}")
+
+    return HASH_FUNCTIONS[function]
+
+
+def hash_function_name(function: callable) -> str:
+    """
+    :return: The name function is registered under, or None if it is
+             not registered
+    """
+    for name, registered in HASH_FUNCTIONS.items():
+        if registered is function:
+            return name
+
+    return None
+
+
+def collision_report(keys: list, capacity: int, names: list = None) -> list:
+    """
+    Compares registered hash functions on a sample of keys.
+
+    :param keys: A list of distinct string keys
+    :param capacity: Number of buckets the keys are spread over
+    :param names: Registered function names to compare, defaulting to all
+
+    :return: A list with one dictionary per function, holding the number
+             of distinct full hashes, the number of keys that share a
+             bucket with an earlier key, the longest chain, the chi-square
+             statistic of the bucket counts against a uniform spread and
+             the mean time per hash in nanoseconds
+    """
+    report = []
+    expected = len(keys) / capacity
+
+    for name in names or list(HASH_FUNCTIONS):
+        function = HASH_FUNCTIONS[name]
+
+        start = time.perf_counter()
+        hashes = [function(key) for key in keys]
+        elapsed = time.perf_counter() - start
+
+        counts = [0] * capacity
+        for hash in hashes:
+            counts[hash % capacity] += 1
+
+        chiSquare = sum((count - expected) ** 2 for count in counts)
+        report.append({
+            'name': name,
+            'distinct_hashes': len(set(hashes)),
+            'bucket_collisions': len(keys) - (capacity - counts.count(0)),
+            'max_chain': max(counts),
+            'chi_square': chiSquare / expected if expected else 0.0,
+            'ns_per_hash': elapsed / max(len(keys), 1) * 1e9,
+        })
+
+    return report
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+if __name__ == "__main__":
+
+    samples = (
+        ('sequential', ['str' + str(i) for i in range(10000)]),
+        ('anagrams', [''.join(p) for p in permutations('abcdefg')]),
+    )
+
+    for title, keys in samples:
+        print(f"\nCollision report - {title} "
+              f"({len(keys)} keys, 20011 buckets)")
+        print("-" * 64)
+        for row in collision_report(keys, 20011):
+            print(f"{row['name']:<16} distinct={row['distinct_hashes']:<6} "
+                  f"collisions={row['bucket_collisions']:<6} "
+                  f"max_chain={row['max_chain']:<5} "
+                  f"chi2={row['chi_square']:<10.0f} "
+                  f"{row['ns_per_hash']:.0f} ns")
@@ -0,0 +1,461 @@
+# Course: CS261 - Data Structures
+# Assignment: 6
+# Description: A thread-safe variant of the chaining hash map in
+#              hash_map_sc.py. Writers lock only the stripe of buckets
+#              they change, readers take no locks, and a resize locks
+#              every stripe before swapping in the new table. Includes a
+#              basic test suite that runs when file is run as a script.
+#              Depends on hash_map_sc.py and a6_include.py.
+
+
+import threading
+
+from a6_include import DynamicArray, LinkedList, hash_function_1
+from hash_map_sc import HashMap
+
+
+class ConcurrentHashMap(HashMap):
+    """
+    Represents a chaining hash map that may be shared between threads.
+
+    The buckets are split into stripes of consecutive bucket ranges,
+    each guarded by its own lock, so writers to different stripes never
+    wait on each other. get and contains_key take no lock: they read the
+    (buckets, capacity) pair once and walk the chain, which is safe
+    because writers only ever replace a chain's head or a node's next
+    or value reference, each a single assignment. A resize takes every
+    lock, builds a new table and swaps the pair in one assignment, so a
+    reader sees either the whole old table or the whole new one.
+    Iteration is weakly consistent: it walks one table and may or may
+    not reflect writes made while it runs. Stats are recorded without a
+    lock, so records of operations running at the same time may be lost.
+    """
+    # Lock-free readers rely on LinkedList updates, so chains are never
+    # converted to SortedChains
+    _treeify_chains = False
+
+    # Lock-free readers do not consult a Bloom filter
+    _supports_bloom = False
+
+    def __init__(self,
+                 capacity: int = 11,
+                 function: callable = hash_function_1,
+                 grow_load: float = 1.0,
+                 shrink_load: float = None,
+                 capacity_policy: str = 'prime',
+                 stripes: int = 16) -> None:
+        """
+        Initialize new HashMap that uses separate chaining for collision
+        resolution and stripes locks for writers
+
+        :param stripes: Number of locks the buckets are divided between
+        """
+        super().__init__(capacity, function, grow_load, shrink_load,
+                         capacity_policy)
+        self._locks = [threading.Lock() for _ in range(stripes)]
+
+        # Keys held by each stripe, so writers never share a counter
+        self._counts = [0] * stripes
+
+        # Readers take the bucket array and capacity from one reference
+        self._table = (self._buckets, self._capacity)
+
+    def _lock_bucket(self, keyHash: int) -> tuple:
+        """
+        Acquires the lock of the stripe holding the bucket for keyHash,
+        retrying if a resize swaps the table first. The caller must
+        release self._locks[stripe].
+
+        :return: A tuple of the bucket's chain and its stripe
+        """
+        stripes = len(self._locks)
+
+        while True:
+            table = self._table
+            buckets, cap = table
+            pos = keyHash % cap
+            stripe = pos * stripes // cap
+            lock = self._locks[stripe]
+            lock.acquire()
+
+            if self._table is table:
+                return buckets[pos], stripe
+
+            lock.release()
+
+    def _acquire_all(self) -> None:
+        """
+        Acquires every stripe lock, always in the same order.
+
+        :return: None
+        """
+        for lock in self._locks:
+            lock.acquire()
+
+    def _release_all(self) -> None:
+        """
+        Releases every stripe lock.
+
+        :return: None
+        """
+        for lock in reversed(self._locks):
+            lock.release()
+
+    def _recount(self) -> None:
+        """
+        Recomputes the key count of every stripe. Requires all locks.
+
+        :return: None
+        """
+        stripes = len(self._locks)
+        buckets, cap = self._table
+        counts = [0] * stripes
+
+        for pos in range(cap):
+            counts[pos * stripes // cap] += buckets[pos].length()
+
+        self._counts = counts
+
+    def get_size(self) -> int:
+        """
+        Return size of map. While other threads are writing, this is the
+        size at some moment during the call.
+        """
+        return sum(self._counts)
+
+    def put(self, key: str, value: object) -> None:
+        """
+        Adds a new SLNode class object to the hash map with data
+        members key and value. If the key already exists in the
+        hash map, the value is updated. Only the key's stripe is
+        locked.
+
+        :param key: A string representing a hash key
+        :param value: Any object with implementations for comparison
+                      operators and string representation.
+
+        :return: None
+        """
+        keyHash = self._hash_function(key)
+        chain, stripe = self._lock_bucket(keyHash)
+
+        try:
+            if self._stats is not None:
+                self._stats.record('put', chain.length())
+
+            node = chain.contains(key, keyHash)
+
+            if node is not None:
+                node.value = value
+                return
+
+            chain.insert(key, value, keyHash)
+            self._counts[stripe] += 1
+            self._version += 1
+        finally:
+            self._locks[stripe].release()
+
+        self._grow_if_loaded()
+
+    def increment(self, key: str, amount: int = 1) -> int:
+        """
+        Adds amount to the value associated with key, treating a missing
+        key as 0. Holds the key's stripe lock throughout, so concurrent
+        increments of the same key are never lost.
+
+        :return: The new value
+        """
+        keyHash = self._hash_function(key)
+        chain, stripe = self._lock_bucket(keyHash)
+
+        try:
+            if self._stats is not None:
+                self._stats.record('increment', chain.length())
+
+            node = chain.contains(key, keyHash)
+
+            if node is not None:
+                node.value += amount
+                return node.value
+
+            chain.insert(key, amount, keyHash)
+            self._counts[stripe] += 1
+            self._version += 1
+        finally:
+            self._locks[stripe].release()
+
+        self._grow_if_loaded()
+        return amount
+
+    def _grow_if_loaded(self) -> None:
+        """
+        Doubles the table if the load factor is above grow_load. Checks
+        again once all locks are held, since another thread may have
+        resized in the meantime.
+
+        :return: None
+        """
+        if self._grow_load is None or \
+                self.get_size() <= self._grow_load * self._table[1]:
+            return
+
+        self._acquire_all()
+        try:
+            if self.get_size() > self._grow_load * self._capacity:
+                self._rebuild(2 * self._capacity)
+        finally:
+            self._release_all()
+
+    def _shrink_if_sparse(self) -> None:
+        """
+        Halves the table if the load factor has dropped below
+        shrink_load, keeping at least the initial capacity.
+
+        :return: None
+        """
+        if self._shrink_load is None:
+            return
+
+        def sparse() -> bool:
+            cap = self._table[1]
+            return cap > self._min_capacity and \
+                self.get_size() < self._shrink_load * cap
+
+        if not sparse():
+            return
+
+        self._acquire_all()
+        try:
+            if sparse():
+                self._rebuild(max(self._capacity // 2, self._min_capacity))
+        finally:
+            self._release_all()
+
+    def _rebuild(self, new_capacity: int) -> None:
+        """
+        Resizes the table and publishes the new (buckets, capacity)
+        pair. Requires all locks.
+
+        :return: None
+        """
+        super().resize_table(new_capacity)
+        self._table = (self._buckets, self._capacity)
+        self._recount()
+
+    def resize_table(self, new_capacity: int) -> None:
+        """
+        Resizes the hash table to the next smallest prime number (or
+        power of two) >= new_capacity, holding every stripe lock. Does
+        nothing if new_capacity is < 1.
+
+        :param new_capacity: An integer >= 1 representing the minimum
+                             new hash table size.
+
+        :return: None
+        """
+        self._acquire_all()
+        try:
+            self._rebuild(new_capacity)
+        finally:
+            self._release_all()
+
+    def get(self, key: str) -> object:
+        """
+        Gets the value associated with key in the hash map without
+        taking a lock.
+
+        :param key: A string representing a hash key
+
+        :return: The object representing the value associated with the key
+                 if the key exists in the hash map.
+                 None otherwise.
+        """
+        buckets, cap = self._table
+        keyHash = self._hash_function(key)
+        chain = buckets[keyHash % cap]
+
+        if self._stats is not None:
+            self._stats.record('get', chain.length())
+
+        node = chain.contains(key, keyHash)
+
+        if node is None:
+            return None
+
+        return node.value
+
+    def contains_key(self, key: str) -> bool:
+        """
+        Determines if key is present in the hash map without taking a
+        lock.
+
+        :param key: A string representing a hash key
+
+        :return: True if the key is in the hash map
+                 False otherwise
+        """
+        buckets, cap = self._table
+        keyHash = self._hash_function(key)
+        chain = buckets[keyHash % cap]
+
+        if self._stats is not None:
+            self._stats.record('contains_key', chain.length())
+
+        return chain.contains(key, keyHash) is not None
+
+    def remove(self, key: str) -> None:
+        """
+        Removes the node with key as its key data member from the
+        hash map. Does nothing if the key is not in the hash map. Only
+        the key's stripe is locked.
+
+        :param key: A string representing a hash key
+
+        :return: None
+        """
+        keyHash = self._hash_function(key)
+        chain, stripe = self._lock_bucket(keyHash)
+
+        try:
+            if self._stats is not None:
+                self._stats.record('remove', chain.length())
+
+            removed = chain.remove(key, keyHash)
+
+            if removed:
+                self._counts[stripe] -= 1
+                self._version += 1
+        finally:
+            self._locks[stripe].release()
+
+        if removed:
+            self._shrink_if_sparse()
+
+    def clear(self) -> None:
+        """
+        Clears the contents of the hash map, holding every stripe lock.
+
+        :return: None
+        """
+        self._acquire_all()
+        try:
+            buckets, cap = self._table
+
+            for pos in range(cap):
+                if buckets[pos].length() != 0:
+                    buckets[pos] = LinkedList()
+
+            self._counts = [0] * len(self._locks)
+            self._version += 1
+        finally:
+            self._release_all()
+
+    def empty_buckets(self) -> int:
+        """
+        :return empty: Integer representing the number of empty
+                       buckets in the hash table.
+        """
+        buckets, cap = self._table
+        return sum(1 for pos in range(cap) if buckets[pos].length() == 0)
+
+    def _nodes(self):
+        """
+        Generates every node of the current table. Unlike the other
+        hash maps this never raises for concurrent changes; nodes added
+        or removed while it runs may or may not be generated.
+        """
+        buckets, cap = self._table
+
+        for pos in range(cap):
+            yield from buckets[pos]
+
+    def get_keys_and_values(self) -> DynamicArray:
+        """
+        Creates a DynamicArray containing tuples of all key/value
+        pairs in the hash map.
+
+        :return elements: A DynamicArray as described above.
+        """
+        return DynamicArray(list(self.items()))
+
+    def put_many(self, pairs) -> None:
+        """
+        Adds every key/value pair in pairs with put, so that each insert
+        locks only its own stripe.
+
+        :param pairs: An iterable of (key, value) tuples
+
+        :return: None
+        """
+        for key, value in pairs:
+            self.put(key, value)
+
+    def get_many(self, keys) -> list:
+        """
+        :param keys: An iterable of string keys
+
+        :return: A list holding, for each key in order, its value or None
+                 if the key is not in the hash map
+        """
+        return [self.get(key) for key in keys]
+
+    def remove_many(self, keys) -> None:
+        """
+        Removes each key in keys that is present in the hash map.
+
+        :param keys: An iterable of string keys
+
+        :return: None
+        """
+        for key in keys:
+            self.remove(key)
+
+    def dump(self, path: str) -> None:
+        """
+        Writes the hash map to a snapshot file at path, holding every
+        stripe lock.
+
+        :return: None
+        """
+        self._acquire_all()
+        try:
+            super().dump(path)
+        finally:
+            self._release_all()
+
+    @classmethod
+    def load(cls, path: str, **kwargs) -> "ConcurrentHashMap":
+        """
+        Restores a hash map written by dump.
+
+        :param kwargs: Other constructor arguments, such as stripes
+
+        :return: The restored hash map
+        """
+        hashMap = super().load(path, **kwargs)
+        hashMap._recount()
+        return hashMap
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+if __name__ == "__main__":
+
+    print("\nConcurrentHashMap - threaded put example 1")
+    print("------------------------------------------")
+    m = ConcurrentHashMap(11, hash_function_1, stripes=8)
+
+    def worker(start: int) -> None:
+        for i in range(start, 4000, 4):
+            m.put('str' + str(i), i)
+        for i in range(start, 4000, 8):
+            m.remove('str' + str(i))
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    print(m.get_size(), m.get_capacity(), round(m.table_load(), 2))
+    print(m.get('str1'), m.get('str0'), m.contains_key('str3999'))
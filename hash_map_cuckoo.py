@@ -0,0 +1,495 @@
+# Course: CS261 - Data Structures
+# Assignment: 6
+# Description: A cuckoo hashing variant of the open addressing hash map in
+#              hash_map_oa.py. Every key has one candidate bucket in each
+#              of two tables, plus a small stash for keys that fit in
+#              neither, so lookups take a constant number of probes in
+#              the worst case. Includes a basic test suite that runs when
+#              file is run as a script. Depends on hash_map_oa.py,
+#              hash_functions.py, snapshot.py and a6_include.py.
+
+
+import time
+from array import array
+
+from a6_include import (DynamicArray, HashEntry,
+                        hash_function_1, hash_function_2)
+from hash_functions import make_blake2b_hash
+from hash_map_oa import HashMap, linear_probe
+from snapshot import OPEN_ADDRESSING, read_snapshot, write_snapshot
+
+
+# Evictions tried before an entry is sent to the stash
+MAX_KICKS = 32
+
+
+class CuckooHashMap(HashMap):
+    """
+    Represents a hash map that uses two-table cuckoo hashing with a
+    stash. The buckets are split into two tables of equal size. A key
+    can only be in one bucket of each table or in the stash, which
+    holds at most stash_size entries, so a lookup checks two buckets
+    and the stash at most, whatever the load or the keys. An insert
+    finding both buckets taken evicts the occupant to its other bucket,
+    and so on, until a bucket is free or MAX_KICKS evictions have been
+    made, when the entry left over goes to the stash. If the stash is
+    full, the tables are rebuilt with a new seed, and doubled if that
+    fails too.
+
+    Cuckoo hashing needs two independent hashes that can be redrawn
+    when placement fails; a weak function such as hash_function_1,
+    which gives many keys the same full hash, would make every rebuild
+    fail and the tables grow without bound. Both buckets therefore come
+    from a seeded BLAKE2b hash of the key, cached in each entry: the
+    first table is indexed by its low bits and the second by its high
+    bits. The function argument is accepted for a common interface
+    with the other maps, but is not used.
+    """
+    # A lookup checks at most two buckets and the stash anyway
+    _supports_bloom = False
+
+    def __init__(self,
+                 capacity: int,
+                 function,
+                 max_load: float = 0.45,
+                 stash_size: int = 4,
+                 capacity_policy: str = 'prime') -> None:
+        """
+        Initialize new HashMap that uses cuckoo hashing for collision
+        resolution
+
+        :param capacity: Total number of buckets of both tables
+        :param max_load: Load factor (0 < max_load < 0.5) that triggers
+                         doubling of the tables on insert.
+        :param stash_size: Maximum number of entries kept outside the
+                           tables
+        """
+        super().__init__(capacity, function, None, linear_probe,
+                         capacity_policy)
+        self._max_load = max_load
+        self._stash_size = stash_size
+        self._seed = 0
+        self._seeded_hash = make_blake2b_hash(self._seed)
+        self._allocate(capacity)
+
+    def __str__(self) -> str:
+        """Override string method to provide more readable output."""
+        return super().__str__() + 'stash: ' + \
+            ', '.join(str(elem) for elem in self._stash) + '\n'
+
+    def _allocate(self, capacity: int) -> None:
+        """
+        Replaces the tables with two empty tables of the smallest size
+        allowed by the capacity policy that together hold at least
+        capacity buckets, and empties the stash.
+
+        :return: None
+        """
+        half = self._next_capacity((capacity + 1) // 2)
+        self._half = half
+        self._capacity = 2 * half
+        self._buckets = DynamicArray([None] * self._capacity)
+        self._stash = []
+
+    def _find(self, key: str, keyHash: int, op: str) -> int:
+        """
+        Checks the key's bucket in the first table, then in the second,
+        then the stash.
+
+        :param keyHash: The seeded hash of key
+
+        :return: Address of the entry with key, or -1 if the key is not
+                 in the hash map. Addresses from capacity on refer to the
+                 stash.
+        """
+        buckets, half = self._buckets, self._half
+        address = keyHash % half
+        elem = buckets[address]
+        probes = 1
+
+        if elem is None or elem.hash != keyHash or elem.key != key:
+            address = half + (keyHash >> 32) % half
+            elem = buckets[address]
+            probes = 2
+
+            if elem is None or elem.hash != keyHash or elem.key != key:
+                address = -1
+
+                for index, elem in enumerate(self._stash):
+                    probes += 1
+
+                    if elem.hash == keyHash and elem.key == key:
+                        address = self._capacity + index
+                        break
+
+        if self._stats is not None:
+            self._stats.record(op, probes)
+
+        return address
+
+    def _entry_at(self, address: int) -> HashEntry:
+        """
+        :return: The entry at an address returned by _find
+        """
+        if address < self._capacity:
+            return self._buckets[address]
+
+        return self._stash[address - self._capacity]
+
+    def _insert(self, entry: HashEntry) -> HashEntry:
+        """
+        Places a new entry in its bucket of either table, evicting
+        occupants to their other bucket if both are taken, or else in
+        the stash. Does not update the size.
+
+        :return: None, or the entry left without a place when the stash
+                 is full
+        """
+        buckets, half = self._buckets, self._half
+        address = entry.hash % half
+
+        if buckets[address] is None:
+            buckets[address] = entry
+            return None
+
+        other = half + (entry.hash >> 32) % half
+
+        if buckets[other] is None:
+            buckets[other] = entry
+            return None
+
+        for _ in range(MAX_KICKS):
+            evicted = buckets[address]
+            buckets[address] = entry
+            entry = evicted
+
+            # Send the evicted entry to its bucket in the other table
+            if address < half:
+                address = half + (entry.hash >> 32) % half
+            else:
+                address = entry.hash % half
+
+            if buckets[address] is None:
+                buckets[address] = entry
+                return None
+
+        if len(self._stash) < self._stash_size:
+            self._stash.append(entry)
+            return None
+
+        return entry
+
+    def _rebuild(self, capacity: int, homeless: HashEntry = None) -> None:
+        """
+        Moves every entry, and homeless if given, into new tables of at
+        least capacity buckets. Whenever an entry finds no place, every
+        key is hashed again with a new seed and placed again, doubling
+        the capacity from the second retry on.
+
+        :return: None
+        """
+        entries = [elem for elem in self._buckets if elem is not None]
+        entries += self._stash
+
+        if homeless is not None:
+            entries.append(homeless)
+
+        retries = 0
+
+        while True:
+            self._allocate(capacity)
+
+            if all(self._insert(entry) is None for entry in entries):
+                break
+
+            retries += 1
+            if retries > 1:
+                capacity = 2 * self._capacity
+
+            self._seed += 1
+            self._seeded_hash = make_blake2b_hash(self._seed)
+            for entry in entries:
+                entry.hash = self._seeded_hash(entry.key)
+
+        self._version += 1
+
+    def _drain_stash(self) -> None:
+        """
+        Moves stash entries into any of their buckets that are free.
+
+        :return: None
+        """
+        buckets, half = self._buckets, self._half
+
+        for entry in list(self._stash):
+            for address in (entry.hash % half,
+                            half + (entry.hash >> 32) % half):
+                if buckets[address] is None:
+                    buckets[address] = entry
+                    self._stash.remove(entry)
+                    break
+
+    def put(self, key: str, value: object) -> None:
+        """
+        Adds key/value pair to the hash map. If the key already exists
+        in the hash map, the value is updated.
+
+        :param key: A string representing a hash key
+        :param value: Any object with implementations for comparison
+                      operators and string representation.
+
+        :return: None
+        """
+        keyHash = self._seeded_hash(key)
+        address = self._find(key, keyHash, 'put')
+
+        if address >= 0:
+            self._entry_at(address).value = value
+            return
+
+        if (self._size + 1) / self._capacity > self._max_load:
+            self.resize_table(2 * self._capacity)
+
+        homeless = self._insert(HashEntry(key, value, keyHash))
+        self._size += 1
+        self._version += 1
+
+        if homeless is not None:
+            self._rebuild(self._capacity, homeless)
+
+    def resize_table(self, new_capacity: int) -> None:
+        """
+        Resizes the tables to hold at least new_capacity buckets in
+        total, keeping the load factor <= max_load. Entries are placed
+        by their cached hashes, so keys are not rehashed unless a new
+        seed has to be drawn. Does nothing if
+        new_capacity is < current number of elements.
+
+        :param new_capacity: An integer >= 1 representing the minimum
+                             new hash table size.
+
+        :return: None
+        """
+        if new_capacity < self._size:
+            return
+
+        if self._stats is not None:
+            start = time.perf_counter()
+
+        self._rebuild(max(new_capacity, int(self._size / self._max_load) + 1))
+
+        if self._stats is not None:
+            self._stats.record_resize(time.perf_counter() - start)
+
+    def get(self, key: str) -> object:
+        """
+        Gets the value associated with key in the hash map.
+
+        :param key: A string representing a hash key
+
+        :return: The object representing the value associated with the key
+                 if the key exists in the hash map.
+                 None otherwise.
+        """
+        if self._size == 0:
+            return None
+
+        address = self._find(key, self._seeded_hash(key), 'get')
+
+        if address < 0:
+            return None
+
+        return self._entry_at(address).value
+
+    def contains_key(self, key: str) -> bool:
+        """
+        Determines if key is present in the hash map.
+
+        :param key: A string representing a hash key
+
+        :return: True if the key is in the hash map
+                 False otherwise
+        """
+        if self._size == 0:
+            return False
+
+        return self._find(key, self._seeded_hash(key), 'contains_key') >= 0
+
+    def remove(self, key: str) -> None:
+        """
+        Removes the entry with key from the hash map. A bucket freed in
+        the tables is offered to the stash. Does nothing if the key is
+        not in the hash map.
+
+        :param key: A string representing a hash key
+
+        :return: None
+        """
+        if self._size == 0:
+            return
+
+        address = self._find(key, self._seeded_hash(key), 'remove')
+
+        if address < 0:
+            return
+
+        if address < self._capacity:
+            self._buckets[address] = None
+            if self._stash:
+                self._drain_stash()
+        else:
+            del self._stash[address - self._capacity]
+
+        self._size -= 1
+        self._version += 1
+
+    def clear(self) -> None:
+        """
+        Clears the contents of the hash map.
+
+        :return: None
+        """
+        if self._size != 0:
+            self._allocate(self._capacity)
+            self._size = 0
+            self._version += 1
+
+    def get_stats(self) -> dict:
+        """
+        :return: The open addressing map's stats, plus the number of
+                 entries in the stash
+        """
+        stats = super().get_stats()
+        stats['stash'] = len(self._stash)
+        return stats
+
+    def get_keys_and_values(self) -> DynamicArray:
+        """
+        Creates a DynamicArray containing tuples of all key/value
+        pairs in the hash map.
+
+        :return elements: A DynamicArray as described above.
+        """
+        return DynamicArray(list(self.items()))
+
+    def _entries(self):
+        """
+        Generates every entry of the tables, then of the stash. Raises
+        RuntimeError if the hash map gains or loses keys, or is
+        resized, while the generator is in use.
+        """
+        version = self._version
+
+        for elem in list(self._buckets) + self._stash:
+            if elem is not None:
+                yield elem
+
+                if self._version != version:
+                    raise RuntimeError("HashMap changed during iteration")
+
+    def put_many(self, pairs) -> None:
+        """
+        Adds every key/value pair in pairs, as calling put for each one
+        in order would, resizing at most once for the whole batch.
+
+        :param pairs: An iterable of (key, value) tuples
+
+        :return: None
+        """
+        pairs = pairs if isinstance(pairs, list) else list(pairs)
+        needed = self._size + len(pairs)
+
+        if needed / self._capacity > self._max_load:
+            self.resize_table(int(needed / self._max_load) + 1)
+
+        for key, value in pairs:
+            self.put(key, value)
+
+    def get_many(self, keys) -> list:
+        """
+        :param keys: An iterable of string keys
+
+        :return: A list holding, for each key in order, its value or None
+                 if the key is not in the hash map
+        """
+        return [self.get(key) for key in keys]
+
+    def remove_many(self, keys) -> None:
+        """
+        Removes each key in keys that is present in the hash map.
+
+        :param keys: An iterable of string keys
+
+        :return: None
+        """
+        for key in keys:
+            self.remove(key)
+
+    def dump(self, path: str) -> None:
+        """
+        Writes every entry to a snapshot file at path. Keys are placed
+        by the seeded BLAKE2b hash, whatever function the map was given,
+        so the snapshot names 'blake2b' and any function can be dumped.
+        Bucket positions and hashes depend on the map's seed, so they
+        are recorded but not reused: load puts every key again.
+
+        :param path: Path of the file to write
+
+        :return: None
+        """
+        positions, hashes = array('q'), array('q')
+        keys, values = [], []
+
+        for address, elem in enumerate(list(self._buckets) + self._stash):
+            if elem is not None:
+                positions.append(address)
+                hashes.append(elem.hash)
+                keys.append(elem.key)
+                values.append(elem.value)
+
+        write_snapshot(path, OPEN_ADDRESSING, self._capacity_policy,
+                       self._capacity, 'blake2b', '', positions, hashes,
+                       keys, values)
+
+    @classmethod
+    def load(cls, path: str, **kwargs) -> "CuckooHashMap":
+        """
+        Restores a hash map from a snapshot written by dump, or by any
+        open addressing map, by putting every key again.
+
+        :param path: Path of the snapshot file
+        :param kwargs: Other constructor arguments, such as stash_size
+
+        :return: The restored hash map
+        """
+        snapshot = read_snapshot(path, OPEN_ADDRESSING)
+        hashMap = cls(snapshot['capacity'], snapshot['function'],
+                      capacity_policy=snapshot['policy'], **kwargs)
+
+        keys = [key for key in snapshot['keys'] if key is not None]
+        hashMap.put_many(zip(keys, snapshot['values']))
+        return hashMap
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+if __name__ == "__main__":
+
+    print("\nCuckoo - put example 1")
+    print("----------------------")
+    m = CuckooHashMap(53, hash_function_1)
+    for i in range(150):
+        m.put('str' + str(i), i * 100)
+        if i % 25 == 24:
+            print(m.empty_buckets(), round(m.table_load(), 2), m.get_size(), m.get_capacity())
+
+    print("\nCuckoo - remove example 1")
+    print("-------------------------")
+    m = CuckooHashMap(11, hash_function_2)
+    for i in range(1, 10):
+        m.put(str(i), i * 10)
+    for i in range(1, 10, 2):
+        m.remove(str(i))
+    print(m.get_size(), m.get_capacity(), m.get_stats()['stash'])
+    print(m.get_keys_and_values())
+    print(all(m.contains_key(str(i)) == (i % 2 == 0) for i in range(1, 10)))
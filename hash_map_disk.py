@@ -0,0 +1,577 @@
+# Course: CS261 - Data Structures
+# Assignment: 6
+# Description: A persistent variant of the open addressing hash map in
+#              hash_map_oa.py. The bucket array is a memory-mapped file of
+#              fixed-width slots and keys and values live in an
+#              append-only heap file, so opening an existing table only
+#              reads its header and lookups only page in the buckets they
+#              touch. Includes a basic test suite that runs when file is
+#              run as a script. Depends on hash_map_oa.py,
+#              hash_functions.py and a6_include.py.
+
+
+import mmap
+import os
+import pickle
+import struct
+import time
+
+from a6_include import DynamicArray
+from hash_functions import (HASH_MASK, UNSTABLE_HASH_FUNCTIONS,
+                            get_hash_function, hash_function_name)
+from hash_map_oa import HashMap, quadratic_probe
+
+
+# Bucket states
+EMPTY = 0
+FULL = 1
+DELETED = 2
+
+# Slot file: header, then one fixed-width slot per bucket
+_MAGIC = b'HMDISK01'
+
+# Magic, capacity, size, tombstones, hash function name
+_HEADER = struct.Struct('<8sQQQ32s')
+
+# Hash, key offset, value offset, state
+_SLOT = struct.Struct('<qQQB7x')
+_STATE_OFFSET = 24
+
+# Heap file: records of a 4 byte length followed by the data
+_LENGTH = struct.Struct('<I')
+
+
+class DiskHashMap(HashMap):
+    """
+    Represents an open addressing hash map stored in two files. The
+    file at path holds a header and the bucket array as fixed-width
+    slots (cached hash, key offset, value offset, state) and is
+    memory-mapped. The file at path + '.heap' is an append-only heap
+    of UTF-8 keys and pickled values. Updating or removing a key leaves
+    its old records in the heap. Probing, tombstone reuse and
+    compaction follow hash_map_oa.HashMap.
+    """
+    # Lookups search the mapped slots, not a Bloom filter
+    _supports_bloom = False
+
+    def __init__(self,
+                 path: str,
+                 capacity: int = 11,
+                 function='blake2b',
+                 tombstone_ratio: float = 0.25) -> None:
+        """
+        Open the table stored at path, or create it if path does not
+        exist. capacity and function only apply to new tables.
+
+        :param function: Name of a registered hash function, or a
+                         registered function. It must return the same
+                         hashes in every process.
+        """
+        self._init_state(function, tombstone_ratio, quadratic_probe, 'prime')
+
+        if os.path.exists(path):
+            self._open(path)
+        else:
+            name = function if isinstance(function, str) \
+                else hash_function_name(function)
+
+            if name is None or name in UNSTABLE_HASH_FUNCTIONS:
+                raise ValueError("DiskHashMap needs a registered hash "
+                                 "function that is stable across processes")
+
+            self._create(path, self._next_prime(capacity), name)
+
+    def _create(self, path: str, capacity: int, name: str) -> None:
+        """
+        Creates empty slot and heap files for a table of given capacity.
+
+        :return: None
+        """
+        self._write_slot_file(path, capacity)
+
+        with open(path, 'r+b') as slotFile:
+            slotFile.write(_HEADER.pack(_MAGIC, capacity, 0, 0,
+                                        name.encode()))
+
+        open(path + '.heap', 'wb').close()
+        self._open(path)
+
+    @staticmethod
+    def _write_slot_file(path: str, capacity: int) -> None:
+        """
+        Creates a slot file of given capacity in which every bucket is
+        EMPTY. The file is extended with truncate, so the operating
+        system supplies the zeroed pages lazily.
+
+        :return: None
+        """
+        with open(path, 'wb') as slotFile:
+            slotFile.truncate(_HEADER.size + capacity * _SLOT.size)
+
+    def _open(self, path: str) -> None:
+        """
+        Maps the slot file at path and opens its heap, reading only the
+        header.
+
+        :return: None
+        """
+        self._path = path
+        self._file = open(path, 'r+b')
+        self._map = mmap.mmap(self._file.fileno(), 0)
+
+        magic, capacity, size, tombstones, name = \
+            _HEADER.unpack_from(self._map, 0)
+
+        if magic != _MAGIC:
+            raise ValueError(f"{path} is not a DiskHashMap file")
+
+        self._capacity = capacity
+        self._size = size
+        self._tombstones = tombstones
+        self._function_name = name.rstrip(b'\0').decode()
+        self._hash_function = get_hash_function(self._function_name)
+
+        # Unbuffered appends are immediately visible to os.pread
+        self._heap = open(path + '.heap', 'a+b', buffering=0)
+        self._heap_end = os.fstat(self._heap.fileno()).st_size
+
+    def _write_header(self) -> None:
+        """
+        Stores the current capacity, size and tombstone count.
+
+        :return: None
+        """
+        _HEADER.pack_into(self._map, 0, _MAGIC, self._capacity, self._size,
+                          self._tombstones, self._function_name.encode())
+
+    def flush(self) -> None:
+        """
+        Writes all changes to disk.
+
+        :return: None
+        """
+        self._map.flush()
+        os.fsync(self._heap.fileno())
+
+    def close(self) -> None:
+        """
+        Flushes and closes the table's files.
+
+        :return: None
+        """
+        self.flush()
+        self._map.close()
+        self._file.close()
+        self._heap.close()
+
+    def __enter__(self) -> "DiskHashMap":
+        """Return the map for use in a with statement."""
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        """Close the map at the end of a with statement."""
+        self.close()
+
+    def __str__(self) -> str:
+        """Override string method to provide more readable output."""
+        out = ''
+        for i in range(self._capacity):
+            keyHash, keyOffset, valueOffset, state = self._slot(i)
+
+            if state == EMPTY:
+                out += str(i) + ': None\n'
+            else:
+                out += f"{i}: K: {self._read(keyOffset).decode()} " \
+                       f"V: {pickle.loads(self._read(valueOffset))} " \
+                       f"TS: {state == DELETED}\n"
+        return out
+
+    def _slot(self, address: int) -> tuple:
+        """
+        :return: The (hash, key offset, value offset, state) tuple
+                 stored at address
+        """
+        return _SLOT.unpack_from(self._map,
+                                 _HEADER.size + address * _SLOT.size)
+
+    def _set_slot(self, address: int, keyHash: int, keyOffset: int,
+                  valueOffset: int, state: int) -> None:
+        """
+        Overwrites the slot at address.
+
+        :return: None
+        """
+        _SLOT.pack_into(self._map, _HEADER.size + address * _SLOT.size,
+                        keyHash, keyOffset, valueOffset, state)
+
+    def _append(self, data: bytes) -> int:
+        """
+        Appends a record holding data to the heap.
+
+        :return: Offset of the record
+        """
+        offset = self._heap_end
+        self._heap.write(_LENGTH.pack(len(data)) + data)
+        self._heap_end += _LENGTH.size + len(data)
+        return offset
+
+    def _read(self, offset: int) -> bytes:
+        """
+        :return: The data of the heap record at offset
+        """
+        fd = self._heap.fileno()
+        length = _LENGTH.unpack(os.pread(fd, _LENGTH.size, offset))[0]
+        return os.pread(fd, length, offset + _LENGTH.size)
+
+    def _find(self, key: str, keyHash: int, op: str = None) -> tuple:
+        """
+        Probes for key, remembering the first tombstone on the way.
+        Records the number of buckets probed under op, if given.
+
+        :return: A tuple of the address holding key (or -1) and the
+                 address a new key should be written to
+        """
+        cap = self._capacity
+        hashPos = keyHash % cap
+        address = hashPos
+        offset = 0
+        reuse = -1
+        encoded = None
+        found = -1
+
+        while offset < cap:
+            slotHash, keyOffset, _, state = self._slot(address)
+
+            if state == EMPTY:
+                free = address if reuse < 0 else reuse
+                break
+
+            if state == DELETED:
+                if reuse < 0:
+                    reuse = address
+            elif slotHash == keyHash:
+                if encoded is None:
+                    encoded = key.encode()
+                if self._read(keyOffset) == encoded:
+                    found, free = address, reuse
+                    break
+
+            offset += 1
+            address = self._probe(hashPos, offset, cap)
+        else:
+            free = reuse
+
+        if op is not None and self._stats is not None:
+            self._stats.record(op, offset + 1)
+
+        return found, free
+
+    def put(self, key: str, value: object) -> None:
+        """
+        Adds key/value pair to the hash map. If the key already exists
+        in the hash map, the value is updated by appending the new value
+        to the heap.
+
+        :param key: A string representing a hash key
+        :param value: Any picklable object
+
+        :return: None
+        """
+        if self.table_load() >= 0.5:
+            self.resize_table(2 * self._capacity)
+        elif self._needs_compaction():
+            self._compact()
+
+        keyHash = self._hash_function(key) & HASH_MASK
+        address, free = self._find(key, keyHash, 'put')
+        valueOffset = self._append(pickle.dumps(value))
+
+        if address >= 0:
+            keyOffset = self._slot(address)[1]
+            self._set_slot(address, keyHash, keyOffset, valueOffset, FULL)
+            return
+
+        if self._slot(free)[3] == DELETED:
+            self._tombstones -= 1
+
+        keyOffset = self._append(key.encode())
+        self._set_slot(free, keyHash, keyOffset, valueOffset, FULL)
+        self._size += 1
+        self._version += 1
+        self._write_header()
+
+    def get(self, key: str) -> object:
+        """
+        Gets the value associated with key in the hash map.
+
+        :param key: A string representing a hash key
+
+        :return: The object representing the value associated with the key
+                 if the key exists in the hash map.
+                 None otherwise.
+        """
+        if self._size == 0:
+            return None
+
+        keyHash = self._hash_function(key) & HASH_MASK
+        address = self._find(key, keyHash, 'get')[0]
+
+        if address < 0:
+            return None
+
+        return pickle.loads(self._read(self._slot(address)[2]))
+
+    def contains_key(self, key: str) -> bool:
+        """
+        Determines if key is present in the hash map.
+
+        :param key: A string representing a hash key
+
+        :return: True if the key is in the hash map
+                 False otherwise
+        """
+        if self._size == 0:
+            return False
+
+        keyHash = self._hash_function(key) & HASH_MASK
+
+        return self._find(key, keyHash, 'contains_key')[0] >= 0
+
+    def remove(self, key: str) -> None:
+        """
+        Removes key from the hash map, leaving a tombstone. Does nothing
+        if the key is not in the hash map.
+
+        :param key: A string representing a hash key
+
+        :return: None
+        """
+        if self._size == 0:
+            return
+
+        keyHash = self._hash_function(key) & HASH_MASK
+        address = self._find(key, keyHash, 'remove')[0]
+
+        if address >= 0:
+            self._map[_HEADER.size + address * _SLOT.size + _STATE_OFFSET] = \
+                DELETED
+            self._size -= 1
+            self._tombstones += 1
+            self._version += 1
+            self._write_header()
+
+    def _occupancy(self) -> bytes:
+        """
+        :return: The state (EMPTY, FULL or DELETED) of every bucket
+        """
+        start = _HEADER.size + _STATE_OFFSET
+        states = memoryview(self._map)[start::_SLOT.size]
+        occupancy = states.tobytes()
+        states.release()
+        return occupancy
+
+    def empty_buckets(self) -> int:
+        """
+        :return: Integer representing the number of empty
+                 buckets in the hash table.
+        """
+        return self._occupancy().count(EMPTY)
+
+    def resize_table(self, new_capacity: int) -> None:
+        """
+        Resizes the hash table to the next smallest prime number
+        >= new_capacity that ensures a load factor <= 0.5 by writing a
+        new slot file. Heap records are reused as they are. Does nothing
+        if new_capacity is < current number of elements.
+
+        :param new_capacity: An integer >= 1 representing the minimum
+                             new hash table size.
+
+        :return: None
+        """
+        size = self._size
+
+        if new_capacity < size:
+            return
+
+        newCap = self._next_capacity(new_capacity)
+
+        while size / newCap >= 0.5:
+            newCap = self._next_capacity(2 * newCap)
+
+        if self._stats is not None:
+            start = time.perf_counter()
+
+        tempPath = self._path + '.resize'
+        self._write_slot_file(tempPath, newCap)
+
+        with open(tempPath, 'r+b') as tempFile:
+            newMap = mmap.mmap(tempFile.fileno(), 0)
+            _HEADER.pack_into(newMap, 0, _MAGIC, newCap, size, 0,
+                              self._function_name.encode())
+
+            # Keys are unique, so each slot goes to the first empty bucket
+            for pos in range(self._capacity):
+                slot = self._slot(pos)
+
+                if slot[3] != FULL:
+                    continue
+
+                hashPos = slot[0] % newCap
+                address = hashPos
+                offset = 0
+
+                while newMap[_HEADER.size + address * _SLOT.size +
+                             _STATE_OFFSET] != EMPTY:
+                    offset += 1
+                    address = self._probe(hashPos, offset, newCap)
+
+                _SLOT.pack_into(newMap, _HEADER.size + address * _SLOT.size,
+                                *slot)
+
+            newMap.flush()
+            newMap.close()
+
+        self._map.close()
+        self._file.close()
+        self._heap.close()
+        os.replace(tempPath, self._path)
+        self._open(self._path)
+        self._version += 1
+
+        if self._stats is not None:
+            self._stats.record_resize(time.perf_counter() - start)
+
+    def _next_capacity(self, capacity: int) -> int:
+        """
+        :return: The smallest prime >= given capacity
+        """
+        if self._is_prime(capacity):
+            return capacity
+
+        return self._next_prime(capacity)
+
+    def clear(self) -> None:
+        """
+        Clears the contents of the hash map, truncating its heap.
+
+        :return: None
+        """
+        capacity = self._capacity
+        self._map.close()
+        self._file.close()
+        self._heap.close()
+
+        self._create(self._path, capacity, self._function_name)
+        self._version += 1
+
+    def _addresses(self):
+        """
+        Generates the address of every live entry. Raises RuntimeError
+        if the hash map gains or loses keys, or is resized, while the
+        generator is in use.
+        """
+        version = self._version
+
+        for pos in range(self._capacity):
+            if self._slot(pos)[3] == FULL:
+                yield pos
+
+                if self._version != version:
+                    raise RuntimeError("HashMap changed during iteration")
+
+    def keys(self):
+        """Generates every key in the hash map."""
+        for pos in self._addresses():
+            yield self._read(self._slot(pos)[1]).decode()
+
+    def values(self):
+        """Generates every value in the hash map."""
+        for pos in self._addresses():
+            yield pickle.loads(self._read(self._slot(pos)[2]))
+
+    def items(self):
+        """Generates every (key, value) pair in the hash map."""
+        for pos in self._addresses():
+            _, keyOffset, valueOffset, _ = self._slot(pos)
+            yield self._read(keyOffset).decode(), \
+                pickle.loads(self._read(valueOffset))
+
+    def get_keys_and_values(self) -> DynamicArray:
+        """
+        Creates a DynamicArray containing tuples of all key/value
+        pairs in the hash map.
+
+        :return elements: A DynamicArray as described above.
+        """
+        return DynamicArray(list(self.items()))
+
+    def put_many(self, pairs) -> None:
+        """
+        Adds every key/value pair in pairs, as calling put for each one
+        in order would.
+
+        :param pairs: An iterable of (key, value) tuples
+
+        :return: None
+        """
+        for key, value in pairs:
+            self.put(key, value)
+
+    def get_many(self, keys) -> list:
+        """
+        :param keys: An iterable of string keys
+
+        :return: A list holding, for each key in order, its value or None
+                 if the key is not in the hash map
+        """
+        return [self.get(key) for key in keys]
+
+    def remove_many(self, keys) -> None:
+        """
+        Removes each key in keys that is present in the hash map.
+
+        :param keys: An iterable of string keys
+
+        :return: None
+        """
+        for key in keys:
+            self.remove(key)
+
+    def dump(self, path: str) -> None:
+        """
+        Not supported: the table already lives in its files. Use flush,
+        and open the same path again to restore it.
+        """
+        raise NotImplementedError("DiskHashMap is stored at its path; "
+                                  "flush it and open the path again")
+
+    @classmethod
+    def load(cls, path: str, **kwargs) -> "DiskHashMap":
+        """
+        Not supported: open the table's path with DiskHashMap instead.
+        """
+        raise NotImplementedError("Open a DiskHashMap by passing its path "
+                                  "to DiskHashMap")
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+if __name__ == "__main__":
+
+    import tempfile
+
+    print("\nDiskHashMap - put and reopen example 1")
+    print("--------------------------------------")
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'table.hm')
+
+        with DiskHashMap(path, 53) as m:
+            for i in range(150):
+                m.put('str' + str(i), i * 100)
+            m.remove('str0')
+            print(m.get_size(), m.get_capacity(), m.tombstone_count())
+
+        with DiskHashMap(path) as m:
+            print(m.get_size(), m.get_capacity(), m.get('str42'),
+                  m.contains_key('str0'))
@@ -0,0 +1,410 @@
+# Course: CS261 - Data Structures
+# Assignment: 6
+# Description: An open addressing hash map specialized for 64 bit integer
+#              keys. Keys, values and bucket states live in NumPy arrays,
+#              and batch operations hash and probe whole arrays of keys at
+#              once. Includes a basic test suite that runs when file is
+#              run as a script. Depends on numpy, hash_map_oa.py and
+#              a6_include.py.
+
+
+import numpy as np
+
+from a6_include import DynamicArray
+from hash_map_oa import HashMap, quadratic_probe
+
+
+# Bucket states
+EMPTY = 0
+FULL = 1
+DELETED = 2
+
+
+def mix64(keys: np.ndarray) -> np.ndarray:
+    """
+    SplitMix64 finalizer, spreading nearby integers across the
+    whole 64 bit range.
+
+    :param keys: An array of int64 keys
+
+    :return: An array of uint64 hashes
+    """
+    hashes = keys.astype(np.uint64)
+    hashes = (hashes ^ (hashes >> np.uint64(30))) * \
+        np.uint64(0xbf58476d1ce4e5b9)
+    hashes = (hashes ^ (hashes >> np.uint64(27))) * \
+        np.uint64(0x94d049bb133111eb)
+    return hashes ^ (hashes >> np.uint64(31))
+
+
+class IntHashMap(HashMap):
+    """
+    Represents an open addressing hash map with int64 keys that handles
+    collision with quadratic probing and maintains a prime number of
+    buckets, like hash_map_oa.HashMap. Keys, values and bucket states
+    (EMPTY, FULL or DELETED) are stored in NumPy arrays. The scalar
+    methods are kept for compatibility; put_many, get_many,
+    contains_many and remove_many process arrays of keys together.
+    """
+    # Lookups search the NumPy arrays, not a Bloom filter
+    _supports_bloom = False
+
+    # Keys are probed in vectorized batches, not one bucket at a time
+    _supports_stats = False
+
+    def __init__(self,
+                 capacity: int = 11,
+                 value_dtype=np.int64,
+                 tombstone_ratio: float = 0.25) -> None:
+        """
+        Initialize new HashMap for integer keys
+
+        :param value_dtype: NumPy dtype of the values, object for
+                            arbitrary Python values
+        :param tombstone_ratio: Fraction of buckets that may hold
+                                tombstones before the table is compacted
+                                in place. None disables compaction by
+                                ratio.
+        """
+        self._init_state(mix64, tombstone_ratio, quadratic_probe, 'prime')
+
+        # capacity must be a prime number
+        self._capacity = self._next_prime(capacity)
+        self._value_dtype = value_dtype
+        self._allocate(self._capacity)
+
+    def __str__(self) -> str:
+        """Override string method to provide more readable output."""
+        out = ''
+        for i in range(self._capacity):
+            if self._states[i] == EMPTY:
+                out += str(i) + ': None\n'
+            else:
+                out += f"{i}: K: {self._keys[i]} V: {self._values[i]} " \
+                       f"TS: {self._states[i] == DELETED}\n"
+        return out
+
+    def _allocate(self, capacity: int) -> None:
+        """
+        Replaces the storage arrays with empty arrays of given capacity.
+
+        :return: None
+        """
+        self._keys = np.zeros(capacity, dtype=np.int64)
+        self._values = np.zeros(capacity, dtype=self._value_dtype)
+        self._states = np.zeros(capacity, dtype=np.uint8)
+
+    def _occupancy(self) -> list:
+        """
+        :return: A list holding the state (EMPTY, FULL or DELETED) of
+                 every bucket
+        """
+        return self._states.tolist()
+
+    def _home(self, keys: np.ndarray) -> np.ndarray:
+        """
+        :return: The home bucket of each key as an int64 array
+        """
+        return (mix64(keys) % np.uint64(self._capacity)).astype(np.int64)
+
+    def _locate(self, keys: np.ndarray) -> np.ndarray:
+        """
+        Probes for all keys together, one probe offset per round,
+        dropping keys from the batch as they are found or reach an
+        empty bucket.
+
+        :param keys: An int64 array of keys
+
+        :return: An int64 array holding the address of each key, or -1
+                 for keys not in the hash map
+        """
+        cap = self._capacity
+        found = np.full(len(keys), -1, dtype=np.int64)
+        hashPos = self._home(keys)
+        active = np.arange(len(keys))
+        offset = 0
+
+        while active.size and offset < cap:
+            address = (hashPos[active] + offset * offset) % cap
+            state = self._states[address]
+            hit = (state == FULL) & (self._keys[address] == keys[active])
+            found[active[hit]] = address[hit]
+            active = active[(state != EMPTY) & ~hit]
+            offset += 1
+
+        return found
+
+    def _insert_new(self, keys: np.ndarray, values: np.ndarray) -> None:
+        """
+        Places distinct keys that are known not to be in the hash map,
+        each in the first bucket of its probe sequence that is not FULL.
+        When several keys reach the same free bucket in a round, the
+        first of them takes it and the rest keep probing.
+
+        :return: None
+        """
+        cap = self._capacity
+        hashPos = self._home(keys)
+        active = np.arange(len(keys))
+        offset = 0
+
+        while active.size:
+            address = (hashPos[active] + offset * offset) % cap
+            free = np.flatnonzero(self._states[address] != FULL)
+            slots, first = np.unique(address[free], return_index=True)
+            winners = active[free[first]]
+
+            self._tombstones -= int(np.count_nonzero(
+                self._states[slots] == DELETED))
+            self._states[slots] = FULL
+            self._keys[slots] = keys[winners]
+            self._values[slots] = values[winners]
+
+            placed = np.zeros(len(active), dtype=bool)
+            placed[free[first]] = True
+            active = active[~placed]
+            offset += 1
+
+        self._size += len(keys)
+        self._version += 1
+
+    def put_many(self, keys, values) -> None:
+        """
+        Adds each key with the value at the same position in values. If a
+        key repeats, its last value wins, as with calling put in order.
+        The table is resized at most once, up front, for the batch.
+
+        :param keys: A sequence or array of integer keys
+        :param values: A sequence or array of values, the same length as
+                       keys
+
+        :return: None
+        """
+        keys = np.asarray(keys, dtype=np.int64)
+        values = np.asarray(values, dtype=self._value_dtype)
+
+        # Keep the last occurrence of each key
+        _, lastIndex = np.unique(keys[::-1], return_index=True)
+        lastIndex = len(keys) - 1 - lastIndex
+        keys, values = keys[lastIndex], values[lastIndex]
+
+        address = self._locate(keys)
+        found = address >= 0
+        self._values[address[found]] = values[found]
+
+        newKeys, newValues = keys[~found], values[~found]
+        needed = self._size + len(newKeys)
+
+        if (needed + self._tombstones) / self._capacity >= 0.5:
+            self.resize_table(2 * needed + 1)
+        elif self._needs_compaction():
+            self._compact()
+
+        self._insert_new(newKeys, newValues)
+
+    def get_many(self, keys, default=0) -> np.ndarray:
+        """
+        Gets the values associated with each key in keys.
+
+        :param keys: A sequence or array of integer keys
+        :param default: Value returned for keys not in the hash map
+
+        :return: An array holding, for each key in order, its value or
+                 default
+        """
+        keys = np.asarray(keys, dtype=np.int64)
+        address = self._locate(keys)
+        found = address >= 0
+
+        result = np.full(len(keys), default, dtype=self._value_dtype)
+        result[found] = self._values[address[found]]
+        return result
+
+    def contains_many(self, keys) -> np.ndarray:
+        """
+        :param keys: A sequence or array of integer keys
+
+        :return: A boolean array, True where the key is in the hash map
+        """
+        return self._locate(np.asarray(keys, dtype=np.int64)) >= 0
+
+    def remove_many(self, keys) -> None:
+        """
+        Removes each key in keys that is present in the hash map.
+
+        :param keys: A sequence or array of integer keys
+
+        :return: None
+        """
+        keys = np.unique(np.asarray(keys, dtype=np.int64))
+        address = self._locate(keys)
+        address = address[address >= 0]
+
+        self._states[address] = DELETED
+        self._size -= len(address)
+        self._version += 1
+        self._tombstones += len(address)
+
+    def put(self, key: int, value: object) -> None:
+        """
+        Adds key/value pair to the hash map. If the key already exists
+        in the hash map, the value is updated.
+
+        :return: None
+        """
+        self.put_many([key], [value])
+
+    def get(self, key: int) -> object:
+        """
+        :return: The value associated with key, or None if the key is not
+                 in the hash map.
+        """
+        address = self._locate(np.array([key], dtype=np.int64))[0]
+
+        if address < 0:
+            return None
+
+        return self._values[address:address + 1].tolist()[0]
+
+    def contains_key(self, key: int) -> bool:
+        """
+        :return: True if the key is in the hash map
+                 False otherwise
+        """
+        return bool(self._locate(np.array([key], dtype=np.int64))[0] >= 0)
+
+    def remove(self, key: int) -> None:
+        """
+        Removes key from the hash map. Does nothing if the key is not in
+        the hash map.
+
+        :return: None
+        """
+        self.remove_many([key])
+
+    def empty_buckets(self) -> int:
+        """
+        :return: Integer representing the number of empty
+                 buckets in the hash table.
+        """
+        return int(np.count_nonzero(self._states == EMPTY))
+
+    def resize_table(self, new_capacity: int) -> None:
+        """
+        Resizes the hash table to the next smallest prime number
+        >= new_capacity that ensures a load factor <= 0.5. Does
+        nothing if new_capacity is < current number of elements.
+
+        :param new_capacity: An integer >= 1 representing the minimum
+                             new hash table size.
+
+        :return: None
+        """
+        size = self._size
+
+        if new_capacity < size:
+            return
+
+        # Capacity must be a prime number
+        if self._is_prime(new_capacity):
+            newCap = new_capacity
+        else:
+            newCap = self._next_prime(new_capacity)
+
+        while size / newCap >= 0.5:
+            newCap = self._next_prime(2 * newCap)
+
+        live = self._states == FULL
+        keys, values = self._keys[live], self._values[live]
+
+        self._capacity = newCap
+        self._allocate(newCap)
+        self._size = 0
+        self._version += 1
+        self._tombstones = 0
+        self._insert_new(keys, values)
+
+    def clear(self) -> None:
+        """
+        Clears the contents of the hash map.
+
+        :return: None
+        """
+        self._allocate(self._capacity)
+        self._size = 0
+        self._version += 1
+        self._tombstones = 0
+
+    def get_keys_and_values(self) -> DynamicArray:
+        """
+        Creates a DynamicArray containing tuples of all key/value
+        pairs in the hash map.
+
+        :return elements: A DynamicArray as described above.
+        """
+        live = self._states == FULL
+        return DynamicArray(list(zip(self._keys[live].tolist(),
+                                     self._values[live].tolist())))
+
+    def _addresses(self):
+        """
+        Generates the address of every live entry. Raises RuntimeError
+        if the hash map gains or loses keys, or is resized, while the
+        generator is in use.
+        """
+        version = self._version
+
+        for pos in np.flatnonzero(self._states == FULL).tolist():
+            yield pos
+
+            if self._version != version:
+                raise RuntimeError("HashMap changed during iteration")
+
+    def keys(self):
+        """Generates every key in the hash map as a Python int."""
+        for pos in self._addresses():
+            yield int(self._keys[pos])
+
+    def values(self):
+        """Generates every value in the hash map."""
+        for pos in self._addresses():
+            yield self._values[pos:pos + 1].tolist()[0]
+
+    def items(self):
+        """Generates every (key, value) pair in the hash map."""
+        for pos in self._addresses():
+            yield int(self._keys[pos]), self._values[pos:pos + 1].tolist()[0]
+
+    def dump(self, path: str) -> None:
+        """
+        Not supported: snapshots hold string keys.
+        """
+        raise NotImplementedError("IntHashMap keys are not strings, so it "
+                                  "cannot be written to a snapshot")
+
+    @classmethod
+    def load(cls, path: str, **kwargs) -> "IntHashMap":
+        """
+        Not supported: snapshots hold string keys.
+        """
+        raise NotImplementedError("IntHashMap keys are not strings, so it "
+                                  "cannot be read from a snapshot")
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+if __name__ == "__main__":
+
+    print("\nIntHashMap - put_many example 1")
+    print("-------------------------------")
+    m = IntHashMap(53)
+    keys = np.arange(0, 3000, 3)
+    m.put_many(keys, keys * 10)
+    print(m.get_size(), m.get_capacity(), round(m.table_load(), 2))
+    print(m.get_many([3, 4, 2997], default=-1))
+    print(m.contains_many([0, 1, 2, 3]))
+
+    print("\nIntHashMap - remove_many example 1")
+    print("----------------------------------")
+    m.remove_many(np.arange(0, 1500))
+    print(m.get_size(), m.tombstone_count(), m.get(1500), m.get(1497))
@@ -6,37 +6,158 @@
 # Description: A class implementation of an open addressing hash map ADT
 #              built from a dynamic array. Includes a basic test suite
 #              that runs when file is run as a script. Depends on
-#              a6_include.py.
+#              a6_include.py, bloom.py, hash_functions.py and snapshot.py.
 
 
+import time
+from array import array
+
 from a6_include import (DynamicArray, HashEntry,
                         hash_function_1, hash_function_2)
+from bloom import CountingBloomFilter
+from hash_functions import (UNSTABLE_HASH_FUNCTIONS, get_hash_function,
+                            with_mixing)
+from snapshot import (OPEN_ADDRESSING, function_name, read_snapshot,
+                      write_snapshot)
+from stats import (DELETED, EMPTY, FULL, OpStats, cluster_sizes,
+                   length_summary)
+
+
+# Supported rules for choosing the number of buckets
+CAPACITY_POLICIES = ('prime', 'pow2')
+
+
+def quadratic_probe(hashPos: int, offset: int, capacity: int) -> int:
+    """
+    Probe strategy that visits hashPos + offset ** 2. Covers at least
+    half of a prime sized table, so it requires a load factor <= 0.5.
+    """
+    return (hashPos + offset ** 2) % capacity
+
+
+def linear_probe(hashPos: int, offset: int, capacity: int) -> int:
+    """
+    Probe strategy that visits consecutive buckets from hashPos.
+    Covers the whole table, at the cost of more primary clustering.
+    """
+    return (hashPos + offset) % capacity
+
+
+def triangular_probe(hashPos: int, offset: int, capacity: int) -> int:
+    """
+    Probe strategy that visits hashPos + offset * (offset + 1) / 2.
+    Covers the whole table when capacity is a power of two, which
+    it indexes with a bit mask.
+    """
+    return (hashPos + (offset * (offset + 1) >> 1)) & (capacity - 1)
+
+
+# Probe strategies that can be named in a snapshot
+PROBE_FUNCTIONS = {probe.__name__: probe for probe in
+                   (quadratic_probe, linear_probe, triangular_probe)}
 
 
 class HashMap:
     """
     Represents a hash map that handles collision with open
-    addressing via quadratic probing and maintains a prime
-    number of buckets. Includes methods to update and query
-    contents as well as various helper functions. Depends
-    on multiple classes and functions imported from
-    a6_include.py.
+    addressing via quadratic probing (or another pluggable
+    probe strategy) and maintains a prime (or power of two)
+    number of buckets.
+    Includes methods to update and query contents as well as
+    various helper functions. Depends on multiple classes and
+    functions imported from a6_include.py.
     """
-    def __init__(self, capacity: int, function) -> None:
+    # Subclasses whose lookups bypass the base probe loops, and so
+    # would never consult a Bloom filter, turn enable_bloom off
+    _supports_bloom = True
+
+    # Subclasses that probe many keys together, and so have no probe
+    # count per operation, turn enable_stats off
+    _supports_stats = True
+
+    def __init__(self,
+                 capacity: int,
+                 function,
+                 tombstone_ratio: float = 0.25,
+                 probe: callable = quadratic_probe,
+                 capacity_policy: str = 'prime') -> None:
         """
         Initialize new HashMap that uses
         quadratic probing for collision resolution
-        DO NOT CHANGE THIS METHOD IN ANY WAY
+
+        :param function: A hash function, or the name of one registered
+                         in hash_functions.HASH_FUNCTIONS
+        :param tombstone_ratio: Fraction of buckets that may hold
+                                tombstones before the table is compacted
+                                in place. None disables compaction by
+                                ratio.
+        :param probe: Function (hashPos, offset, capacity) -> address
+                      giving the probe sequence, such as
+                      quadratic_probe or linear_probe.
+        :param capacity_policy: 'prime' keeps a prime number of buckets.
+                                'pow2' keeps a power of two, skipping the
+                                prime search on resize, mixes each hash
+                                so its low bits are well spread, and
+                                replaces quadratic_probe (which would
+                                only cover part of such a table) with
+                                triangular_probe.
         """
+        if capacity_policy not in CAPACITY_POLICIES:
+            raise ValueError(f"capacity_policy must be one of "
+                             f"{CAPACITY_POLICIES}")
+
+        self._init_state(function, tombstone_ratio, probe, capacity_policy)
         self._buckets = DynamicArray()
 
-        # capacity must be a prime number
-        self._capacity = self._next_prime(capacity)
+        # capacity must be a prime number unless using powers of two
+        if capacity_policy == 'pow2':
+            self._capacity = self._next_capacity(capacity)
+        else:
+            self._capacity = self._next_prime(capacity)
         for _ in range(self._capacity):
             self._buckets.append(None)
 
-        self._hash_function = function
+    def _init_state(self,
+                    function,
+                    tombstone_ratio: float,
+                    probe: callable,
+                    capacity_policy: str) -> None:
+        """
+        Sets every attribute of an empty map other than its capacity and
+        storage. Subclasses that keep their own storage call this in
+        place of __init__, so they still get every attribute the base
+        methods rely on.
+
+        :return: None
+        """
+        self._capacity_policy = capacity_policy
+
+        # Power of two tables find home buckets with a bit mask, not %
+        self._pow2 = capacity_policy == 'pow2'
+
+        self._hash_function = get_hash_function(function)
+        if capacity_policy == 'pow2':
+            self._hash_function = with_mixing(self._hash_function)
+            if probe is quadratic_probe:
+                probe = triangular_probe
+        elif probe is triangular_probe:
+            # Masking the address only covers a power of two table
+            raise ValueError("triangular_probe needs capacity_policy "
+                             "'pow2'")
+        self._probe = probe
         self._size = 0
+        self._version = 0
+
+        # Deleted entries still occupying a bucket
+        self._tombstones = 0
+        self._tombstone_ratio = tombstone_ratio
+
+        # Operation counters, recorded only after enable_stats
+        self._stats = None
+
+        # Filter of key hashes, kept only after enable_bloom
+        self._bloom = None
+        self._bloom_error_rate = 0.01
 
     def __str__(self) -> str:
         """
@@ -81,6 +202,19 @@ class HashMap:
 
         return True
 
+    def _next_capacity(self, capacity: int) -> int:
+        """
+        :return: The smallest capacity >= given capacity allowed by the
+                 capacity policy: a prime or a power of two.
+        """
+        if self._capacity_policy == 'pow2':
+            return 1 << max(capacity - 1, 0).bit_length()
+
+        if self._is_prime(capacity):
+            return capacity
+
+        return self._next_prime(capacity)
+
     def get_size(self) -> int:
         """
         Return size of map
@@ -101,7 +235,8 @@ class HashMap:
     def put(self, key: str, value: object) -> None:
         """
         Adds key/value pair to the hash map as a tuple. If the key already
-        exists in the hash map, the value is updated.
+        exists in the hash map, the value is updated. New keys reuse the
+        first tombstone found along their probe sequence.
 
         :param key: A string representing a hash key
         :param value: Any object with implementations for comparison
@@ -113,24 +248,82 @@ class HashMap:
         # resize the table before putting the new key/value pair
         if self.table_load() >= 0.5:
             self.resize_table(2 * self.get_capacity())
+        elif self._needs_compaction():
+            self._compact()
 
         # Determine hash and address
         cap = self.get_capacity()
-        hashPos = self._hash_function(key) % cap
+        keyHash = self._hash_function(key)
+        hashPos = keyHash & (cap - 1) if self._pow2 else keyHash % cap
         address = hashPos
         offset = 0
+        reuse = None
+
+        # Probe the whole cluster so an existing key is never duplicated.
+        # Probe sequences repeat after cap steps, so stop there.
+        while offset < cap and self._buckets[address] is not None:
+            elem = self._buckets[address]
+
+            if elem.is_tombstone:
+                if reuse is None:
+                    reuse = address
+            elif elem.hash == keyHash and elem.key == key:
+                elem.value = value
+
+                if self._stats is not None:
+                    self._stats.record('put', offset + 1)
+                return
 
-        while self._buckets[address] is not None and \
-                self._buckets[address].key != key:
             offset += 1
-            address = (hashPos + offset ** 2) % cap
+            address = self._probe(hashPos, offset, cap)
+
+        if self._stats is not None:
+            self._stats.record('put', offset + 1)
+
+        if offset == cap and reuse is None:
+            raise RuntimeError("Probe sequence found no free bucket")
 
-        # Insert new HashEntry
-        if self._buckets[address] is None or \
-                self._buckets[address].is_tombstone:
-            self._size += 1
+        # Insert new HashEntry, preferring the first tombstone seen
+        if reuse is not None:
+            address = reuse
+            self._tombstones -= 1
+
+        self._buckets[address] = HashEntry(key, value, keyHash)
+        if self._bloom is not None:
+            self._bloom.add(keyHash)
+        self._size += 1
+        self._version += 1
+
+    def _needs_compaction(self) -> bool:
+        """
+        Determines if tombstones should be purged before the next insert.
+        Compaction is forced once live entries and tombstones together
+        reach the 0.5 load limit so that probing always finds an empty
+        bucket, and otherwise happens when tombstones exceed the
+        configured fraction of the table.
 
-        self._buckets[address] = HashEntry(key, value)
+        :return: True if the table should be compacted
+                 False otherwise
+        """
+        if self._tombstones == 0:
+            return False
+
+        cap = self.get_capacity()
+
+        if (self._size + self._tombstones) / cap >= 0.5:
+            return True
+
+        return self._tombstone_ratio is not None and \
+            self._tombstones > self._tombstone_ratio * cap
+
+    def _compact(self) -> None:
+        """
+        Rehashes all live entries into a table of the same capacity,
+        discarding tombstones.
+
+        :return: None
+        """
+        self.resize_table(self.get_capacity())
 
     def table_load(self) -> float:
         """
@@ -139,6 +332,130 @@ class HashMap:
         """
         return self.get_size() / self.get_capacity()
 
+    def tombstone_count(self) -> int:
+        """
+        :return: Integer representing the number of buckets holding
+                 deleted entries.
+        """
+        return self._tombstones
+
+    def enable_stats(self) -> None:
+        """
+        Starts recording, for every put, get, contains_key and remove,
+        the number of buckets it probed, along with the number and
+        duration of resizes. Any earlier records are discarded. While
+        stats are disabled each operation only checks that they are.
+        Raises NotImplementedError on maps that do not record them.
+
+        :return: None
+        """
+        if not self._supports_stats:
+            raise NotImplementedError(
+                f"{type(self).__name__} does not record operation stats")
+
+        self._stats = OpStats()
+
+    def disable_stats(self) -> None:
+        """
+        Stops recording operation stats.
+
+        :return: None
+        """
+        self._stats = None
+
+    def enable_bloom(self, error_rate: float = 0.01) -> None:
+        """
+        Starts keeping a counting Bloom filter of the key hashes, which
+        lets get, contains_key, get_many and remove_many return for most
+        missing keys without probing the table. The filter is sized for
+        the table at its 0.5 load limit and rebuilt from the cached
+        hashes whenever the table is resized or compacted. Raises
+        NotImplementedError on maps whose lookups would not consult it.
+
+        :param error_rate: Wanted false positive rate (0 < error_rate < 1)
+
+        :return: None
+        """
+        if not self._supports_bloom:
+            raise NotImplementedError(
+                f"{type(self).__name__} does not keep a Bloom filter")
+
+        self._bloom_error_rate = error_rate
+        self._rebuild_bloom()
+
+    def disable_bloom(self) -> None:
+        """
+        Stops keeping the Bloom filter.
+
+        :return: None
+        """
+        self._bloom = None
+
+    def _rebuild_bloom(self) -> None:
+        """
+        Replaces the Bloom filter with one sized for the current capacity
+        holding the cached hash of every live entry.
+
+        :return: None
+        """
+        bloom = self._empty_bloom()
+
+        for entry in self._entries():
+            bloom.add(entry.hash)
+
+        self._bloom = bloom
+
+    def _empty_bloom(self) -> CountingBloomFilter:
+        """
+        :return: An empty Bloom filter sized for the current capacity at
+                 the 0.5 load limit
+        """
+        return CountingBloomFilter(max(self._capacity // 2, self._size),
+                                   self._bloom_error_rate)
+
+    def _occupancy(self) -> list:
+        """
+        :return: A list holding the state (EMPTY, FULL or DELETED) of
+                 every bucket
+        """
+        states = []
+
+        for pos in range(self._capacity):
+            elem = self._buckets[pos]
+
+            if elem is None:
+                states.append(EMPTY)
+            else:
+                states.append(DELETED if elem.is_tombstone else FULL)
+
+        return states
+
+    def get_stats(self) -> dict:
+        """
+        :return: A dictionary describing the table: its size, capacity,
+                 load factor, tombstone count and ratio, and a summary of
+                 the sizes of clusters of occupied buckets (max, mean and
+                 a histogram). While stats are enabled it also holds the
+                 recorded operations, resizes and resize_seconds, and
+                 while the Bloom filter is kept a summary of it.
+        """
+        stats = {
+            'size': self.get_size(),
+            'capacity': self._capacity,
+            'load': self.table_load(),
+            'tombstones': self._tombstones,
+            'tombstone_ratio': self._tombstones / self._capacity,
+            'clusters': length_summary(cluster_sizes(self._occupancy())),
+        }
+
+        if self._stats is not None:
+            stats.update(self._stats.summary())
+
+        if self._bloom is not None:
+            stats['bloom'] = self._bloom.summary()
+
+        return stats
+
     def empty_buckets(self) -> int:
         """
         :return empty: Integer representing the number of empty
@@ -156,9 +473,11 @@ class HashMap:
 
     def resize_table(self, new_capacity: int) -> None:
         """
-        Resizes the hash table to the next smallest prime number
-        >= new_capacity that ensures a load factor <= 0.5. Does
-        nothing if new_capacity is < current number of elements.
+        Resizes the hash table to the next smallest prime number (or
+        power of two) >= new_capacity that ensures a load factor
+        <= 0.5. Does nothing if new_capacity is < current number of
+        elements. Live entries are moved by their cached hash, so keys
+        are not rehashed and tombstones are dropped.
 
         :param new_capacity: An integer >= 1 representing the minimum
                              new hash table size.
@@ -169,24 +488,49 @@ class HashMap:
         size = self.get_size()
 
         if new_capacity >= size:
-            # Capacity must be a prime number
-            if self._is_prime(new_capacity):
-                newCap = new_capacity
-            else:
-                newCap = self._next_prime(new_capacity)
+            if self._stats is not None:
+                start = time.perf_counter()
+
+            newCap = self._next_capacity(new_capacity)
 
-            # Record entries and rehash
-            elements = self.get_keys_and_values()
+            # Keep doubling until the entries fit under the load limit
+            while size / newCap >= 0.5:
+                newCap = self._next_capacity(2 * newCap)
+
+            # Fill a plain list, then wrap it, to skip the bounds checks
+            # of DynamicArray on every probe
+            newBuckets = [None] * newCap
+            pow2, mask = self._pow2, newCap - 1
+            probe = self._probe
+
+            # Keys are unique, so each entry goes to the first empty bucket
+            for elem in self._buckets:
+                if elem is not None and not elem.is_tombstone:
+                    keyHash = elem.hash
+                    hashPos = keyHash & mask if pow2 else keyHash % newCap
+                    address = hashPos
+                    offset = 0
+
+                    while newBuckets[address] is not None:
+                        offset += 1
+                        if offset == newCap:
+                            raise RuntimeError("Probe sequence found no "
+                                               "free bucket")
+                        address = probe(hashPos, offset, newCap)
+
+                    newBuckets[address] = elem
+
+            # Only replace the table once every entry has been placed
+            self._buckets = DynamicArray(newBuckets)
             self._capacity = newCap
-            self._buckets = DynamicArray()
-            self._size = 0
+            self._version += 1
+            self._tombstones = 0
 
-            for bucket in range(newCap):
-                self._buckets.append(None)
+            if self._bloom is not None:
+                self._rebuild_bloom()
 
-            for pos in range(elements.length()):
-                entry = elements[pos]
-                self.put(entry[0], entry[1])
+            if self._stats is not None:
+                self._stats.record_resize(time.perf_counter() - start)
 
     def get(self, key: str) -> object:
         """
@@ -204,18 +548,31 @@ class HashMap:
 
         # Determine hash and check addresses for key
         cap = self.get_capacity()
-        hashPos = self._hash_function(key) % cap
+        keyHash = self._hash_function(key)
+        if self._bloom is not None and \
+                not self._bloom.might_contain(keyHash):
+            if self._stats is not None:
+                self._stats.record('get', 0)
+            return None
+
+        hashPos = keyHash & (cap - 1) if self._pow2 else keyHash % cap
         address = hashPos
         offset = 0
 
-        while self._buckets[address] is not None:
+        while offset < cap and self._buckets[address] is not None:
             elem = self._buckets[address]
 
-            if not elem.is_tombstone and elem.key == key:
+            if not elem.is_tombstone and elem.hash == keyHash and \
+                    elem.key == key:
+                if self._stats is not None:
+                    self._stats.record('get', offset + 1)
                 return elem.value
 
             offset += 1
-            address = (hashPos + offset ** 2) % cap
+            address = self._probe(hashPos, offset, cap)
+
+        if self._stats is not None:
+            self._stats.record('get', offset + 1)
 
         return None
 
@@ -234,18 +591,31 @@ class HashMap:
 
         # Determine hash and check addresses for key
         cap = self.get_capacity()
-        hashPos = self._hash_function(key) % cap
+        keyHash = self._hash_function(key)
+        if self._bloom is not None and \
+                not self._bloom.might_contain(keyHash):
+            if self._stats is not None:
+                self._stats.record('contains_key', 0)
+            return False
+
+        hashPos = keyHash & (cap - 1) if self._pow2 else keyHash % cap
         address = hashPos
         offset = 0
 
-        while self._buckets[address] is not None:
+        while offset < cap and self._buckets[address] is not None:
             elem = self._buckets[address]
 
-            if not elem.is_tombstone and elem.key == key:
+            if not elem.is_tombstone and elem.hash == keyHash and \
+                    elem.key == key:
+                if self._stats is not None:
+                    self._stats.record('contains_key', offset + 1)
                 return True
 
             offset += 1
-            address = (hashPos + offset ** 2) % cap
+            address = self._probe(hashPos, offset, cap)
+
+        if self._stats is not None:
+            self._stats.record('contains_key', offset + 1)
 
         return False
 
@@ -262,19 +632,32 @@ class HashMap:
         if self._size != 0:
             # Determine hash and check addresses for key
             cap = self.get_capacity()
-            hashPos = self._hash_function(key) % cap
+            keyHash = self._hash_function(key)
+            hashPos = keyHash & (cap - 1) if self._pow2 else keyHash % cap
             address = hashPos
             offset = 0
 
-            while self._buckets[address] is not None:
+            while offset < cap and self._buckets[address] is not None:
                 elem = self._buckets[address]
 
-                if not elem.is_tombstone and elem.key == key:
+                if not elem.is_tombstone and elem.hash == keyHash and \
+                        elem.key == key:
                     elem.is_tombstone = True
+                    if self._bloom is not None:
+                        self._bloom.discard(keyHash)
                     self._size -= 1
+                    self._version += 1
+                    self._tombstones += 1
+
+                    if self._stats is not None:
+                        self._stats.record('remove', offset + 1)
+                    return
 
                 offset += 1
-                address = (hashPos + offset ** 2) % cap
+                address = self._probe(hashPos, offset, cap)
+
+            if self._stats is not None:
+                self._stats.record('remove', offset + 1)
 
     def clear(self) -> None:
         """
@@ -283,11 +666,15 @@ class HashMap:
         :return: None
         """
         # Do nothing for already empty hash maps
-        if self._size != 0:
+        if self._size != 0 or self._tombstones != 0:
             for pos in range(self.get_capacity()):
                 self._buckets[pos] = None
 
+            if self._bloom is not None:
+                self._bloom.clear()
             self._size = 0
+            self._version += 1
+            self._tombstones = 0
 
     def get_keys_and_values(self) -> DynamicArray:
         """
@@ -309,6 +696,675 @@ class HashMap:
 
         return elements
 
+    def _entries(self):
+        """
+        Generates every live entry in the hash map without copying them.
+        Raises RuntimeError if the hash map gains or loses keys, or is
+        resized, while the generator is in use.
+        """
+        version = self._version
+        buckets = self._buckets
+
+        for pos in range(self._capacity):
+            elem = buckets[pos]
+
+            if elem is not None and not elem.is_tombstone:
+                yield elem
+
+                if self._version != version:
+                    raise RuntimeError("HashMap changed during iteration")
+
+    def keys(self):
+        """Generates every key in the hash map."""
+        for elem in self._entries():
+            yield elem.key
+
+    def values(self):
+        """Generates every value in the hash map."""
+        for elem in self._entries():
+            yield elem.value
+
+    def items(self):
+        """Generates every (key, value) pair in the hash map."""
+        for elem in self._entries():
+            yield elem.key, elem.value
+
+    def __iter__(self):
+        """Iterate over the keys of the hash map."""
+        return self.keys()
+
+    def put_many(self, pairs) -> None:
+        """
+        Adds every key/value pair in pairs, as calling put for each one
+        in order would. Keys are hashed in a single pass, the table is
+        resized at most once, up front, so that the whole batch fits
+        under the 0.5 load limit, and buckets are probed in a plain list
+        that replaces the bucket array once the batch is in. Each key is
+        recorded in the stats as a put.
+
+        :param pairs: An iterable of (key, value) tuples
+
+        :return: None
+        """
+        pairs = pairs if isinstance(pairs, list) else list(pairs)
+        function = self._hash_function
+        hashes = [function(key) for key, _ in pairs]
+
+        needed = self._size + len(pairs)
+        if (needed + self._tombstones) / self._capacity >= 0.5:
+            self.resize_table(2 * needed + 1)
+        elif self._needs_compaction():
+            self._compact()
+
+        buckets = list(self._buckets)
+        probe = self._probe
+        cap = self._capacity
+        pow2, mask = self._pow2, cap - 1
+        bloom = self._bloom
+        stats = self._stats
+        added = reused = 0
+
+        for (key, value), keyHash in zip(pairs, hashes):
+            hashPos = keyHash & mask if pow2 else keyHash % cap
+            address = hashPos
+            offset = 0
+            reuse = None
+            elem = buckets[address]
+
+            while elem is not None and offset < cap:
+                if elem.is_tombstone:
+                    if reuse is None:
+                        reuse = address
+                elif elem.hash == keyHash and elem.key == key:
+                    elem.value = value
+                    if stats is not None:
+                        stats.record('put', offset + 1)
+                    break
+
+                offset += 1
+                address = probe(hashPos, offset, cap)
+                elem = buckets[address]
+            else:
+                if stats is not None:
+                    stats.record('put', offset + 1)
+
+                if offset == cap and reuse is None:
+                    raise RuntimeError("Probe sequence found no free "
+                                       "bucket")
+
+                if reuse is not None:
+                    address = reuse
+                    reused += 1
+
+                buckets[address] = HashEntry(key, value, keyHash)
+                if bloom is not None:
+                    bloom.add(keyHash)
+                added += 1
+
+        self._buckets = DynamicArray(buckets)
+        self._size += added
+        self._tombstones -= reused
+        self._version += 1
+
+    def _find_many(self, keys, op: str) -> list:
+        """
+        Records the number of buckets probed for each key under op.
+
+        :return: A list holding, for each key in keys, its live entry or
+                 None if the key is not in the hash map
+        """
+        function = self._hash_function
+        bucketAt = self._buckets.get_at_index
+        probe = self._probe
+        cap = self._capacity
+        pow2, mask = self._pow2, cap - 1
+        bloom = self._bloom
+        stats = self._stats
+        found = []
+
+        for key in keys:
+            keyHash = function(key)
+            if bloom is not None and not bloom.might_contain(keyHash):
+                if stats is not None:
+                    stats.record(op, 0)
+                found.append(None)
+                continue
+
+            hashPos = keyHash & mask if pow2 else keyHash % cap
+            address = hashPos
+            offset = 0
+            elem = bucketAt(address)
+
+            while elem is not None and offset < cap:
+                if not elem.is_tombstone and elem.hash == keyHash and \
+                        elem.key == key:
+                    break
+
+                offset += 1
+                address = probe(hashPos, offset, cap)
+                elem = bucketAt(address)
+            else:
+                elem = None
+
+            if stats is not None:
+                stats.record(op, offset + 1)
+            found.append(elem)
+
+        return found
+
+    def get_many(self, keys) -> list:
+        """
+        Gets the values associated with each key in keys.
+
+        :param keys: An iterable of string keys
+
+        :return: A list holding, for each key in order, its value or None
+                 if the key is not in the hash map
+        """
+        return [None if elem is None else elem.value
+                for elem in self._find_many(keys, 'get')]
+
+    def remove_many(self, keys) -> None:
+        """
+        Removes each key in keys that is present in the hash map.
+
+        :param keys: An iterable of string keys
+
+        :return: None
+        """
+        bloom = self._bloom
+
+        for elem in self._find_many(keys, 'remove'):
+            if elem is not None and not elem.is_tombstone:
+                elem.is_tombstone = True
+                if bloom is not None:
+                    bloom.discard(elem.hash)
+                self._size -= 1
+                self._version += 1
+                self._tombstones += 1
+
+    def dump(self, path: str) -> None:
+        """
+        Writes the hash map to a snapshot file at path: its capacity,
+        hash function and probe names and, for every occupied bucket,
+        its position, cached hash, key and value. Tombstones are kept so
+        the probe sequences of the restored table are unchanged. Values
+        are pickled.
+
+        :param path: Path of the file to write
+
+        :return: None
+        """
+        probe = getattr(self._probe, '__name__', None)
+
+        if PROBE_FUNCTIONS.get(probe) is not self._probe:
+            raise ValueError("Only maps using a probe function from "
+                             "PROBE_FUNCTIONS can be dumped")
+
+        positions, hashes = array('q'), array('q')
+        keys, values = [], []
+
+        for pos in range(self._capacity):
+            elem = self._buckets[pos]
+
+            if elem is None:
+                continue
+
+            positions.append(pos)
+            if elem.is_tombstone:
+                hashes.append(0)
+                keys.append(None)
+            else:
+                hashes.append(elem.hash)
+                keys.append(elem.key)
+                values.append(elem.value)
+
+        write_snapshot(path, OPEN_ADDRESSING, self._capacity_policy,
+                       self._capacity, function_name(self._hash_function),
+                       probe, positions, hashes, keys, values)
+
+    @classmethod
+    def load(cls, path: str, **kwargs) -> "HashMap":
+        """
+        Restores a hash map written by dump. Entries are placed straight
+        into their saved buckets without rehashing, unless the hash
+        function is not stable across processes, in which case every
+        key is put again.
+
+        :param path: Path of the snapshot file
+        :param kwargs: Other constructor arguments, such as
+                       tombstone_ratio
+
+        :return: The restored hash map
+        """
+        snapshot = read_snapshot(path, OPEN_ADDRESSING)
+        capacity = snapshot['capacity']
+        hashMap = cls(capacity, snapshot['function'],
+                      probe=PROBE_FUNCTIONS[snapshot['probe']],
+                      capacity_policy=snapshot['policy'], **kwargs)
+
+        if hashMap.get_capacity() != capacity:
+            hashMap.resize_table(capacity)
+
+        if snapshot['function'] in UNSTABLE_HASH_FUNCTIONS:
+            keys = [key for key in snapshot['keys'] if key is not None]
+            hashMap.put_many(zip(keys, snapshot['values']))
+            return hashMap
+
+        buckets = hashMap._buckets
+        values = iter(snapshot['values'])
+
+        for pos, keyHash, key in zip(snapshot['positions'],
+                                     snapshot['hashes'], snapshot['keys']):
+            if key is None:
+                elem = HashEntry(None, None)
+                elem.is_tombstone = True
+                hashMap._tombstones += 1
+            else:
+                elem = HashEntry(key, next(values), keyHash)
+                hashMap._size += 1
+
+            buckets[pos] = elem
+
+        hashMap._version += 1
+        return hashMap
+
+
+# Placeholder left in the old array for buckets already migrated
+_MIGRATED = HashEntry(None, None)
+_MIGRATED.is_tombstone = True
+
+
+class IncrementalHashMap(HashMap):
+    """
+    Represents an open addressing hash map that resizes incrementally.
+    During a resize the old and new bucket arrays are both kept, every
+    operation moves a bounded number of old buckets into the new array,
+    and lookups consult both arrays until the migration completes.
+    """
+    def __init__(self,
+                 capacity: int,
+                 function,
+                 tombstone_ratio: float = 0.25,
+                 probe: callable = quadratic_probe,
+                 capacity_policy: str = 'prime',
+                 migration_step: int = 16) -> None:
+        """
+        Initialize new HashMap that uses quadratic probing for collision
+        resolution and migrates migration_step buckets per operation
+        while a resize is in progress
+        """
+        super().__init__(capacity, function, tombstone_ratio, probe,
+                         capacity_policy)
+        self._migration_step = migration_step
+
+        # Old bucket array and next bucket to move while resizing
+        self._old_buckets = None
+        self._old_capacity = 0
+        self._migrate_pos = 0
+
+        # Bloom filter of the old array while resizing; _bloom then only
+        # covers the new array
+        self._old_bloom = None
+
+    def __str__(self) -> str:
+        """Override string method to provide more readable output."""
+        self._finish_migration()
+        return super().__str__()
+
+    def is_resizing(self) -> bool:
+        """
+        :return: True if entries are still being moved to a new table
+                 False otherwise
+        """
+        return self._old_buckets is not None
+
+    def _migrate(self) -> None:
+        """
+        Moves the next migration_step buckets of the old array into the
+        new array. Moved buckets become tombstones so that probe
+        sequences through the old array stay intact.
+
+        :return: None
+        """
+        oldBuckets = self._old_buckets
+
+        if oldBuckets is None:
+            return
+
+        cap = self._capacity
+        pow2, mask = self._pow2, cap - 1
+        bloom = self._bloom
+        start = self._migrate_pos
+        end = min(start + self._migration_step, self._old_capacity)
+
+        for pos in range(start, end):
+            elem = oldBuckets[pos]
+
+            if elem is None or elem.is_tombstone:
+                continue
+
+            # Keys live in only one array, so the first free bucket is safe
+            keyHash = elem.hash
+            hashPos = keyHash & mask if pow2 else keyHash % cap
+            address = hashPos
+            offset = 0
+
+            while self._buckets[address] is not None and \
+                    not self._buckets[address].is_tombstone:
+                offset += 1
+                if offset == cap:
+                    raise RuntimeError("Probe sequence found no free "
+                                       "bucket")
+                address = self._probe(hashPos, offset, cap)
+
+            if self._buckets[address] is not None:
+                self._tombstones -= 1
+
+            self._buckets[address] = elem
+            oldBuckets[pos] = _MIGRATED
+            if bloom is not None:
+                bloom.add(elem.hash)
+
+        self._migrate_pos = end
+
+        if end == self._old_capacity:
+            self._old_buckets = None
+            self._old_capacity = 0
+            self._migrate_pos = 0
+            self._old_bloom = None
+
+    def _finish_migration(self) -> None:
+        """
+        Moves all remaining old buckets into the new array.
+
+        :return: None
+        """
+        while self._old_buckets is not None:
+            self._migrate()
+
+    def _find_entry(self, buckets: DynamicArray, cap: int,
+                    key: str, keyHash: int) -> tuple:
+        """
+        :return: A tuple of the live entry with key in buckets, or None if
+                 the key is not there, and the number of buckets probed
+        """
+        hashPos = keyHash & (cap - 1) if self._pow2 else keyHash % cap
+        address = hashPos
+        offset = 0
+
+        while offset < cap and buckets[address] is not None:
+            elem = buckets[address]
+
+            if not elem.is_tombstone and elem.hash == keyHash and \
+                    elem.key == key:
+                return elem, offset + 1
+
+            offset += 1
+            address = self._probe(hashPos, offset, cap)
+
+        return None, offset + 1
+
+    def _lookup(self, key: str, op: str) -> HashEntry:
+        """
+        Advances any migration, then searches the new array followed by
+        the old one. Records the number of buckets probed under op.
+
+        :return: The live entry with key, or None if the key is not in
+                 the hash map.
+        """
+        self._migrate()
+
+        if self._size == 0:
+            return None
+
+        keyHash = self._hash_function(key)
+        bloom = self._bloom
+        elem = None
+        probes = 0
+
+        if bloom is None or bloom.might_contain(keyHash):
+            elem, probes = self._find_entry(self._buckets, self._capacity,
+                                            key, keyHash)
+
+        if elem is None and self._old_buckets is not None and \
+                (bloom is None or self._old_bloom.might_contain(keyHash)):
+            elem, oldProbes = self._find_entry(self._old_buckets,
+                                               self._old_capacity, key,
+                                               keyHash)
+            probes += oldProbes
+
+        if self._stats is not None:
+            self._stats.record(op, probes)
+
+        return elem
+
+    def put(self, key: str, value: object) -> None:
+        """
+        Adds key/value pair to the hash map. If the key already exists in
+        either bucket array, the value is updated where it is.
+
+        :param key: A string representing a hash key
+        :param value: Any object with implementations for comparison
+                      operators and string representation.
+
+        :return: None
+        """
+        self._migrate()
+
+        # Start any resize first so the key is only searched afterwards
+        if self.table_load() >= 0.5:
+            self.resize_table(2 * self.get_capacity())
+        elif self._needs_compaction():
+            self._compact()
+
+        if self._old_buckets is not None:
+            elem, probes = self._find_entry(self._old_buckets,
+                                            self._old_capacity, key,
+                                            self._hash_function(key))
+
+            if elem is not None:
+                if self._stats is not None:
+                    self._stats.record('put', probes)
+                elem.value = value
+                return
+
+        super().put(key, value)
+
+    def empty_buckets(self) -> int:
+        """
+        :return: Integer representing the number of empty
+                 buckets in the hash table, once any resize completes.
+        """
+        self._finish_migration()
+        return super().empty_buckets()
+
+    def resize_table(self, new_capacity: int) -> None:
+        """
+        Starts moving entries into a table of the next smallest prime
+        number (or power of two) >= new_capacity that ensures a load
+        factor <= 0.5. Any resize already in progress is completed
+        first. Does nothing if new_capacity is < current number of
+        elements. Only the time taken to start the resize is recorded in
+        the stats, since the entries are moved by later operations.
+
+        :param new_capacity: An integer >= 1 representing the minimum
+                             new hash table size.
+
+        :return: None
+        """
+        size = self.get_size()
+
+        if new_capacity < size:
+            return
+
+        self._finish_migration()
+
+        if self._stats is not None:
+            start = time.perf_counter()
+
+        newCap = self._next_capacity(new_capacity)
+
+        while size / newCap >= 0.5:
+            newCap = self._next_capacity(2 * newCap)
+
+        if size != 0:
+            self._old_buckets = self._buckets
+            self._old_capacity = self._capacity
+            self._migrate_pos = 0
+            self._old_bloom = self._bloom
+
+        self._buckets = DynamicArray([None] * newCap)
+        self._version += 1
+        self._capacity = newCap
+        self._tombstones = 0
+
+        # Migrated and new keys go to a filter sized for the new array
+        if self._bloom is not None:
+            self._bloom = self._empty_bloom()
+
+        if self._stats is not None:
+            self._stats.record_resize(time.perf_counter() - start)
+
+    def get(self, key: str) -> object:
+        """
+        Gets the value associated with key in the hash map.
+
+        :param key: A string representing a hash key
+
+        :return: The object representing the value associated with the key
+                 if the key exists in the hash map.
+                 None otherwise.
+        """
+        elem = self._lookup(key, 'get')
+
+        if elem is None:
+            return None
+
+        return elem.value
+
+    def contains_key(self, key: str) -> bool:
+        """
+        Determines if key is present in the hash map.
+
+        :param key: A string representing a hash key
+
+        :return: True if the key is in the hash map
+                 False otherwise
+        """
+        return self._lookup(key, 'contains_key') is not None
+
+    def remove(self, key: str) -> None:
+        """
+        Removes the entry with key from whichever bucket array holds it.
+        Does nothing if the key is not in the hash map.
+
+        :param key: A string representing a hash key
+
+        :return: None
+        """
+        self._migrate()
+
+        if self._size == 0:
+            return
+
+        keyHash = self._hash_function(key)
+        elem, probes = self._find_entry(self._buckets, self._capacity, key,
+                                        keyHash)
+        bloom = self._bloom
+
+        if elem is not None:
+            self._tombstones += 1
+        elif self._old_buckets is not None:
+            elem, oldProbes = self._find_entry(self._old_buckets,
+                                               self._old_capacity, key,
+                                               keyHash)
+            probes += oldProbes
+            bloom = self._old_bloom if bloom is not None else None
+
+        if self._stats is not None:
+            self._stats.record('remove', probes)
+
+        if elem is not None:
+            if bloom is not None:
+                bloom.discard(keyHash)
+            elem.is_tombstone = True
+            self._size -= 1
+            self._version += 1
+
+    def clear(self) -> None:
+        """
+        Clears the contents of the hash map, abandoning any resize.
+
+        :return: None
+        """
+        self._old_buckets = None
+        self._old_capacity = 0
+        self._migrate_pos = 0
+        self._old_bloom = None
+        super().clear()
+
+    def get_keys_and_values(self) -> DynamicArray:
+        """
+        Creates a DynamicArray containing tuples of all key/value
+        pairs in the hash map, once any resize completes.
+
+        :return elements: A DynamicArray as described above.
+        """
+        self._finish_migration()
+        return super().get_keys_and_values()
+
+    def _entries(self):
+        """
+        Generates every live entry in the hash map, once any resize
+        completes.
+        """
+        self._finish_migration()
+        yield from super()._entries()
+
+    def dump(self, path: str) -> None:
+        """
+        Completes any resize, then writes the hash map to a snapshot
+        file at path.
+
+        :return: None
+        """
+        self._finish_migration()
+        super().dump(path)
+
+    def put_many(self, pairs) -> None:
+        """
+        Adds every key/value pair in pairs with put, so that each insert
+        still only advances the migration by a bounded amount.
+
+        :param pairs: An iterable of (key, value) tuples
+
+        :return: None
+        """
+        for key, value in pairs:
+            self.put(key, value)
+
+    def get_many(self, keys) -> list:
+        """
+        :param keys: An iterable of string keys
+
+        :return: A list holding, for each key in order, its value or None
+                 if the key is not in the hash map
+        """
+        return [self.get(key) for key in keys]
+
+    def remove_many(self, keys) -> None:
+        """
+        Removes each key in keys that is present in the hash map.
+
+        :param keys: An iterable of string keys
+
+        :return: None
+        """
+        for key in keys:
+            self.remove(key)
+
+
 # ------------------- BASIC TESTING ---------------------------------------- #
 
 if __name__ == "__main__":
@@ -0,0 +1,577 @@
+# Course: CS261 - Data Structures
+# Assignment: 6
+# Description: A struct-of-arrays variant of the open addressing hash map
+#              in hash_map_oa.py. Instead of one HashEntry object per
+#              bucket, cached hashes, keys, values and bucket states live
+#              in separate flat arrays, and probes compare cached hashes
+#              before touching key objects. Includes a basic test suite
+#              that runs when file is run as a script. Depends on
+#              hash_map_oa.py, hash_functions.py, snapshot.py and
+#              a6_include.py.
+
+
+import time
+from array import array
+
+from a6_include import DynamicArray, hash_function_1, hash_function_2
+from hash_functions import UNSTABLE_HASH_FUNCTIONS
+from hash_map_oa import (PROBE_FUNCTIONS, HashMap, quadratic_probe,
+                         triangular_probe)
+from snapshot import (OPEN_ADDRESSING, function_name, read_snapshot,
+                      write_snapshot)
+
+
+# Bucket states
+EMPTY = 0
+FULL = 1
+DELETED = 2
+
+# Cached hashes are stored as signed 64 bit integers
+HASH_MASK = (1 << 63) - 1
+
+
+class CompactHashMap(HashMap):
+    """
+    Represents an open addressing hash map with the same interface and
+    probing rules as hash_map_oa.HashMap, but stored as parallel arrays:
+    an array('q') of cached hashes, lists of keys and values, and a
+    bytearray of bucket states (EMPTY, FULL or DELETED).
+    """
+    # Lookups search the parallel arrays, not a Bloom filter
+    _supports_bloom = False
+
+    def __init__(self,
+                 capacity: int,
+                 function,
+                 tombstone_ratio: float = 0.25,
+                 probe: callable = quadratic_probe) -> None:
+        """
+        Initialize new HashMap that uses parallel arrays for storage
+        and quadratic probing for collision resolution. The table is
+        always prime sized, so triangular_probe is rejected with a
+        ValueError.
+        """
+        self._init_state(function, tombstone_ratio, probe, 'prime')
+
+        # capacity must be a prime number
+        self._capacity = self._next_prime(capacity)
+        self._allocate(self._capacity)
+
+    def __str__(self) -> str:
+        """Override string method to provide more readable output."""
+        out = ''
+        for i in range(self._capacity):
+            state = self._states[i]
+
+            if state == EMPTY:
+                out += str(i) + ': None\n'
+            else:
+                out += f"{i}: K: {self._keys[i]} V: {self._values[i]} " \
+                       f"TS: {state == DELETED}\n"
+        return out
+
+    def _allocate(self, capacity: int) -> None:
+        """
+        Replaces the storage arrays with empty arrays of given capacity.
+
+        :return: None
+        """
+        self._hashes = array('q', bytes(8 * capacity))
+        self._keys = [None] * capacity
+        self._values = [None] * capacity
+        self._states = bytearray(capacity)
+
+    def _occupancy(self) -> bytearray:
+        """
+        :return: The state (EMPTY, FULL or DELETED) of every bucket
+        """
+        return self._states
+
+    def _hash(self, key: str) -> int:
+        """
+        :return: The hash of key, truncated to fit a signed 64 bit slot.
+        """
+        return self._hash_function(key) & HASH_MASK
+
+    def _find(self, key: str, keyHash: int, op: str = None) -> int:
+        """
+        Records the number of buckets probed under op, if given.
+
+        :return: Address of the live entry with key, or -1 if the key is
+                 not in the hash map.
+        """
+        states, hashes, keys = self._states, self._hashes, self._keys
+        probe = self._probe
+        cap = self._capacity
+        hashPos = keyHash % cap
+        address = hashPos
+        offset = 0
+
+        state = states[address]
+        while state != EMPTY and offset < cap:
+            if state == FULL and hashes[address] == keyHash and \
+                    keys[address] == key:
+                if op is not None and self._stats is not None:
+                    self._stats.record(op, offset + 1)
+                return address
+
+            offset += 1
+            address = probe(hashPos, offset, cap)
+            state = states[address]
+
+        if op is not None and self._stats is not None:
+            self._stats.record(op, offset + 1)
+
+        return -1
+
+    def put(self, key: str, value: object) -> None:
+        """
+        Adds key/value pair to the hash map. If the key already exists in
+        the hash map, the value is updated. New keys reuse the first
+        tombstone found along their probe sequence.
+
+        :param key: A string representing a hash key
+        :param value: Any object with implementations for comparison
+                      operators and string representation.
+
+        :return: None
+        """
+        if self.table_load() >= 0.5:
+            self.resize_table(2 * self._capacity)
+        elif self._needs_compaction():
+            self._compact()
+
+        states, hashes, keys = self._states, self._hashes, self._keys
+        probe = self._probe
+        cap = self._capacity
+        keyHash = self._hash(key)
+        hashPos = keyHash % cap
+        address = hashPos
+        offset = 0
+        reuse = -1
+
+        state = states[address]
+        while state != EMPTY and offset < cap:
+            if state == DELETED:
+                if reuse < 0:
+                    reuse = address
+            elif hashes[address] == keyHash and keys[address] == key:
+                if self._stats is not None:
+                    self._stats.record('put', offset + 1)
+                self._values[address] = value
+                return
+
+            offset += 1
+            address = probe(hashPos, offset, cap)
+            state = states[address]
+
+        if self._stats is not None:
+            self._stats.record('put', offset + 1)
+
+        if offset == cap and reuse < 0:
+            raise RuntimeError("Probe sequence found no free bucket")
+
+        if reuse >= 0:
+            address = reuse
+            self._tombstones -= 1
+
+        states[address] = FULL
+        hashes[address] = keyHash
+        keys[address] = key
+        self._values[address] = value
+        self._size += 1
+        self._version += 1
+
+    def empty_buckets(self) -> int:
+        """
+        :return: Integer representing the number of empty
+                 buckets in the hash table.
+        """
+        return self._states.count(EMPTY)
+
+    def resize_table(self, new_capacity: int) -> None:
+        """
+        Resizes the hash table to the next smallest prime number
+        >= new_capacity that ensures a load factor <= 0.5, using the
+        cached hashes instead of rehashing keys. Does nothing if
+        new_capacity is < current number of elements.
+
+        :param new_capacity: An integer >= 1 representing the minimum
+                             new hash table size.
+
+        :return: None
+        """
+        size = self._size
+
+        if new_capacity < size:
+            return
+
+        # Capacity must be a prime number
+        if self._is_prime(new_capacity):
+            newCap = new_capacity
+        else:
+            newCap = self._next_prime(new_capacity)
+
+        while size / newCap >= 0.5:
+            newCap = self._next_prime(2 * newCap)
+
+        if self._stats is not None:
+            start = time.perf_counter()
+
+        oldStates, oldHashes = self._states, self._hashes
+        oldKeys, oldValues = self._keys, self._values
+        self._allocate(newCap)
+
+        states, hashes, keys, values = \
+            self._states, self._hashes, self._keys, self._values
+        probe = self._probe
+
+        # Keys are unique, so each entry goes to the first empty bucket
+        for pos in range(len(oldStates)):
+            if oldStates[pos] != FULL:
+                continue
+
+            keyHash = oldHashes[pos]
+            hashPos = keyHash % newCap
+            address = hashPos
+            offset = 0
+
+            while states[address] != EMPTY:
+                offset += 1
+                if offset == newCap:
+                    # Keep the old table rather than lose entries
+                    self._states, self._hashes = oldStates, oldHashes
+                    self._keys, self._values = oldKeys, oldValues
+                    raise RuntimeError("Probe sequence found no free "
+                                       "bucket")
+                address = probe(hashPos, offset, newCap)
+
+            states[address] = FULL
+            hashes[address] = keyHash
+            keys[address] = oldKeys[pos]
+            values[address] = oldValues[pos]
+
+        self._capacity = newCap
+        self._version += 1
+        self._tombstones = 0
+
+        if self._stats is not None:
+            self._stats.record_resize(time.perf_counter() - start)
+
+    def get(self, key: str) -> object:
+        """
+        Gets the value associated with key in the hash map.
+
+        :param key: A string representing a hash key
+
+        :return: The object representing the value associated with the key
+                 if the key exists in the hash map.
+                 None otherwise.
+        """
+        if self._size == 0:
+            return None
+
+        address = self._find(key, self._hash(key), 'get')
+
+        if address < 0:
+            return None
+
+        return self._values[address]
+
+    def contains_key(self, key: str) -> bool:
+        """
+        Determines if key is present in the hash map.
+
+        :param key: A string representing a hash key
+
+        :return: True if the key is in the hash map
+                 False otherwise
+        """
+        if self._size == 0:
+            return False
+
+        return self._find(key, self._hash(key), 'contains_key') >= 0
+
+    def remove(self, key: str) -> None:
+        """
+        Removes the entry with key from the hash map, leaving a
+        tombstone. Does nothing if the key is not in the hash map.
+
+        :param key: A string representing a hash key
+
+        :return: None
+        """
+        if self._size == 0:
+            return
+
+        address = self._find(key, self._hash(key), 'remove')
+
+        if address >= 0:
+            self._states[address] = DELETED
+            self._keys[address] = None
+            self._values[address] = None
+            self._size -= 1
+            self._version += 1
+            self._tombstones += 1
+
+    def clear(self) -> None:
+        """
+        Clears the contents of the hash map.
+
+        :return: None
+        """
+        if self._size != 0 or self._tombstones != 0:
+            self._allocate(self._capacity)
+            self._size = 0
+            self._version += 1
+            self._tombstones = 0
+
+    def get_keys_and_values(self) -> DynamicArray:
+        """
+        Creates a DynamicArray containing tuples of all key/value
+        pairs in the hash map.
+
+        :return elements: A DynamicArray as described above.
+        """
+        elements = DynamicArray()
+        states, keys, values = self._states, self._keys, self._values
+
+        for pos in range(self._capacity):
+            if states[pos] == FULL:
+                elements.append((keys[pos], values[pos]))
+
+        return elements
+
+    def _addresses(self):
+        """
+        Generates the address of every live entry. Raises RuntimeError
+        if the hash map gains or loses keys, or is resized, while the
+        generator is in use.
+        """
+        version = self._version
+        states = self._states
+
+        for pos in range(self._capacity):
+            if states[pos] == FULL:
+                yield pos
+
+                if self._version != version:
+                    raise RuntimeError("HashMap changed during iteration")
+
+    def keys(self):
+        """Generates every key in the hash map."""
+        keys = self._keys
+        for pos in self._addresses():
+            yield keys[pos]
+
+    def values(self):
+        """Generates every value in the hash map."""
+        values = self._values
+        for pos in self._addresses():
+            yield values[pos]
+
+    def items(self):
+        """Generates every (key, value) pair in the hash map."""
+        keys, values = self._keys, self._values
+        for pos in self._addresses():
+            yield keys[pos], values[pos]
+
+    def put_many(self, pairs) -> None:
+        """
+        Adds every key/value pair in pairs, as calling put for each one
+        in order would. Keys are hashed in a single pass and the table
+        is resized at most once, up front, so that the whole batch fits
+        under the 0.5 load limit. Each key is recorded in the stats as
+        a put.
+
+        :param pairs: An iterable of (key, value) tuples
+
+        :return: None
+        """
+        pairs = pairs if isinstance(pairs, list) else list(pairs)
+        function = self._hash_function
+        keyHashes = [function(key) & HASH_MASK for key, _ in pairs]
+
+        needed = self._size + len(pairs)
+        if (needed + self._tombstones) / self._capacity >= 0.5:
+            self.resize_table(2 * needed + 1)
+        elif self._needs_compaction():
+            self._compact()
+
+        states, hashes, keys, values = \
+            self._states, self._hashes, self._keys, self._values
+        probe = self._probe
+        cap = self._capacity
+        stats = self._stats
+
+        for (key, value), keyHash in zip(pairs, keyHashes):
+            hashPos = keyHash % cap
+            address = hashPos
+            offset = 0
+            reuse = -1
+
+            state = states[address]
+            while state != EMPTY and offset < cap:
+                if state == DELETED:
+                    if reuse < 0:
+                        reuse = address
+                elif hashes[address] == keyHash and keys[address] == key:
+                    values[address] = value
+                    if stats is not None:
+                        stats.record('put', offset + 1)
+                    break
+
+                offset += 1
+                address = probe(hashPos, offset, cap)
+                state = states[address]
+            else:
+                if stats is not None:
+                    stats.record('put', offset + 1)
+
+                if offset == cap and reuse < 0:
+                    raise RuntimeError("Probe sequence found no free "
+                                       "bucket")
+
+                if reuse >= 0:
+                    address = reuse
+                    self._tombstones -= 1
+
+                states[address] = FULL
+                hashes[address] = keyHash
+                keys[address] = key
+                values[address] = value
+                self._size += 1
+                self._version += 1
+
+    def get_many(self, keys) -> list:
+        """
+        Gets the values associated with each key in keys.
+
+        :param keys: An iterable of string keys
+
+        :return: A list holding, for each key in order, its value or None
+                 if the key is not in the hash map
+        """
+        find, function, values = self._find, self._hash_function, self._values
+        found = []
+
+        for key in keys:
+            address = find(key, function(key) & HASH_MASK, 'get')
+            found.append(values[address] if address >= 0 else None)
+
+        return found
+
+    def remove_many(self, keys) -> None:
+        """
+        Removes each key in keys that is present in the hash map.
+
+        :param keys: An iterable of string keys
+
+        :return: None
+        """
+        for key in keys:
+            self.remove(key)
+
+    def dump(self, path: str) -> None:
+        """
+        Writes the hash map to the same snapshot format as
+        hash_map_oa.HashMap.dump, tombstones included, so that either
+        class can load it.
+
+        :param path: Path of the file to write
+
+        :return: None
+        """
+        probe = getattr(self._probe, '__name__', None)
+
+        if PROBE_FUNCTIONS.get(probe) is not self._probe:
+            raise ValueError("Only maps using a probe function from "
+                             "PROBE_FUNCTIONS can be dumped")
+
+        states = self._states
+        positions = array('q', (pos for pos in range(self._capacity)
+                                if states[pos] != EMPTY))
+        live = [pos for pos in positions if states[pos] == FULL]
+
+        write_snapshot(path, OPEN_ADDRESSING, self._capacity_policy,
+                       self._capacity, function_name(self._hash_function),
+                       probe, positions,
+                       array('q', (self._hashes[pos] if states[pos] == FULL
+                                   else 0 for pos in positions)),
+                       [self._keys[pos] for pos in positions],
+                       [self._values[pos] for pos in live])
+
+    @classmethod
+    def load(cls, path: str, **kwargs) -> "CompactHashMap":
+        """
+        Restores a hash map written by dump, or by hash_map_oa.HashMap.
+        Entries are placed straight into their saved buckets without
+        rehashing, unless the hash function is not stable across
+        processes or the snapshot comes from a power of two table, in
+        which case every key is put again. Such a table's
+        triangular_probe is replaced with quadratic_probe, which suits
+        the prime table built here.
+
+        :param path: Path of the snapshot file
+        :param kwargs: Other constructor arguments, such as
+                       tombstone_ratio
+
+        :return: The restored hash map
+        """
+        snapshot = read_snapshot(path, OPEN_ADDRESSING)
+        capacity = snapshot['capacity']
+        probe = PROBE_FUNCTIONS[snapshot['probe']]
+
+        # Saved hashes of a power of two table went through its mixing
+        # wrapper, so they cannot be reused here
+        pow2 = snapshot['policy'] == 'pow2'
+        if probe is triangular_probe:
+            probe = quadratic_probe
+
+        hashMap = cls(capacity, snapshot['function'], probe=probe, **kwargs)
+
+        if pow2 or hashMap.get_capacity() != capacity or \
+                snapshot['function'] in UNSTABLE_HASH_FUNCTIONS:
+            keys = [key for key in snapshot['keys'] if key is not None]
+            hashMap.put_many(zip(keys, snapshot['values']))
+            return hashMap
+
+        values = iter(snapshot['values'])
+
+        for pos, keyHash, key in zip(snapshot['positions'],
+                                     snapshot['hashes'], snapshot['keys']):
+            if key is None:
+                hashMap._states[pos] = DELETED
+                hashMap._tombstones += 1
+            else:
+                hashMap._states[pos] = FULL
+                hashMap._hashes[pos] = keyHash
+                hashMap._keys[pos] = key
+                hashMap._values[pos] = next(values)
+                hashMap._size += 1
+
+        hashMap._version += 1
+        return hashMap
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+if __name__ == "__main__":
+
+    print("\nCompact - put example 1")
+    print("-----------------------")
+    m = CompactHashMap(53, hash_function_1)
+    for i in range(150):
+        m.put('str' + str(i), i * 100)
+        if i % 25 == 24:
+            print(m.empty_buckets(), round(m.table_load(), 2), m.get_size(), m.get_capacity())
+
+    print("\nCompact - remove example 1")
+    print("--------------------------")
+    m = CompactHashMap(11, hash_function_2)
+    for i in range(1, 10):
+        m.put(str(i), i * 10)
+    for i in range(1, 10, 2):
+        m.remove(str(i))
+    print(m.get_size(), m.get_capacity(), m.tombstone_count())
+    print(m.get_keys_and_values())
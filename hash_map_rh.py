@@ -0,0 +1,368 @@
+# Course: CS261 - Data Structures
+# Assignment: 6
+# Description: A Robin Hood variant of the open addressing hash map in
+#              hash_map_oa.py. Entries record how far they sit from their
+#              home bucket, inserts displace entries that are closer to
+#              home, and removals shift the following cluster back instead
+#              of leaving tombstones. Includes a basic test suite that runs
+#              when file is run as a script. Depends on hash_map_oa.py,
+#              hash_functions.py, snapshot.py and a6_include.py.
+
+
+import time
+
+from a6_include import (DynamicArray, HashEntry,
+                        hash_function_1, hash_function_2)
+from hash_functions import UNSTABLE_HASH_FUNCTIONS
+from hash_map_oa import HashMap, linear_probe
+from snapshot import OPEN_ADDRESSING, read_snapshot
+
+
+class RobinHoodEntry(HashEntry):
+    """
+    HashEntry that also records its probe sequence length, i.e.
+    the number of buckets between its home bucket and its address.
+    """
+
+    __slots__ = ('distance',)
+
+    def __init__(self, key: str, value: object, hash: int = None,
+                 distance: int = 0) -> None:
+        """Initialize an entry with its distance from home."""
+        super().__init__(key, value, hash)
+        self.distance = distance
+
+    def __str__(self) -> str:
+        """Override string method to provide more readable output."""
+        return f"K: {self.key} V: {self.value} D: {self.distance}"
+
+
+class RobinHoodHashMap(HashMap):
+    """
+    Represents an open addressing hash map that uses linear probing
+    with Robin Hood displacement and backward shift deletion. The
+    variance of probe lengths stays low, so the table can run at a
+    much higher load factor than quadratic probing allows. Never
+    holds tombstones.
+    """
+    # Lookups stop early by distance, not through a Bloom filter
+    _supports_bloom = False
+
+    def __init__(self,
+                 capacity: int,
+                 function,
+                 max_load: float = 0.9) -> None:
+        """
+        Initialize new HashMap that uses Robin Hood
+        linear probing for collision resolution
+
+        :param max_load: Load factor (0 < max_load < 1) that triggers
+                         doubling of the table on insert.
+        """
+        super().__init__(capacity, function, None, linear_probe)
+        self._max_load = max_load
+
+    def put(self, key: str, value: object) -> None:
+        """
+        Adds key/value pair to the hash map. If the key already exists
+        in the hash map, the value is updated. Entries closer to their
+        home bucket than the incoming entry are displaced further down
+        the cluster.
+
+        :param key: A string representing a hash key
+        :param value: Any object with implementations for comparison
+                      operators and string representation.
+
+        :return: None
+        """
+        if (self._size + 1) / self._capacity > self._max_load:
+            self.resize_table(2 * self._capacity)
+
+        probes = self._place(key, value, self._hash_function(key))
+
+        if self._stats is not None:
+            self._stats.record('put', probes)
+
+    def _place(self, key: str, value: object, keyHash: int) -> int:
+        """
+        Inserts or updates key without checking the load factor.
+
+        :return: The number of buckets visited
+        """
+        cap = self._capacity
+        address = keyHash % cap
+        distance = 0
+        entry = None
+        probes = 1
+
+        while True:
+            elem = self._buckets[address]
+
+            if elem is None:
+                if entry is None:
+                    entry = RobinHoodEntry(key, value, keyHash)
+                entry.distance = distance
+                self._buckets[address] = entry
+                self._size += 1
+                self._version += 1
+                return probes
+
+            # Keys are unique, so only the incoming key can match
+            if entry is None and elem.hash == keyHash and elem.key == key:
+                elem.value = value
+                return probes
+
+            # Rob the richer entry and carry it forward instead
+            if elem.distance < distance:
+                if entry is None:
+                    entry = RobinHoodEntry(key, value, keyHash)
+                entry.distance = distance
+                self._buckets[address] = entry
+                entry, distance = elem, elem.distance
+
+            distance += 1
+            probes += 1
+            address = (address + 1) % cap
+
+    def _find(self, key: str, op: str) -> int:
+        """
+        Records the number of buckets probed under op.
+
+        :return: Address of the entry with key, or None if the key is not
+                 in the hash map. Stops as soon as the probe has travelled
+                 further than the entry found at the current address.
+        """
+        if self._size == 0:
+            return None
+
+        cap = self._capacity
+        keyHash = self._hash_function(key)
+        address = keyHash % cap
+        distance = 0
+
+        while True:
+            elem = self._buckets[address]
+
+            if elem is None or elem.distance < distance:
+                if self._stats is not None:
+                    self._stats.record(op, distance + 1)
+                return None
+
+            if elem.hash == keyHash and elem.key == key:
+                if self._stats is not None:
+                    self._stats.record(op, distance + 1)
+                return address
+
+            distance += 1
+            address = (address + 1) % cap
+
+    def resize_table(self, new_capacity: int) -> None:
+        """
+        Resizes the hash table to the next smallest prime number
+        >= new_capacity that keeps the load factor <= max_load. Does
+        nothing if new_capacity is < current number of elements.
+
+        :param new_capacity: An integer >= 1 representing the minimum
+                             new hash table size.
+
+        :return: None
+        """
+        if new_capacity < self._size:
+            return
+
+        if self._stats is not None:
+            start = time.perf_counter()
+
+        newCap = self._next_capacity(
+            max(new_capacity, int(self._size / self._max_load) + 1))
+
+        oldBuckets = self._buckets
+        oldCap = self._capacity
+        self._capacity = newCap
+        self._buckets = DynamicArray()
+        self._size = 0
+        self._version += 1
+
+        for _ in range(newCap):
+            self._buckets.append(None)
+
+        for pos in range(oldCap):
+            elem = oldBuckets[pos]
+
+            if elem is not None:
+                self._place(elem.key, elem.value, elem.hash)
+
+        if self._stats is not None:
+            self._stats.record_resize(time.perf_counter() - start)
+
+    def get(self, key: str) -> object:
+        """
+        Gets the value associated with key in the hash map.
+
+        :param key: A string representing a hash key
+
+        :return: The object representing the value associated with the key
+                 if the key exists in the hash map.
+                 None otherwise.
+        """
+        address = self._find(key, 'get')
+
+        if address is None:
+            return None
+
+        return self._buckets[address].value
+
+    def contains_key(self, key: str) -> bool:
+        """
+        Determines if key is present in the hash map.
+
+        :param key: A string representing a hash key
+
+        :return: True if the key is in the hash map
+                 False otherwise
+        """
+        return self._find(key, 'contains_key') is not None
+
+    def remove(self, key: str) -> None:
+        """
+        Removes the entry with key from the hash map by shifting the
+        rest of its cluster back one bucket. Does nothing if the key
+        is not in the hash map.
+
+        :param key: A string representing a hash key
+
+        :return: None
+        """
+        address = self._find(key, 'remove')
+
+        if address is None:
+            return
+
+        cap = self._capacity
+        nextAddress = (address + 1) % cap
+
+        while True:
+            elem = self._buckets[nextAddress]
+
+            # Stop at a gap or an entry already in its home bucket
+            if elem is None or elem.distance == 0:
+                break
+
+            elem.distance -= 1
+            self._buckets[address] = elem
+            address, nextAddress = nextAddress, (nextAddress + 1) % cap
+
+        self._buckets[address] = None
+        self._size -= 1
+        self._version += 1
+
+    def put_many(self, pairs) -> None:
+        """
+        Adds every key/value pair in pairs, as calling put for each one
+        in order would, resizing at most once for the whole batch. Each
+        key is recorded in the stats as a put.
+
+        :param pairs: An iterable of (key, value) tuples
+
+        :return: None
+        """
+        pairs = pairs if isinstance(pairs, list) else list(pairs)
+        needed = self._size + len(pairs)
+
+        if needed / self._capacity > self._max_load:
+            self.resize_table(int(needed / self._max_load) + 1)
+
+        function = self._hash_function
+        stats = self._stats
+        for key, value in pairs:
+            probes = self._place(key, value, function(key))
+            if stats is not None:
+                stats.record('put', probes)
+
+    def get_many(self, keys) -> list:
+        """
+        :param keys: An iterable of string keys
+
+        :return: A list holding, for each key in order, its value or None
+                 if the key is not in the hash map
+        """
+        return [self.get(key) for key in keys]
+
+    def remove_many(self, keys) -> None:
+        """
+        Removes each key in keys that is present in the hash map.
+
+        :param keys: An iterable of string keys
+
+        :return: None
+        """
+        for key in keys:
+            self.remove(key)
+
+    @classmethod
+    def load(cls, path: str, **kwargs) -> "RobinHoodHashMap":
+        """
+        Restores a hash map written by dump. Entries are placed straight
+        into their saved buckets, their distances worked out from their
+        cached hashes, unless the snapshot's layout is not a Robin Hood
+        one or its hash function is not stable across processes, in
+        which case every key is put again.
+
+        :param path: Path of the snapshot file
+        :param kwargs: Other constructor arguments, such as max_load
+
+        :return: The restored hash map
+        """
+        snapshot = read_snapshot(path, OPEN_ADDRESSING)
+        capacity = snapshot['capacity']
+        hashMap = cls(capacity, snapshot['function'], **kwargs)
+        keys = snapshot['keys']
+        distances = {pos: (pos - keyHash % capacity) % capacity
+                     for pos, keyHash in zip(snapshot['positions'],
+                                             snapshot['hashes'])}
+
+        # Lookups stop early, so every entry away from home must follow
+        # one at least as far from its own home, less one bucket
+        robinHood = all(distances.get((pos - 1) % capacity, -1) >= d - 1
+                        for pos, d in distances.items() if d != 0)
+
+        if hashMap.get_capacity() != capacity or not robinHood or \
+                snapshot['probe'] != 'linear_probe' or None in keys or \
+                snapshot['function'] in UNSTABLE_HASH_FUNCTIONS:
+            keys = [key for key in keys if key is not None]
+            hashMap.put_many(zip(keys, snapshot['values']))
+            return hashMap
+
+        for pos, keyHash, key, value in zip(snapshot['positions'],
+                                            snapshot['hashes'], keys,
+                                            snapshot['values']):
+            hashMap._buckets[pos] = RobinHoodEntry(key, value, keyHash,
+                                                   distances[pos])
+
+        hashMap._size = len(keys)
+        hashMap._version += 1
+        return hashMap
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+if __name__ == "__main__":
+
+    print("\nRobin Hood - put example 1")
+    print("--------------------------")
+    m = RobinHoodHashMap(53, hash_function_1)
+    for i in range(150):
+        m.put('str' + str(i), i * 100)
+        if i % 25 == 24:
+            print(m.empty_buckets(), round(m.table_load(), 2), m.get_size(), m.get_capacity())
+
+    print("\nRobin Hood - remove example 1")
+    print("-----------------------------")
+    m = RobinHoodHashMap(11, hash_function_2)
+    for i in range(1, 10):
+        m.put(str(i), i * 10)
+    for i in range(1, 10, 2):
+        m.remove(str(i))
+    print(m.get_size(), m.get_capacity(), m.tombstone_count())
+    print(m.get_keys_and_values())
+    print(all(m.contains_key(str(i)) == (i % 2 == 0) for i in range(1, 10)))
@@ -6,38 +6,117 @@
 # Description: A class implementation of a chaining hash map ADT built
 #              from a dynamic array for the table and a linked list for
 #              buckets. Includes a basic test suite that runs when file
-#              is run as a script. Depends on a6_include.py.
+#              is run as a script. Depends on a6_include.py,
+#              bloom.py, hash_functions.py and snapshot.py.
 
 
-from a6_include import (DynamicArray, LinkedList,
+import os
+import time
+from array import array
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from itertools import islice
+
+from a6_include import (DynamicArray, LinkedList, SLNode, SortedChain,
                         hash_function_1, hash_function_2)
+from bloom import CountingBloomFilter
+from hash_functions import (UNSTABLE_HASH_FUNCTIONS, get_hash_function,
+                            with_mixing)
+from snapshot import (SEPARATE_CHAINING, function_name, read_snapshot,
+                      write_snapshot)
+from stats import OpStats, length_summary
+
+
+# Supported rules for choosing the number of buckets
+CAPACITY_POLICIES = ('prime', 'pow2')
+
+# A chain longer than this becomes a SortedChain, and a SortedChain no
+# longer than UNTREEIFY_THRESHOLD becomes a LinkedList again
+TREEIFY_THRESHOLD = 8
+UNTREEIFY_THRESHOLD = 6
 
 
 class HashMap:
     """
     Represents a hash map that handles collision with chaining
-    and maintains a prime number of buckets. Includes methods
+    and maintains a prime (or power of two) number of buckets.
+    A chain that grows past TREEIFY_THRESHOLD nodes is converted to
+    a SortedChain, so even a bucket full of colliding keys is searched
+    in logarithmic time. Includes methods
     to update and query contents as well as various helper
     functions. Depends on multiple classes and functions
     imported from a6_include.py.
     """
+    # Subclasses whose readers rely on LinkedList's single-assignment
+    # updates can turn long chain conversion off
+    _treeify_chains = True
+
+    # Subclasses whose lookups bypass the base chain searches, and so
+    # would never consult a Bloom filter, turn enable_bloom off
+    _supports_bloom = True
+
     def __init__(self,
                  capacity: int = 11,
-                 function: callable = hash_function_1) -> None:
+                 function: callable = hash_function_1,
+                 grow_load: float = None,
+                 shrink_load: float = None,
+                 capacity_policy: str = 'prime') -> None:
         """
         Initialize new HashMap that uses
         separate chaining for collision resolution
-        DO NOT CHANGE THIS METHOD IN ANY WAY
+
+        :param function: A hash function, or the name of one registered
+                         in hash_functions.HASH_FUNCTIONS
+        :param grow_load: Load factor above which the table doubles
+                          after an insert. None disables growing.
+        :param shrink_load: Load factor below which the table halves
+                            after a removal, never going below the
+                            initial capacity. None disables shrinking.
+                            Must be less than half of grow_load so a
+                            resize never immediately triggers another.
+        :param capacity_policy: 'prime' keeps a prime number of buckets.
+                                'pow2' keeps a power of two, skipping the
+                                prime search on resize, and mixes each
+                                hash so its low bits are well spread.
         """
+        if capacity_policy not in CAPACITY_POLICIES:
+            raise ValueError(f"capacity_policy must be one of "
+                             f"{CAPACITY_POLICIES}")
+
+        if grow_load is not None and shrink_load is not None and \
+                shrink_load >= grow_load / 2:
+            raise ValueError("shrink_load must be less than grow_load / 2")
+
         self._buckets = DynamicArray()
+        self._capacity_policy = capacity_policy
+
+        # Power of two tables find home buckets with a bit mask, not %
+        self._pow2 = capacity_policy == 'pow2'
 
-        # capacity must be a prime number
-        self._capacity = self._next_prime(capacity)
+        # capacity must be a prime number unless using powers of two
+        if capacity_policy == 'pow2':
+            self._capacity = self._next_capacity(capacity)
+        else:
+            self._capacity = self._next_prime(capacity)
         for _ in range(self._capacity):
             self._buckets.append(LinkedList())
 
-        self._hash_function = function
+        self._hash_function = get_hash_function(function)
+        if capacity_policy == 'pow2':
+            self._hash_function = with_mixing(self._hash_function)
         self._size = 0
+        self._version = 0
+
+        # Automatic resizing thresholds
+        self._grow_load = grow_load
+        self._shrink_load = shrink_load
+        self._min_capacity = self._capacity
+
+        # Operation counters, recorded only after enable_stats
+        self._stats = None
+
+        # Filter of key hashes, kept only after enable_bloom
+        self._bloom = None
+        self._bloom_error_rate = 0.01
 
     def __str__(self) -> str:
         """
@@ -82,6 +161,19 @@ class HashMap:
 
         return True
 
+    def _next_capacity(self, capacity: int) -> int:
+        """
+        :return: The smallest capacity >= given capacity allowed by the
+                 capacity policy: a prime or a power of two.
+        """
+        if self._capacity_policy == 'pow2':
+            return 1 << max(capacity - 1, 0).bit_length()
+
+        if self._is_prime(capacity):
+            return capacity
+
+        return self._next_prime(capacity)
+
     def get_size(self) -> int:
         """
         Return size of map
@@ -112,17 +204,102 @@ class HashMap:
         :return: None
         """
         # Determine hash and check chain for key
-        hashPos = self._hash_function(key) % self.get_capacity()
-        chain = self._buckets[hashPos]
-        node = chain.contains(key)
+        keyHash = self._hash_function(key)
+        cap = self._capacity
+        pos = keyHash & (cap - 1) if self._pow2 else keyHash % cap
+        chain = self._buckets[pos]
+        if self._stats is not None:
+            self._stats.record('put', chain.length())
+
+        node = chain.contains(key, keyHash)
 
         # Insert key/value pair or update value
         if node is None:
-            chain.insert(key, value)
+            chain.insert(key, value, keyHash)
+            if chain.length() > TREEIFY_THRESHOLD:
+                self._convert_chain(self._buckets, pos)
+            if self._bloom is not None:
+                self._bloom.add(keyHash)
             self._size += 1
+            self._version += 1
+
+            if self._grow_load is not None and \
+                    self._size / self._capacity > self._grow_load:
+                self.resize_table(2 * self._capacity)
         else:
             node.value = value
 
+    def increment(self, key: str, amount: int = 1) -> int:
+        """
+        Adds amount to the value associated with key, treating a missing
+        key as 0. Unlike a get followed by a put, the key is hashed and
+        its chain scanned only once.
+
+        :param key: A string representing a hash key
+        :param amount: Number to add to the value
+
+        :return: The new value
+        """
+        keyHash = self._hash_function(key)
+        cap = self._capacity
+        pos = keyHash & (cap - 1) if self._pow2 else keyHash % cap
+        chain = self._buckets[pos]
+        if self._stats is not None:
+            self._stats.record('increment', chain.length())
+
+        node = chain.contains(key, keyHash)
+
+        if node is not None:
+            node.value += amount
+            return node.value
+
+        chain.insert(key, amount, keyHash)
+        if chain.length() > TREEIFY_THRESHOLD:
+            self._convert_chain(self._buckets, pos)
+        if self._bloom is not None:
+            self._bloom.add(keyHash)
+        self._size += 1
+        self._version += 1
+
+        if self._grow_load is not None and \
+                self._size / self._capacity > self._grow_load:
+            self.resize_table(2 * self._capacity)
+
+        return amount
+
+    def _convert_chain(self, buckets: DynamicArray, pos: int) -> None:
+        """
+        Replaces the chain at pos in buckets with a SortedChain if it is
+        a LinkedList longer than TREEIFY_THRESHOLD, or with a LinkedList
+        if it is a SortedChain no longer than UNTREEIFY_THRESHOLD. The
+        nodes themselves are moved, not copied.
+
+        :return: None
+        """
+        chain = buckets[pos]
+        length = chain.length()
+
+        if type(chain) is SortedChain:
+            if length <= UNTREEIFY_THRESHOLD:
+                newChain = LinkedList()
+                for node in reversed(list(chain)):
+                    newChain.insert_node(node)
+                buckets[pos] = newChain
+        elif length > TREEIFY_THRESHOLD and self._treeify_chains:
+            buckets[pos] = SortedChain(chain)
+
+    def _shrink_if_sparse(self) -> None:
+        """
+        Halves the table if the load factor has dropped below
+        shrink_load, keeping at least the initial capacity.
+
+        :return: None
+        """
+        if self._shrink_load is not None and \
+                self._capacity > self._min_capacity and \
+                self._size / self._capacity < self._shrink_load:
+            self.resize_table(max(self._capacity // 2, self._min_capacity))
+
     def empty_buckets(self) -> int:
         """
         :return empty: Integer representing the number of empty
@@ -145,6 +322,110 @@ class HashMap:
         """
         return self.get_size() / self.get_capacity()
 
+    def enable_stats(self) -> None:
+        """
+        Starts recording, for every put, get, contains_key, remove and
+        increment, the length of the chain it searched, along with the
+        number and duration of resizes. Any earlier records are
+        discarded. While stats are disabled each operation only checks
+        that they are.
+
+        :return: None
+        """
+        self._stats = OpStats()
+
+    def disable_stats(self) -> None:
+        """
+        Stops recording operation stats.
+
+        :return: None
+        """
+        self._stats = None
+
+    def enable_bloom(self, error_rate: float = 0.01) -> None:
+        """
+        Starts keeping a counting Bloom filter of the key hashes, which
+        lets get, contains_key and get_many return for most missing keys
+        without searching a chain. The filter is sized for the table's
+        capacity at grow_load (1.0 if growing is disabled) and rebuilt
+        from the cached hashes whenever the table is resized. Raises
+        NotImplementedError on maps whose lookups would not consult it.
+
+        :param error_rate: Wanted false positive rate (0 < error_rate < 1)
+
+        :return: None
+        """
+        if not self._supports_bloom:
+            raise NotImplementedError(
+                f"{type(self).__name__} does not keep a Bloom filter")
+
+        self._bloom_error_rate = error_rate
+        self._rebuild_bloom()
+
+    def disable_bloom(self) -> None:
+        """
+        Stops keeping the Bloom filter.
+
+        :return: None
+        """
+        self._bloom = None
+
+    def _rebuild_bloom(self) -> None:
+        """
+        Replaces the Bloom filter with one sized for the current capacity
+        holding the cached hash of every node.
+
+        :return: None
+        """
+        bloom = self._empty_bloom()
+
+        for node in self._nodes():
+            bloom.add(node.hash)
+
+        self._bloom = bloom
+
+    def _empty_bloom(self) -> CountingBloomFilter:
+        """
+        :return: An empty Bloom filter sized for the current capacity at
+                 grow_load (1.0 if growing is disabled)
+        """
+        maxLoad = 1.0 if self._grow_load is None else self._grow_load
+        return CountingBloomFilter(
+            max(int(self._capacity * maxLoad), self._size),
+            self._bloom_error_rate)
+
+    def _chain_lengths(self):
+        """Generates the length of every chain."""
+        buckets = self._buckets
+
+        for pos in range(self._capacity):
+            yield buckets[pos].length()
+
+    def get_stats(self) -> dict:
+        """
+        :return: A dictionary describing the table: its size, capacity,
+                 load factor, number of empty buckets and a summary of
+                 chain lengths (max, mean over non-empty chains and a
+                 histogram). While stats are enabled it also holds the
+                 recorded operations, resizes and resize_seconds, and
+                 while the Bloom filter is kept a summary of it.
+        """
+        stats = {
+            'size': self.get_size(),
+            'capacity': self._capacity,
+            'load': self.table_load(),
+            'empty_buckets': self.empty_buckets(),
+            'chains': length_summary(self._chain_lengths()),
+        }
+
+        if self._stats is not None:
+            stats.update(self._stats.summary())
+
+        if self._bloom is not None:
+            stats['bloom'] = self._bloom.summary()
+
+        return stats
+
     def clear(self) -> None:
         """
         Clears the contents of the hash map.
@@ -160,12 +441,17 @@ class HashMap:
                 if bucket.length() != 0:
                     self._buckets[pos] = LinkedList()
 
+            if self._bloom is not None:
+                self._bloom.clear()
             self._size = 0
+            self._version += 1
 
     def resize_table(self, new_capacity: int) -> None:
         """
-        Resizes the hash table to the next smallest prime number
-        >= new_capacity. Does nothing if new_capacity is < 1.
+        Resizes the hash table to the next smallest prime number (or
+        power of two) >= new_capacity. Does nothing if new_capacity
+        is < 1. Nodes are redistributed by their cached hash, so keys
+        are not rehashed.
 
         :param new_capacity: An integer >= 1 representing the minimum
                              new hash table size.
@@ -173,40 +459,41 @@ class HashMap:
         :return: None
         """
         if new_capacity >= 1:
-            newBuckets = DynamicArray()
+            if self._stats is not None:
+                start = time.perf_counter()
 
-            # Capacity must be a prime number
-            if self._is_prime(new_capacity):
-                newCap = new_capacity
-            else:
-                newCap = self._next_prime(new_capacity)
+            newBuckets = DynamicArray()
+            newCap = self._next_capacity(new_capacity)
 
             for pos in range(newCap):
                 newBuckets.append(LinkedList())
 
-            # Rehash all elements
+            pow2, mask = self._pow2, newCap - 1
+
+            # Redistribute all elements; keys are already unique
             for pos in range(self._capacity):
                 chain = self._buckets[pos]
 
                 if chain.length() != 0:
                     for node in chain:
-                        key = node.key
-                        value = node.value
+                        keyHash = node.hash
+                        newPos = keyHash & mask if pow2 else keyHash % newCap
+                        newChain = newBuckets[newPos]
+                        newChain.insert(node.key, node.value, node.hash)
 
-                        # Determine hash and check chain for key
-                        hashPos = self._hash_function(key) % newCap
-                        newChain = newBuckets[hashPos]
-                        newNode = newChain.contains(key)
-
-                        # Insert key/value pair or update value
-                        if newNode is None:
-                            newChain.insert(key, value)
-                        else:
-                            newNode.value = value
+                        if newChain.length() == TREEIFY_THRESHOLD + 1:
+                            self._convert_chain(newBuckets, newPos)
 
             self._buckets = newBuckets
+            self._version += 1
             self._capacity = newCap
 
+            if self._bloom is not None:
+                self._rebuild_bloom()
+
+            if self._stats is not None:
+                self._stats.record_resize(time.perf_counter() - start)
+
     def get(self, key: str) -> object:
         """
         Gets the value associated with key in the hash map.
@@ -222,9 +509,20 @@ class HashMap:
             return None
 
         # Determine hash and check chain for key
-        hashPos = self._hash_function(key) % self.get_capacity()
-        chain = self._buckets[hashPos]
-        node = chain.contains(key)
+        keyHash = self._hash_function(key)
+        if self._bloom is not None and \
+                not self._bloom.might_contain(keyHash):
+            if self._stats is not None:
+                self._stats.record('get', 0)
+            return None
+
+        cap = self._capacity
+        pos = keyHash & (cap - 1) if self._pow2 else keyHash % cap
+        chain = self._buckets[pos]
+        if self._stats is not None:
+            self._stats.record('get', chain.length())
+
+        node = chain.contains(key, keyHash)
 
         if node is None:
             return None
@@ -245,9 +543,20 @@ class HashMap:
             return False
 
         # Determine hash and check chain for key
-        hashPos = self._hash_function(key) % self.get_capacity()
-        chain = self._buckets[hashPos]
-        node = chain.contains(key)
+        keyHash = self._hash_function(key)
+        if self._bloom is not None and \
+                not self._bloom.might_contain(keyHash):
+            if self._stats is not None:
+                self._stats.record('contains_key', 0)
+            return False
+
+        cap = self._capacity
+        pos = keyHash & (cap - 1) if self._pow2 else keyHash % cap
+        chain = self._buckets[pos]
+        if self._stats is not None:
+            self._stats.record('contains_key', chain.length())
+
+        node = chain.contains(key, keyHash)
 
         return node is not None
 
@@ -262,15 +571,22 @@ class HashMap:
         """
         # Don't search empty tables
         if self._size != 0:
-            # Determine hash and check chain for key
-            hashPos = self._hash_function(key) % self.get_capacity()
-            chain = self._buckets[hashPos]
-            node = chain.contains(key)
-
-            # Remove key/value pair
-            if node is not None:
-                chain.remove(key)
+            # Determine hash and remove key/value pair from chain
+            keyHash = self._hash_function(key)
+            cap = self._capacity
+            pos = keyHash & (cap - 1) if self._pow2 else keyHash % cap
+            chain = self._buckets[pos]
+            if self._stats is not None:
+                self._stats.record('remove', chain.length())
+
+            if chain.remove(key, keyHash):
+                if chain.length() == UNTREEIFY_THRESHOLD:
+                    self._convert_chain(self._buckets, pos)
+                if self._bloom is not None:
+                    self._bloom.discard(keyHash)
                 self._size -= 1
+                self._version += 1
+                self._shrink_if_sparse()
 
     def get_keys_and_values(self) -> DynamicArray:
         """
@@ -295,54 +611,743 @@ class HashMap:
 
         return elements
 
-def find_mode(da: DynamicArray) -> (DynamicArray, int):
+    def _nodes(self):
+        """
+        Generates every node in the hash map without copying them.
+        Raises RuntimeError if the hash map gains or loses keys, or is
+        resized, while the generator is in use.
+        """
+        version = self._version
+        buckets = self._buckets
+
+        for pos in range(self._capacity):
+            for node in buckets[pos]:
+                yield node
+
+                if self._version != version:
+                    raise RuntimeError("HashMap changed during iteration")
+
+    def keys(self):
+        """Generates every key in the hash map."""
+        for node in self._nodes():
+            yield node.key
+
+    def values(self):
+        """Generates every value in the hash map."""
+        for node in self._nodes():
+            yield node.value
+
+    def items(self):
+        """Generates every (key, value) pair in the hash map."""
+        for node in self._nodes():
+            yield node.key, node.value
+
+    def __iter__(self):
+        """Iterate over the keys of the hash map."""
+        return self.keys()
+
+    def put_many(self, pairs) -> None:
+        """
+        Adds every key/value pair in pairs, as calling put for each one
+        in order would. Keys are hashed in a single pass and the table
+        is resized at most once, up front, to keep the load factor at
+        or below grow_load (1.0 if growing is disabled) for the batch.
+        Each key is recorded in the stats as a put.
+
+        :param pairs: An iterable of (key, value) tuples
+
+        :return: None
+        """
+        pairs = pairs if isinstance(pairs, list) else list(pairs)
+        function = self._hash_function
+        hashes = [function(key) for key, _ in pairs]
+
+        maxLoad = 1.0 if self._grow_load is None else self._grow_load
+        needed = int((self._size + len(pairs)) / maxLoad) + 1
+        if needed > self._capacity:
+            self.resize_table(needed)
+
+        buckets = self._buckets
+        chainAt = buckets.get_at_index
+        cap = self._capacity
+        pow2, mask = self._pow2, cap - 1
+        bloom = self._bloom
+        stats = self._stats
+        added = 0
+
+        for (key, value), keyHash in zip(pairs, hashes):
+            pos = keyHash & mask if pow2 else keyHash % cap
+            chain = chainAt(pos)
+            if stats is not None:
+                stats.record('put', chain.length())
+
+            node = chain.contains(key, keyHash)
+
+            if node is None:
+                chain.insert(key, value, keyHash)
+                if chain.length() > TREEIFY_THRESHOLD:
+                    self._convert_chain(buckets, pos)
+                if bloom is not None:
+                    bloom.add(keyHash)
+                added += 1
+            else:
+                node.value = value
+
+        self._size += added
+        self._version += 1
+
+    def get_many(self, keys) -> list:
+        """
+        Gets the values associated with each key in keys.
+
+        :param keys: An iterable of string keys
+
+        :return: A list holding, for each key in order, its value or None
+                 if the key is not in the hash map
+        """
+        function = self._hash_function
+        chainAt = self._buckets.get_at_index
+        cap = self._capacity
+        pow2, mask = self._pow2, cap - 1
+        bloom = self._bloom
+        stats = self._stats
+        values = []
+
+        for key in keys:
+            keyHash = function(key)
+            if bloom is not None and not bloom.might_contain(keyHash):
+                if stats is not None:
+                    stats.record('get', 0)
+                values.append(None)
+                continue
+
+            pos = keyHash & mask if pow2 else keyHash % cap
+            chain = chainAt(pos)
+            if stats is not None:
+                stats.record('get', chain.length())
+
+            node = chain.contains(key, keyHash)
+            values.append(None if node is None else node.value)
+
+        return values
+
+    def remove_many(self, keys) -> None:
+        """
+        Removes each key in keys that is present in the hash map. The
+        table is shrunk at most once, after the whole batch.
+
+        :param keys: An iterable of string keys
+
+        :return: None
+        """
+        function = self._hash_function
+        buckets = self._buckets
+        chainAt = buckets.get_at_index
+        cap = self._capacity
+        pow2, mask = self._pow2, cap - 1
+        bloom = self._bloom
+        stats = self._stats
+        removed = 0
+
+        for key in keys:
+            keyHash = function(key)
+            pos = keyHash & mask if pow2 else keyHash % cap
+            chain = chainAt(pos)
+            if stats is not None:
+                stats.record('remove', chain.length())
+
+            if chain.remove(key, keyHash):
+                if chain.length() == UNTREEIFY_THRESHOLD:
+                    self._convert_chain(buckets, pos)
+                if bloom is not None:
+                    bloom.discard(keyHash)
+                removed += 1
+
+        self._size -= removed
+        self._version += 1
+        self._shrink_if_sparse()
+
+    def dump(self, path: str) -> None:
+        """
+        Writes the hash map to a snapshot file at path: its capacity,
+        hash function name and, for every node, its bucket, cached hash,
+        key and value. Values are pickled.
+
+        :param path: Path of the file to write
+
+        :return: None
+        """
+        positions, hashes = array('q'), array('q')
+        keys, values = [], []
+
+        for pos in range(self._capacity):
+            for node in self._buckets[pos]:
+                positions.append(pos)
+                hashes.append(node.hash)
+                keys.append(node.key)
+                values.append(node.value)
+
+        write_snapshot(path, SEPARATE_CHAINING, self._capacity_policy,
+                       self._capacity, function_name(self._hash_function),
+                       '', positions, hashes, keys, values)
+
+    @classmethod
+    def load(cls, path: str, **kwargs) -> "HashMap":
+        """
+        Restores a hash map written by dump. Nodes are placed straight
+        into their saved buckets, in their saved chain order, without
+        rehashing, unless the hash function is not stable across
+        processes, in which case every key is put again.
+
+        :param path: Path of the snapshot file
+        :param kwargs: Other constructor arguments, such as grow_load
+
+        :return: The restored hash map
+        """
+        snapshot = read_snapshot(path, SEPARATE_CHAINING)
+        capacity = snapshot['capacity']
+        hashMap = cls(capacity, snapshot['function'],
+                      capacity_policy=snapshot['policy'], **kwargs)
+
+        if hashMap.get_capacity() != capacity:
+            hashMap.resize_table(capacity)
+
+        keys, values = snapshot['keys'], snapshot['values']
+
+        if snapshot['function'] in UNSTABLE_HASH_FUNCTIONS:
+            hashMap.put_many(zip(keys, values))
+            return hashMap
+
+        hashMap._restore(snapshot['positions'], snapshot['hashes'],
+                         keys, values)
+        hashMap._size = len(keys)
+        hashMap._version += 1
+        return hashMap
+
+    def _restore(self, positions, hashes, keys, values) -> None:
+        """
+        Places the nodes of a snapshot straight into their saved buckets
+        of this empty hash map, in their saved chain order.
+
+        :return: None
+        """
+        buckets = self._buckets
+        chainAt = buckets.get_at_index
+
+        # insert adds at the front, so go backwards to keep chain order
+        for i in range(len(keys) - 1, -1, -1):
+            chain = chainAt(positions[i])
+            chain.insert(keys[i], values[i], hashes[i])
+
+            if chain.length() == TREEIFY_THRESHOLD + 1:
+                self._convert_chain(buckets, positions[i])
+
+
+class IncrementalHashMap(HashMap):
+    """
+    Represents a chaining hash map that resizes incrementally. During a
+    resize the old and new bucket arrays are both kept, every operation
+    moves a bounded number of old chains into the new array, and
+    lookups consult both arrays until the migration completes.
+    """
+    def __init__(self,
+                 capacity: int = 11,
+                 function: callable = hash_function_1,
+                 grow_load: float = None,
+                 shrink_load: float = None,
+                 capacity_policy: str = 'prime',
+                 migration_step: int = 16) -> None:
+        """
+        Initialize new HashMap that uses separate chaining for collision
+        resolution and migrates migration_step chains per operation
+        while a resize is in progress
+        """
+        super().__init__(capacity, function, grow_load, shrink_load,
+                         capacity_policy)
+        self._migration_step = migration_step
+
+        # Old bucket array and next chain to move while resizing
+        self._old_buckets = None
+        self._old_capacity = 0
+        self._migrate_pos = 0
+
+        # Bloom filter of the old array while resizing; _bloom then only
+        # covers the new array
+        self._old_bloom = None
+
+    def __str__(self) -> str:
+        """Override string method to provide more readable output."""
+        self._finish_migration()
+        return super().__str__()
+
+    def is_resizing(self) -> bool:
+        """
+        :return: True if chains are still being moved to a new table
+                 False otherwise
+        """
+        return self._old_buckets is not None
+
+    def _migrate(self) -> None:
+        """
+        Moves the next migration_step chains of the old array into the
+        new array.
+
+        :return: None
+        """
+        oldBuckets = self._old_buckets
+
+        if oldBuckets is None:
+            return
+
+        cap = self._capacity
+        pow2, mask = self._pow2, cap - 1
+        bloom = self._bloom
+        start = self._migrate_pos
+        end = min(start + self._migration_step, self._old_capacity)
+
+        for pos in range(start, end):
+            chain = oldBuckets[pos]
+
+            if chain.length() != 0:
+                for node in chain:
+                    keyHash = node.hash
+                    newPos = keyHash & mask if pow2 else keyHash % cap
+                    newChain = self._buckets[newPos]
+                    newChain.insert(node.key, node.value, node.hash)
+
+                    if newChain.length() > TREEIFY_THRESHOLD:
+                        self._convert_chain(self._buckets, newPos)
+                    if bloom is not None:
+                        bloom.add(node.hash)
+
+            oldBuckets[pos] = None
+
+        self._migrate_pos = end
+
+        if end == self._old_capacity:
+            self._old_buckets = None
+            self._old_capacity = 0
+            self._migrate_pos = 0
+            self._old_bloom = None
+
+    def _finish_migration(self) -> None:
+        """
+        Moves all remaining old chains into the new array.
+
+        :return: None
+        """
+        while self._old_buckets is not None:
+            self._migrate()
+
+    def _old_chain(self, keyHash: int) -> LinkedList:
+        """
+        :return: The chain of the old array that may still hold a key with
+                 keyHash, or None if there is no such chain.
+        """
+        if self._old_buckets is None:
+            return None
+
+        oldCap = self._old_capacity
+        pos = keyHash & (oldCap - 1) if self._pow2 else keyHash % oldCap
+
+        if pos < self._migrate_pos:
+            return None
+
+        return self._old_buckets[pos]
+
+    def _lookup(self, key: str, op: str) -> SLNode:
+        """
+        Advances any migration, then searches the new array followed by
+        the old one. Records the length of the chains searched under op.
+
+        :return: The node with key, or None if the key is not in the
+                 hash map.
+        """
+        self._migrate()
+
+        if self._size == 0:
+            return None
+
+        keyHash = self._hash_function(key)
+        bloom = self._bloom
+        node = None
+        searched = 0
+
+        if bloom is None or bloom.might_contain(keyHash):
+            cap = self._capacity
+            pos = keyHash & (cap - 1) if self._pow2 else keyHash % cap
+            chain = self._buckets[pos]
+            searched = chain.length()
+            node = chain.contains(key, keyHash)
+
+        if node is None:
+            chain = self._old_chain(keyHash)
+
+            if chain is not None and \
+                    (bloom is None or self._old_bloom.might_contain(keyHash)):
+                searched += chain.length()
+                node = chain.contains(key, keyHash)
+
+        if self._stats is not None:
+            self._stats.record(op, searched)
+
+        return node
+
+    def put(self, key: str, value: object) -> None:
+        """
+        Adds key/value pair to the hash map. If the key already exists in
+        either bucket array, the value is updated where it is.
+
+        :param key: A string representing a hash key
+        :param value: Any object with implementations for comparison
+                      operators and string representation.
+
+        :return: None
+        """
+        self._migrate()
+
+        if self._old_buckets is not None:
+            keyHash = self._hash_function(key)
+            chain = self._old_chain(keyHash)
+
+            if chain is not None:
+                node = chain.contains(key, keyHash)
+
+                if node is not None:
+                    if self._stats is not None:
+                        self._stats.record('put', chain.length())
+                    node.value = value
+                    return
+
+        super().put(key, value)
+
+    def increment(self, key: str, amount: int = 1) -> int:
+        """
+        Adds amount to the value associated with key, treating a missing
+        key as 0, updating the value where it is if the key is still in
+        the old bucket array.
+
+        :return: The new value
+        """
+        self._migrate()
+
+        if self._old_buckets is not None:
+            keyHash = self._hash_function(key)
+            chain = self._old_chain(keyHash)
+
+            if chain is not None:
+                node = chain.contains(key, keyHash)
+
+                if node is not None:
+                    if self._stats is not None:
+                        self._stats.record('increment', chain.length())
+                    node.value += amount
+                    return node.value
+
+        return super().increment(key, amount)
+
+    def empty_buckets(self) -> int:
+        """
+        :return: Integer representing the number of empty
+                 buckets in the hash table, once any resize completes.
+        """
+        self._finish_migration()
+        return super().empty_buckets()
+
+    def clear(self) -> None:
+        """
+        Clears the contents of the hash map, abandoning any resize.
+
+        :return: None
+        """
+        self._old_buckets = None
+        self._old_capacity = 0
+        self._migrate_pos = 0
+        self._old_bloom = None
+        super().clear()
+
+    def resize_table(self, new_capacity: int) -> None:
+        """
+        Starts moving chains into a table of the next smallest prime
+        number (or power of two) >= new_capacity. Any resize already in
+        progress is completed first. Does nothing if new_capacity is < 1.
+        Only the time taken to start the resize is recorded in the stats,
+        since the chains are moved by later operations.
+
+        :param new_capacity: An integer >= 1 representing the minimum
+                             new hash table size.
+
+        :return: None
+        """
+        if new_capacity < 1:
+            return
+
+        self._finish_migration()
+
+        if self._stats is not None:
+            start = time.perf_counter()
+
+        newCap = self._next_capacity(new_capacity)
+
+        if self._size != 0:
+            self._old_buckets = self._buckets
+            self._old_capacity = self._capacity
+            self._migrate_pos = 0
+            self._old_bloom = self._bloom
+
+        self._buckets = DynamicArray([LinkedList() for _ in range(newCap)])
+        self._version += 1
+        self._capacity = newCap
+
+        # Migrated and new keys go to a filter sized for the new array
+        if self._bloom is not None:
+            self._bloom = self._empty_bloom()
+
+        if self._stats is not None:
+            self._stats.record_resize(time.perf_counter() - start)
+
+    def get(self, key: str) -> object:
+        """
+        Gets the value associated with key in the hash map.
+
+        :param key: A string representing a hash key
+
+        :return: The object representing the value associated with the key
+                 if the key exists in the hash map.
+                 None otherwise.
+        """
+        node = self._lookup(key, 'get')
+
+        if node is None:
+            return None
+
+        return node.value
+
+    def contains_key(self, key: str) -> bool:
+        """
+        Determines if key is present in the hash map.
+
+        :param key: A string representing a hash key
+
+        :return: True if the key is in the hash map
+                 False otherwise
+        """
+        return self._lookup(key, 'contains_key') is not None
+
+    def remove(self, key: str) -> None:
+        """
+        Removes the node with key from whichever bucket array holds it.
+        Does nothing if the key is not in the hash map.
+
+        :param key: A string representing a hash key
+
+        :return: None
+        """
+        self._migrate()
+
+        if self._size == 0:
+            return
+
+        keyHash = self._hash_function(key)
+        cap = self._capacity
+        pos = keyHash & (cap - 1) if self._pow2 else keyHash % cap
+        chain = self._buckets[pos]
+        bloom = self._bloom
+        searched = chain.length()
+        removed = chain.remove(key, keyHash)
+
+        if removed and chain.length() == UNTREEIFY_THRESHOLD:
+            self._convert_chain(self._buckets, pos)
+
+        if not removed:
+            chain = self._old_chain(keyHash)
+            if chain is not None:
+                searched += chain.length()
+            removed = chain is not None and chain.remove(key, keyHash)
+            bloom = self._old_bloom if bloom is not None else None
+
+        if self._stats is not None:
+            self._stats.record('remove', searched)
+
+        if removed:
+            if bloom is not None:
+                bloom.discard(keyHash)
+            self._size -= 1
+            self._version += 1
+            self._shrink_if_sparse()
+
+    def get_keys_and_values(self) -> DynamicArray:
+        """
+        Creates a DynamicArray containing tuples of all key/value
+        pairs in the hash map, once any resize completes.
+
+        :return elements: A DynamicArray as described above.
+        """
+        self._finish_migration()
+        return super().get_keys_and_values()
+
+    def _nodes(self):
+        """
+        Generates every node in the hash map, once any resize completes.
+        """
+        self._finish_migration()
+        yield from super()._nodes()
+
+    def dump(self, path: str) -> None:
+        """
+        Completes any resize, then writes the hash map to a snapshot
+        file at path.
+
+        :return: None
+        """
+        self._finish_migration()
+        super().dump(path)
+
+    def put_many(self, pairs) -> None:
+        """
+        Adds every key/value pair in pairs with put, so that each insert
+        still only advances the migration by a bounded amount.
+
+        :param pairs: An iterable of (key, value) tuples
+
+        :return: None
+        """
+        for key, value in pairs:
+            self.put(key, value)
+
+    def get_many(self, keys) -> list:
+        """
+        :param keys: An iterable of string keys
+
+        :return: A list holding, for each key in order, its value or None
+                 if the key is not in the hash map
+        """
+        return [self.get(key) for key in keys]
+
+    def remove_many(self, keys) -> None:
+        """
+        Removes each key in keys that is present in the hash map.
+
+        :param keys: An iterable of string keys
+
+        :return: None
+        """
+        for key in keys:
+            self.remove(key)
+
+
+def count_items(items, hash_map: HashMap = None) -> HashMap:
+    """
+    Counts the occurrences of each element of items with one probe per
+    element. items may be any iterable, including a generator reading
+    a stream too large to hold in memory.
+
+    :param items: An iterable of strings
+    :param hash_map: Map to add the counts to. Defaults to a new
+                     HashMap that grows at a load factor of 1.0.
+
+    :return: The map from each element to its number of occurrences
+    """
+    if hash_map is None:
+        hash_map = HashMap(grow_load=1.0)
+
+    increment = hash_map.increment
+    for item in items:
+        increment(item)
+
+    return hash_map
+
+
+def _modes(counts: HashMap) -> (DynamicArray, int):
+    """
+    :return: A tuple of a DynamicArray of the keys with the largest
+             count in counts and that count
+    """
+    maxFreq = max(counts.values(), default=0)
+    modes = DynamicArray()
+
+    for key, count in counts.items():
+        if count == maxFreq:
+            modes.append(key)
+
+    return modes, maxFreq
+
+
+def find_mode(da, function: callable = hash_function_1) -> (DynamicArray, int):
     """
     Creates a tuple in which the first value is a DynamicArray
     of all mode values in da and the second value is an integer
     representing their frequency. Depends on the HashMap class.
 
-    :param da: A DynamicArray containing at least one element
-               in which all elements are strings.
+    :param da: A DynamicArray, or any other iterable, containing at
+               least one element in which all elements are strings.
+    :param function: Hash function used for counting
 
     :return: A tuple as described above
     """
     # if you'd like to use a hash map,
     # use this instance of your Separate Chaining HashMap
-    map = HashMap()
-    mapSize = map.get_capacity()
-    maxFreq = 0
-    modes = DynamicArray()
+    map = HashMap(function=function, grow_load=1.0)
 
-    # Resize table for performance
-    if da.length() / mapSize > 1:
-        map.resize_table(mapSize)
+    return _modes(count_items(da, map))
 
-    # Build hash map where keys are da elements and
-    # values are their respective number of occurrences
-    for pos in range(da.length()):
-        key = da[pos]
-        count = map.get(key)
 
-        if count is None:
-            count = 1
-        else:
-            count += 1
+def _count_chunk(chunk: list, function) -> list:
+    """
+    Counts one chunk in a worker process.
 
-        map.put(key, count)
+    :return: A list of (element, count) pairs
+    """
+    return list(count_items(chunk, HashMap(function=function,
+                                           grow_load=1.0)).items())
 
-        if count > maxFreq:
-            maxFreq = count
 
-    # Get all counts and populate array of modes
-    mapValues = map.get_keys_and_values()
+def find_mode_parallel(items,
+                       chunk_size: int = 1 << 20,
+                       workers: int = None,
+                       function='crc32') -> (DynamicArray, int):
+    """
+    find_mode for large inputs. items is read in chunks of chunk_size
+    elements, each chunk is counted in a worker process, and the
+    partial counts are merged into one HashMap as they arrive. At most
+    two chunks per worker are in flight, so items may be a stream.
+
+    :param items: A DynamicArray, or any other iterable, of strings
+    :param chunk_size: Number of elements counted per task
+    :param workers: Number of worker processes, defaulting to the
+                    number of CPUs
+    :param function: Name of a registered hash function, since the
+                     workers must be able to look it up
+
+    :return: A tuple of a DynamicArray of all modes and their frequency
+    """
+    workers = workers or os.cpu_count() or 1
+    counts = HashMap(function=function, grow_load=1.0)
+    increment = counts.increment
+    iterator = iter(items)
+    pending = set()
 
-    for pos in range(mapValues.length()):
-        pair = mapValues[pos]
+    def merge(futures) -> None:
+        for future in futures:
+            for key, count in future.result():
+                increment(key, count)
 
-        if pair[1] == maxFreq:
-            modes.append(pair[0])
+    with ProcessPoolExecutor(workers) as pool:
+        chunk = list(islice(iterator, chunk_size))
+
+        while chunk:
+            pending.add(pool.submit(_count_chunk, chunk, function))
+
+            if len(pending) >= 2 * workers:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                merge(done)
+
+            chunk = list(islice(iterator, chunk_size))
+
+        merge(pending)
+
+    return _modes(counts)
 
-    return modes, maxFreq
 
 # ------------------- BASIC TESTING ---------------------------------------- #
 
@@ -0,0 +1,555 @@
+# Course: CS261 - Data Structures
+# Assignment: 6
+# Description: A compact variant of the chaining hash map in
+#              hash_map_sc.py. There are no node or linked list objects:
+#              an empty bucket is None and a used one is a single flat
+#              list of its entries' cached hashes, keys and values, so
+#              lookups scan the hashes at C speed instead of following
+#              next references. Includes a basic test suite that runs
+#              when file is run as a script. Depends on hash_map_sc.py,
+#              snapshot.py and a6_include.py.
+
+
+import time
+from array import array
+
+from a6_include import DynamicArray, hash_function_1, hash_function_2
+from hash_map_sc import HashMap
+from snapshot import SEPARATE_CHAINING, function_name, write_snapshot
+
+
+def _find(bucket: list, key: str, keyHash: int) -> int:
+    """
+    :return: Index of the entry with key among the entries of bucket, or
+             -1 if the key is not in the bucket. Only keys whose cached
+             hash matches are compared.
+    """
+    count = len(bucket) // 3
+    index = 0
+
+    try:
+        while True:
+            index = bucket.index(keyHash, index, count)
+
+            if bucket[count + index] == key:
+                return index
+
+            index += 1
+    except ValueError:
+        return -1
+
+
+def _append(bucket: list, keyHash: int, key: str, value: object) -> None:
+    """
+    Adds an entry to the end of each section of bucket.
+
+    :return: None
+    """
+    count = len(bucket) // 3
+
+    # Fill from the back so the earlier section boundaries stay put
+    bucket.append(value)
+    bucket.insert(2 * count, key)
+    bucket.insert(count, keyHash)
+
+
+def _delete(bucket: list, index: int) -> None:
+    """
+    Removes the entry at index from every section of bucket.
+
+    :return: None
+    """
+    count = len(bucket) // 3
+
+    del bucket[2 * count + index]
+    del bucket[count + index]
+    del bucket[index]
+
+
+class CompactHashMap(HashMap):
+    """
+    Represents a chaining hash map with the same interface and resizing
+    rules as hash_map_sc.HashMap, but without per-entry objects. Each
+    bucket is None while empty. Otherwise it is one list of 3 * n items
+    for its n entries: their cached hashes, then their keys, then their
+    values, so the entry at index i has its hash at i, its key at n + i
+    and its value at 2n + i.
+    """
+    # Lookups search the flat-list buckets, not a Bloom filter
+    _supports_bloom = False
+
+    def __init__(self,
+                 capacity: int = 11,
+                 function: callable = hash_function_1,
+                 grow_load: float = None,
+                 shrink_load: float = None,
+                 capacity_policy: str = 'prime') -> None:
+        """
+        Initialize new HashMap that uses separate chaining for collision
+        resolution and flat lists for buckets
+        """
+        super().__init__(capacity, function, grow_load, shrink_load,
+                         capacity_policy)
+        self._buckets = [None] * self._capacity
+
+    def __str__(self) -> str:
+        """Override string method to provide more readable output."""
+        out = ''
+        for i in range(self._capacity):
+            bucket = self._buckets[i]
+
+            if bucket is None:
+                out += str(i) + ': None\n'
+                continue
+
+            count = len(bucket) // 3
+            out += str(i) + ': ' + ' -> '.join(
+                f"({bucket[count + index]}: {bucket[2 * count + index]})"
+                for index in range(count)) + '\n'
+        return out
+
+    def _grow_if_loaded(self) -> None:
+        """
+        Doubles the table if the load factor is above grow_load.
+
+        :return: None
+        """
+        if self._grow_load is not None and \
+                self._size / self._capacity > self._grow_load:
+            self.resize_table(2 * self._capacity)
+
+    def put(self, key: str, value: object) -> None:
+        """
+        Adds key/value pair to the hash map. If the key already exists in
+        the hash map, the value is updated.
+
+        :param key: A string representing a hash key
+        :param value: Any object with implementations for comparison
+                      operators and string representation.
+
+        :return: None
+        """
+        keyHash = self._hash_function(key)
+        pos = keyHash % self._capacity
+        bucket = self._buckets[pos]
+        if self._stats is not None:
+            self._stats.record('put', len(bucket) // 3 if bucket else 0)
+
+        if bucket is None:
+            self._buckets[pos] = [keyHash, key, value]
+        else:
+            index = _find(bucket, key, keyHash)
+
+            if index >= 0:
+                bucket[2 * (len(bucket) // 3) + index] = value
+                return
+
+            _append(bucket, keyHash, key, value)
+
+        self._size += 1
+        self._version += 1
+        self._grow_if_loaded()
+
+    def increment(self, key: str, amount: int = 1) -> int:
+        """
+        Adds amount to the value associated with key, treating a missing
+        key as 0. The key is hashed and its bucket scanned only once.
+
+        :param key: A string representing a hash key
+        :param amount: Number to add to the value
+
+        :return: The new value
+        """
+        keyHash = self._hash_function(key)
+        pos = keyHash % self._capacity
+        bucket = self._buckets[pos]
+        if self._stats is not None:
+            self._stats.record('increment', len(bucket) // 3 if bucket else 0)
+
+        if bucket is None:
+            self._buckets[pos] = [keyHash, key, amount]
+        else:
+            index = _find(bucket, key, keyHash)
+
+            if index >= 0:
+                address = 2 * (len(bucket) // 3) + index
+                bucket[address] += amount
+                return bucket[address]
+
+            _append(bucket, keyHash, key, amount)
+
+        self._size += 1
+        self._version += 1
+        self._grow_if_loaded()
+        return amount
+
+    def empty_buckets(self) -> int:
+        """
+        :return empty: Integer representing the number of empty
+                       buckets in the hash table.
+        """
+        return self._buckets.count(None)
+
+    def _chain_lengths(self):
+        """Generates the number of entries in every bucket."""
+        for bucket in self._buckets:
+            yield len(bucket) // 3 if bucket else 0
+
+    def clear(self) -> None:
+        """
+        Clears the contents of the hash map.
+
+        :return: None
+        """
+        if self._size != 0:
+            self._buckets = [None] * self._capacity
+            self._size = 0
+            self._version += 1
+
+    def resize_table(self, new_capacity: int) -> None:
+        """
+        Resizes the hash table to the next smallest prime number (or
+        power of two) >= new_capacity, placing entries by their cached
+        hash. Does nothing if new_capacity is < 1.
+
+        :param new_capacity: An integer >= 1 representing the minimum
+                             new hash table size.
+
+        :return: None
+        """
+        if new_capacity < 1:
+            return
+
+        if self._stats is not None:
+            start = time.perf_counter()
+
+        newCap = self._next_capacity(new_capacity)
+        newBuckets = [None] * newCap
+
+        for bucket in self._buckets:
+            if bucket is None:
+                continue
+
+            count = len(bucket) // 3
+
+            for index in range(count):
+                keyHash = bucket[index]
+                key = bucket[count + index]
+                value = bucket[2 * count + index]
+                newPos = keyHash % newCap
+                newBucket = newBuckets[newPos]
+
+                if newBucket is None:
+                    newBuckets[newPos] = [keyHash, key, value]
+                else:
+                    _append(newBucket, keyHash, key, value)
+
+        self._buckets = newBuckets
+        self._version += 1
+        self._capacity = newCap
+
+        if self._stats is not None:
+            self._stats.record_resize(time.perf_counter() - start)
+
+    def get(self, key: str) -> object:
+        """
+        Gets the value associated with key in the hash map.
+
+        :param key: A string representing a hash key
+
+        :return: The object representing the value associated with the key
+                 if the key exists in the hash map.
+                 None otherwise.
+        """
+        if self._size == 0:
+            return None
+
+        keyHash = self._hash_function(key)
+        bucket = self._buckets[keyHash % self._capacity]
+        if self._stats is not None:
+            self._stats.record('get', len(bucket) // 3 if bucket else 0)
+
+        if bucket is None:
+            return None
+
+        index = _find(bucket, key, keyHash)
+
+        if index < 0:
+            return None
+
+        return bucket[2 * (len(bucket) // 3) + index]
+
+    def contains_key(self, key: str) -> bool:
+        """
+        Determines if key is present in the hash map.
+
+        :param key: A string representing a hash key
+
+        :return: True if the key is in the hash map
+                 False otherwise
+        """
+        if self._size == 0:
+            return False
+
+        keyHash = self._hash_function(key)
+        bucket = self._buckets[keyHash % self._capacity]
+        if self._stats is not None:
+            self._stats.record('contains_key',
+                               len(bucket) // 3 if bucket else 0)
+
+        return bucket is not None and _find(bucket, key, keyHash) >= 0
+
+    def remove(self, key: str) -> None:
+        """
+        Removes key and its value from the hash map. Does nothing if the
+        key is not in the hash map.
+
+        :param key: A string representing a hash key
+
+        :return: None
+        """
+        if self._size == 0:
+            return
+
+        keyHash = self._hash_function(key)
+        pos = keyHash % self._capacity
+        bucket = self._buckets[pos]
+        if self._stats is not None:
+            self._stats.record('remove', len(bucket) // 3 if bucket else 0)
+
+        if bucket is None:
+            return
+
+        index = _find(bucket, key, keyHash)
+
+        if index < 0:
+            return
+
+        if len(bucket) == 3:
+            self._buckets[pos] = None
+        else:
+            _delete(bucket, index)
+
+        self._size -= 1
+        self._version += 1
+        self._shrink_if_sparse()
+
+    def get_keys_and_values(self) -> DynamicArray:
+        """
+        Creates a DynamicArray containing tuples of all key/value
+        pairs in the hash map.
+
+        :return elements: A DynamicArray as described above.
+        """
+        return DynamicArray(list(self.items()))
+
+    def items(self):
+        """
+        Generates every (key, value) pair in the hash map. Raises
+        RuntimeError if the hash map gains or loses keys, or is
+        resized, while the generator is in use.
+        """
+        version = self._version
+
+        for bucket in self._buckets:
+            if bucket is None:
+                continue
+
+            count = len(bucket) // 3
+
+            for index in range(count):
+                yield bucket[count + index], bucket[2 * count + index]
+
+                if self._version != version:
+                    raise RuntimeError("HashMap changed during iteration")
+
+    def keys(self):
+        """Generates every key in the hash map."""
+        for key, _ in self.items():
+            yield key
+
+    def values(self):
+        """Generates every value in the hash map."""
+        for _, value in self.items():
+            yield value
+
+    def put_many(self, pairs) -> None:
+        """
+        Adds every key/value pair in pairs, as calling put for each one
+        in order would. Keys are hashed in a single pass and the table
+        is resized at most once, up front, to keep the load factor at
+        or below grow_load (1.0 if growing is disabled) for the batch.
+        Each key is recorded in the stats as a put.
+
+        :param pairs: An iterable of (key, value) tuples
+
+        :return: None
+        """
+        pairs = pairs if isinstance(pairs, list) else list(pairs)
+        function = self._hash_function
+        hashes = [function(key) for key, _ in pairs]
+
+        maxLoad = 1.0 if self._grow_load is None else self._grow_load
+        needed = int((self._size + len(pairs)) / maxLoad) + 1
+        if needed > self._capacity:
+            self.resize_table(needed)
+
+        buckets = self._buckets
+        cap = self._capacity
+        stats = self._stats
+        added = 0
+
+        for (key, value), keyHash in zip(pairs, hashes):
+            pos = keyHash % cap
+            bucket = buckets[pos]
+            if stats is not None:
+                stats.record('put', len(bucket) // 3 if bucket else 0)
+
+            if bucket is None:
+                buckets[pos] = [keyHash, key, value]
+                added += 1
+                continue
+
+            index = _find(bucket, key, keyHash)
+
+            if index >= 0:
+                bucket[2 * (len(bucket) // 3) + index] = value
+            else:
+                _append(bucket, keyHash, key, value)
+                added += 1
+
+        self._size += added
+        self._version += 1
+
+    def get_many(self, keys) -> list:
+        """
+        Gets the values associated with each key in keys.
+
+        :param keys: An iterable of string keys
+
+        :return: A list holding, for each key in order, its value or None
+                 if the key is not in the hash map
+        """
+        function = self._hash_function
+        buckets = self._buckets
+        cap = self._capacity
+        stats = self._stats
+        values = []
+
+        for key in keys:
+            keyHash = function(key)
+            bucket = buckets[keyHash % cap]
+            if stats is not None:
+                stats.record('get', len(bucket) // 3 if bucket else 0)
+
+            index = -1 if bucket is None else _find(bucket, key, keyHash)
+            values.append(None if index < 0 else
+                          bucket[2 * (len(bucket) // 3) + index])
+
+        return values
+
+    def remove_many(self, keys) -> None:
+        """
+        Removes each key in keys that is present in the hash map. The
+        table is shrunk at most once, after the whole batch.
+
+        :param keys: An iterable of string keys
+
+        :return: None
+        """
+        function = self._hash_function
+        buckets = self._buckets
+        cap = self._capacity
+        stats = self._stats
+        removed = 0
+
+        for key in keys:
+            keyHash = function(key)
+            pos = keyHash % cap
+            bucket = buckets[pos]
+            if stats is not None:
+                stats.record('remove', len(bucket) // 3 if bucket else 0)
+
+            index = -1 if bucket is None else _find(bucket, key, keyHash)
+
+            if index < 0:
+                continue
+
+            if len(bucket) == 3:
+                buckets[pos] = None
+            else:
+                _delete(bucket, index)
+            removed += 1
+
+        self._size -= removed
+        self._version += 1
+        self._shrink_if_sparse()
+
+    def dump(self, path: str) -> None:
+        """
+        Writes the hash map to a snapshot file at path, in the same
+        format as hash_map_sc.HashMap, so either class can load it.
+
+        :param path: Path of the file to write
+
+        :return: None
+        """
+        positions, hashes = array('q'), array('q')
+        keys, values = [], []
+
+        for pos in range(self._capacity):
+            bucket = self._buckets[pos]
+
+            if bucket is None:
+                continue
+
+            count = len(bucket) // 3
+            positions.extend([pos] * count)
+            hashes.extend(bucket[:count])
+            keys.extend(bucket[count:2 * count])
+            values.extend(bucket[2 * count:])
+
+        write_snapshot(path, SEPARATE_CHAINING, self._capacity_policy,
+                       self._capacity, function_name(self._hash_function),
+                       '', positions, hashes, keys, values)
+
+    def _restore(self, positions, hashes, keys, values) -> None:
+        """
+        Places the entries of a snapshot straight into their saved
+        buckets of this empty hash map, in their saved order.
+
+        :return: None
+        """
+        buckets = self._buckets
+
+        for pos, keyHash, key, value in zip(positions, hashes, keys, values):
+            bucket = buckets[pos]
+
+            if bucket is None:
+                buckets[pos] = [keyHash, key, value]
+            else:
+                _append(bucket, keyHash, key, value)
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+if __name__ == "__main__":
+
+    print("\nCompact - put example 1")
+    print("-----------------------")
+    m = CompactHashMap(53, hash_function_1)
+    for i in range(150):
+        m.put('str' + str(i), i * 100)
+        if i % 25 == 24:
+            print(m.empty_buckets(), round(m.table_load(), 2), m.get_size(), m.get_capacity())
+
+    print("\nCompact - remove example 1")
+    print("--------------------------")
+    m = CompactHashMap(11, hash_function_2)
+    for i in range(1, 10):
+        m.put(str(i), i * 10)
+    for i in range(1, 10, 2):
+        m.remove(str(i))
+    print(m.get_size(), m.get_capacity())
+    print(m.get_keys_and_values())
+    print(m)
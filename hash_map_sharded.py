@@ -0,0 +1,392 @@
+# Course: CS261 - Data Structures
+# Assignment: 6
+# Description: A hash map partitioned by key hash across worker
+#              processes, each owning an open addressing HashMap shard
+#              from hash_map_oa.py, so batch operations run on several
+#              cores. Large batches travel through shared memory. Includes
+#              a basic test suite that runs when file is run as a script.
+#              Depends on hash_map_oa.py, hash_functions.py and
+#              a6_include.py.
+
+
+import multiprocessing
+import os
+import pickle
+import struct
+import time
+from multiprocessing import resource_tracker, shared_memory
+
+from a6_include import DynamicArray
+from hash_functions import get_hash_function, mix_hash
+from hash_map_oa import HashMap
+
+
+# Messages at least this long are passed through shared memory
+SHM_THRESHOLD = 1 << 16
+
+# Seconds close waits for the workers to exit before terminating them
+CLOSE_TIMEOUT = 5.0
+
+_LENGTH = struct.Struct('<Q')
+
+
+def _send(conn, obj: object) -> None:
+    """
+    Pickles obj and sends it over conn. Small messages go through the
+    pipe itself; larger ones are written to a new shared memory block
+    whose name and length are sent instead, and the receiver unlinks
+    the block.
+
+    :return: None
+    """
+    data = pickle.dumps(obj, protocol=pickle.HIGHEST_PROTOCOL)
+
+    if len(data) < SHM_THRESHOLD:
+        conn.send_bytes(b'I' + data)
+        return
+
+    block = shared_memory.SharedMemory(create=True, size=len(data))
+    block.buf[:len(data)] = data
+    conn.send_bytes(b'S' + _LENGTH.pack(len(data)) + block.name.encode())
+    block.close()
+
+
+def _receive(conn) -> object:
+    """
+    :return: The next object sent over conn by _send
+    """
+    message = conn.recv_bytes()
+
+    if message[:1] == b'I':
+        return pickle.loads(memoryview(message)[1:])
+
+    length = _LENGTH.unpack_from(message, 1)[0]
+    block = shared_memory.SharedMemory(
+        name=message[1 + _LENGTH.size:].decode())
+
+    try:
+        view = block.buf[:length]
+        obj = pickle.loads(view)
+        view.release()
+    finally:
+        block.close()
+        block.unlink()
+
+    return obj
+
+
+def _serve(conn, capacity: int, function) -> None:
+    """
+    Worker process loop. Owns one HashMap shard and runs each
+    (command, args) request on it, replying ('ok', result) or
+    ('error', exception), until told to close.
+
+    :return: None
+    """
+    shard = HashMap(capacity, function)
+
+    while True:
+        command, args = _receive(conn)
+
+        if command == 'close':
+            break
+
+        try:
+            result = getattr(shard, command)(*args)
+            if command == 'items':
+                result = list(result)
+            reply = ('ok', result)
+        except Exception as error:
+            reply = ('error', error)
+
+        _send(conn, reply)
+
+    conn.close()
+
+
+class ShardedHashMap:
+    """
+    Represents a hash map whose keys are partitioned by hash across
+    worker processes. Each worker owns an open addressing HashMap
+    holding its share of the keys. Batch methods split their keys by
+    shard, send every shard its part before waiting for any reply, and
+    so run on as many cores as there are shards. Keys and values must be
+    picklable. Call close, or use the map in a with statement, to stop
+    the workers.
+    """
+    def __init__(self,
+                 shards: int = None,
+                 function='crc32',
+                 capacity: int = 11) -> None:
+        """
+        Start the worker processes, each with an empty shard
+
+        :param shards: Number of worker processes, defaulting to the
+                       number of CPUs
+        :param function: Name of a registered hash function, used both
+                         to choose a key's shard and by the shards
+        :param capacity: Initial capacity of each shard
+        """
+        self._count = shards or os.cpu_count() or 1
+        self._hash_function = get_hash_function(function)
+        self._conns = []
+        self._workers = []
+
+        # Workers must share the parent's tracker, since a block is
+        # created in one process and unlinked in another
+        resource_tracker.ensure_running()
+
+        for _ in range(self._count):
+            parentConn, childConn = multiprocessing.Pipe()
+            worker = multiprocessing.Process(
+                target=_serve, args=(childConn, capacity, function),
+                daemon=True)
+            worker.start()
+            childConn.close()
+
+            self._conns.append(parentConn)
+            self._workers.append(worker)
+
+    def __enter__(self) -> "ShardedHashMap":
+        """Return the map for use in a with statement."""
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        """Stop the workers at the end of a with statement."""
+        self.close()
+
+    def close(self) -> None:
+        """
+        Stops the worker processes. Their shards are discarded. Workers
+        still running CLOSE_TIMEOUT seconds after being asked to exit
+        are terminated, and killed if that does not stop them either.
+
+        :return: None
+        """
+        for conn, worker in zip(self._conns, self._workers):
+            if worker.is_alive():
+                try:
+                    _send(conn, ('close', ()))
+                except OSError:
+                    # The worker exited after the check
+                    pass
+
+        deadline = time.monotonic() + CLOSE_TIMEOUT
+
+        for conn, worker in zip(self._conns, self._workers):
+            worker.join(max(deadline - time.monotonic(), 0))
+
+            if worker.is_alive():
+                worker.terminate()
+                worker.join(CLOSE_TIMEOUT)
+
+            if worker.is_alive():
+                worker.kill()
+                worker.join()
+
+            conn.close()
+
+        self._conns = []
+        self._workers = []
+
+    def _shard_of(self, key: str) -> int:
+        """
+        :return: Index of the shard owning key. The hash is mixed first
+                 so that the shard does not depend on the same low bits
+                 the shard's own table uses.
+        """
+        return mix_hash(self._hash_function(key)) % self._count
+
+    def _reply(self, shard: int) -> object:
+        """
+        :return: The result of the last request sent to shard, raising
+                 any exception the worker reported
+        """
+        status, result = _receive(self._conns[shard])
+
+        if status == 'error':
+            raise result
+
+        return result
+
+    def _call(self, shard: int, command: str, *args) -> object:
+        """
+        Runs command on one shard.
+
+        :return: The result
+        """
+        _send(self._conns[shard], (command, args))
+        return self._reply(shard)
+
+    def _broadcast(self, command: str, argsByShard: list = None) -> list:
+        """
+        Runs command on every shard at once, with argsByShard[i] as the
+        arguments for shard i.
+
+        :return: A list of the results, in shard order
+        """
+        if argsByShard is None:
+            argsByShard = [()] * self._count
+
+        for conn, args in zip(self._conns, argsByShard):
+            _send(conn, (command, args))
+
+        return [self._reply(shard) for shard in range(self._count)]
+
+    def get_size(self) -> int:
+        """
+        Return size of map
+        """
+        return sum(self._broadcast('get_size'))
+
+    def get_shard_count(self) -> int:
+        """
+        Return number of shards
+        """
+        return self._count
+
+    def put(self, key: str, value: object) -> None:
+        """
+        Adds key/value pair to the hash map. If the key already exists
+        in the hash map, the value is updated.
+
+        :return: None
+        """
+        self._call(self._shard_of(key), 'put', key, value)
+
+    def get(self, key: str) -> object:
+        """
+        :return: The value associated with key, or None if the key is not
+                 in the hash map
+        """
+        return self._call(self._shard_of(key), 'get', key)
+
+    def contains_key(self, key: str) -> bool:
+        """
+        :return: True if the key is in the hash map
+                 False otherwise
+        """
+        return self._call(self._shard_of(key), 'contains_key', key)
+
+    def remove(self, key: str) -> None:
+        """
+        Removes key from the hash map. Does nothing if the key is not in
+        the hash map.
+
+        :return: None
+        """
+        self._call(self._shard_of(key), 'remove', key)
+
+    def clear(self) -> None:
+        """
+        Clears the contents of every shard.
+
+        :return: None
+        """
+        self._broadcast('clear')
+
+    def put_many(self, pairs) -> None:
+        """
+        Adds every key/value pair in pairs, as calling put for each one
+        in order would, with all shards inserting in parallel.
+
+        :param pairs: An iterable of (key, value) tuples
+
+        :return: None
+        """
+        groups = [[] for _ in range(self._count)]
+        shardOf = self._shard_of
+
+        for pair in pairs:
+            groups[shardOf(pair[0])].append(pair)
+
+        self._broadcast('put_many', [(group,) for group in groups])
+
+    def get_many(self, keys) -> list:
+        """
+        Gets the values associated with each key in keys, with all
+        shards searching in parallel.
+
+        :param keys: An iterable of string keys
+
+        :return: A list holding, for each key in order, its value or None
+                 if the key is not in the hash map
+        """
+        keys = keys if isinstance(keys, list) else list(keys)
+        groups = [[] for _ in range(self._count)]
+        indices = [[] for _ in range(self._count)]
+        shardOf = self._shard_of
+
+        for index, key in enumerate(keys):
+            shard = shardOf(key)
+            groups[shard].append(key)
+            indices[shard].append(index)
+
+        values = [None] * len(keys)
+        results = self._broadcast('get_many', [(group,) for group in groups])
+
+        for shardIndices, shardValues in zip(indices, results):
+            for index, value in zip(shardIndices, shardValues):
+                values[index] = value
+
+        return values
+
+    def remove_many(self, keys) -> None:
+        """
+        Removes each key in keys that is present in the hash map, with
+        all shards removing in parallel.
+
+        :param keys: An iterable of string keys
+
+        :return: None
+        """
+        groups = [[] for _ in range(self._count)]
+        shardOf = self._shard_of
+
+        for key in keys:
+            groups[shardOf(key)].append(key)
+
+        self._broadcast('remove_many', [(group,) for group in groups])
+
+    def items(self) -> list:
+        """
+        :return: A list of every (key, value) pair, gathered from all
+                 shards
+        """
+        return [pair for shardItems in self._broadcast('items')
+                for pair in shardItems]
+
+    def keys(self) -> list:
+        """
+        :return: A list of every key in the hash map
+        """
+        return [key for key, _ in self.items()]
+
+    def values(self) -> list:
+        """
+        :return: A list of every value in the hash map
+        """
+        return [value for _, value in self.items()]
+
+    def get_keys_and_values(self) -> DynamicArray:
+        """
+        Creates a DynamicArray containing tuples of all key/value
+        pairs in the hash map.
+
+        :return elements: A DynamicArray as described above.
+        """
+        return DynamicArray(self.items())
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+if __name__ == "__main__":
+
+    print("\nShardedHashMap - put_many example 1")
+    print("-----------------------------------")
+    with ShardedHashMap(4) as m:
+        m.put_many(('str' + str(i), i * 100) for i in range(100000))
+        print(m.get_size(), m.get_shard_count())
+        print(m.get_many(['str0', 'str99999', 'missing']))
+        m.remove_many('str' + str(i) for i in range(0, 100000, 2))
+        print(m.get_size(), m.get('str1'), m.contains_key('str2'))
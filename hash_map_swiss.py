@@ -0,0 +1,488 @@
+# Course: CS261 - Data Structures
+# Assignment: 6
+# Description: A Swiss table variant of the open addressing hash map in
+#              hash_map_oa.py. A control byte per bucket holds 7 bits of
+#              the key's hash or an empty/deleted marker, buckets are
+#              probed in groups of 16, and each group's control bytes are
+#              searched with bytearray.find, so keys are only compared
+#              on a fingerprint match. Includes a basic test suite that
+#              runs when file is run as a script. Depends on
+#              hash_map_oa.py, snapshot.py, stats.py and a6_include.py.
+
+
+import time
+from array import array
+
+from a6_include import DynamicArray, hash_function_1, hash_function_2
+from hash_map_oa import HashMap, quadratic_probe
+from snapshot import (OPEN_ADDRESSING, function_name, read_snapshot,
+                      write_snapshot)
+from stats import DELETED, EMPTY, FULL
+
+
+# Buckets probed together
+GROUP_SIZE = 16
+
+# Control bytes of buckets without a live entry. A full bucket's
+# control byte is the low 7 bits of its hash, so always below 0x80.
+CTRL_EMPTY = 0x80
+CTRL_DELETED = 0xFE
+
+# Maps control bytes to the bucket states used by stats.py
+_OCCUPANCY = bytes(FULL if byte < 0x80 else
+                   EMPTY if byte == CTRL_EMPTY else DELETED
+                   for byte in range(256))
+
+
+class SwissHashMap(HashMap):
+    """
+    Represents an open addressing hash map with the same interface as
+    hash_map_oa.HashMap, laid out as a Swiss table: a bytearray of
+    control bytes, an array('q') of cached hashes and lists of keys and
+    values. The buckets form a power of two number of groups of
+    GROUP_SIZE. The high bits of a key's hash choose its first group and
+    the low 7 bits are its fingerprint. A lookup searches each group's
+    control bytes for the fingerprint, comparing keys only where it
+    matches (about one bucket in 128 otherwise), and stops at the first
+    group holding an empty bucket; groups are visited in triangular
+    order. The table grows once 7/8 of its buckets are in use.
+
+    Hashes are always mixed, since both the group and the fingerprint
+    must be well spread even for weak functions like hash_function_1.
+    """
+    # Control byte fingerprints already reject most missing keys
+    _supports_bloom = False
+
+    def __init__(self, capacity: int, function) -> None:
+        """
+        Initialize new HashMap that uses a Swiss table for collision
+        resolution
+
+        :param capacity: Minimum number of buckets, rounded up to a
+                         power of two number of groups
+        :param function: A hash function, or the name of one registered
+                         in hash_functions.HASH_FUNCTIONS
+        """
+        # The pow2 policy also mixes the hash function
+        self._init_state(function, None, quadratic_probe, 'pow2')
+        self._allocate(self._groups_for(capacity) * GROUP_SIZE)
+
+    def __str__(self) -> str:
+        """Override string method to provide more readable output."""
+        out = ''
+        for i in range(self._capacity):
+            ctrl = self._ctrl[i]
+
+            if ctrl == CTRL_EMPTY:
+                out += str(i) + ': None\n'
+            else:
+                out += f"{i}: K: {self._keys[i]} V: {self._values[i]} " \
+                       f"TS: {ctrl == CTRL_DELETED}\n"
+        return out
+
+    @staticmethod
+    def _groups_for(capacity: int) -> int:
+        """
+        :return: The smallest power of two number of groups holding at
+                 least capacity buckets
+        """
+        groups = max(-(-capacity // GROUP_SIZE), 1)
+        return 1 << (groups - 1).bit_length()
+
+    def _allocate(self, capacity: int) -> None:
+        """
+        Replaces the storage with empty arrays of given capacity, a
+        multiple of GROUP_SIZE.
+
+        :return: None
+        """
+        self._capacity = capacity
+        self._ctrl = bytearray([CTRL_EMPTY]) * capacity
+        self._hashes = array('q', bytes(8 * capacity))
+        self._keys = [None] * capacity
+        self._values = [None] * capacity
+
+    def _occupancy(self) -> bytes:
+        """
+        :return: The state (EMPTY, FULL or DELETED) of every bucket
+        """
+        return self._ctrl.translate(_OCCUPANCY)
+
+    def _find(self, key: str, keyHash: int, op: str) -> int:
+        """
+        :return: Address of the entry with key, or -1 if the key is not
+                 in the hash map.
+        """
+        ctrl, hashes, keys = self._ctrl, self._hashes, self._keys
+        fingerprint = keyHash & 0x7F
+        mask = self._capacity // GROUP_SIZE - 1
+        group = (keyHash >> 7) & mask
+        step = 0
+        found = -1
+
+        while step <= mask:
+            start = group * GROUP_SIZE
+            end = start + GROUP_SIZE
+            address = ctrl.find(fingerprint, start, end)
+
+            while address >= 0:
+                if hashes[address] == keyHash and keys[address] == key:
+                    found = address
+                    break
+
+                address = ctrl.find(fingerprint, address + 1, end)
+
+            if found >= 0 or ctrl.find(CTRL_EMPTY, start, end) >= 0:
+                break
+
+            step += 1
+            group = (group + step) & mask
+
+        if self._stats is not None:
+            self._stats.record(op, step + 1)
+
+        return found
+
+    def _free_address(self, keyHash: int) -> int:
+        """
+        :return: Address of the first empty or deleted bucket in the
+                 probe sequence of keyHash
+        """
+        ctrl = self._ctrl
+        mask = self._capacity // GROUP_SIZE - 1
+        group = (keyHash >> 7) & mask
+        step = 0
+
+        while True:
+            start = group * GROUP_SIZE
+            end = start + GROUP_SIZE
+            empty = ctrl.find(CTRL_EMPTY, start, end)
+            deleted = ctrl.find(CTRL_DELETED, start, end)
+
+            if deleted >= 0 and (empty < 0 or deleted < empty):
+                return deleted
+
+            if empty >= 0:
+                return empty
+
+            step += 1
+            group = (group + step) & mask
+
+    def _store(self, address: int, key: str, value: object,
+               keyHash: int) -> None:
+        """
+        Writes a new entry into the empty or deleted bucket at address.
+
+        :return: None
+        """
+        if self._ctrl[address] == CTRL_DELETED:
+            self._tombstones -= 1
+
+        self._ctrl[address] = keyHash & 0x7F
+        self._hashes[address] = keyHash
+        self._keys[address] = key
+        self._values[address] = value
+        self._size += 1
+        self._version += 1
+
+    def _make_room(self) -> None:
+        """
+        Before an insert, doubles the table if it would pass 7/8 full,
+        or rebuilds it at the same size if tombstones take up the rest.
+
+        :return: None
+        """
+        limit = self._capacity - self._capacity // 8
+
+        if self._size + 1 > limit:
+            self.resize_table(2 * self._capacity)
+        elif self._size + self._tombstones + 1 > limit:
+            self.resize_table(self._capacity)
+
+    def put(self, key: str, value: object) -> None:
+        """
+        Adds key/value pair to the hash map. If the key already exists in
+        the hash map, the value is updated. New keys take the first empty
+        or deleted bucket of their probe sequence.
+
+        :param key: A string representing a hash key
+        :param value: Any object with implementations for comparison
+                      operators and string representation.
+
+        :return: None
+        """
+        keyHash = self._hash_function(key)
+        address = self._find(key, keyHash, 'put')
+
+        if address >= 0:
+            self._values[address] = value
+            return
+
+        self._make_room()
+        self._store(self._free_address(keyHash), key, value, keyHash)
+
+    def empty_buckets(self) -> int:
+        """
+        :return empty: Integer representing the number of empty
+                       buckets in the hash table.
+        """
+        return self._ctrl.count(CTRL_EMPTY)
+
+    def resize_table(self, new_capacity: int) -> None:
+        """
+        Resizes the hash table to the smallest power of two number of
+        groups holding at least new_capacity buckets that keeps it at
+        most 7/8 full, placing entries by their cached hash. Tombstones
+        are dropped. Does nothing if new_capacity is < current number of
+        elements.
+
+        :param new_capacity: An integer >= 1 representing the minimum
+                             new hash table size.
+
+        :return: None
+        """
+        size = self._size
+
+        if new_capacity < size:
+            return
+
+        if self._stats is not None:
+            start = time.perf_counter()
+
+        groups = self._groups_for(max(new_capacity, size + size // 7 + 1))
+        oldCtrl, oldHashes = self._ctrl, self._hashes
+        oldKeys, oldValues = self._keys, self._values
+
+        self._allocate(groups * GROUP_SIZE)
+        self._size = 0
+        self._tombstones = 0
+
+        for pos in range(len(oldCtrl)):
+            if oldCtrl[pos] < 0x80:
+                keyHash = oldHashes[pos]
+                self._store(self._free_address(keyHash), oldKeys[pos],
+                            oldValues[pos], keyHash)
+
+        self._version += 1
+
+        if self._stats is not None:
+            self._stats.record_resize(time.perf_counter() - start)
+
+    def get(self, key: str) -> object:
+        """
+        Gets the value associated with key in the hash map.
+
+        :param key: A string representing a hash key
+
+        :return: The object representing the value associated with the key
+                 if the key exists in the hash map.
+                 None otherwise.
+        """
+        if self._size == 0:
+            return None
+
+        address = self._find(key, self._hash_function(key), 'get')
+
+        if address < 0:
+            return None
+
+        return self._values[address]
+
+    def contains_key(self, key: str) -> bool:
+        """
+        Determines if key is present in the hash map.
+
+        :param key: A string representing a hash key
+
+        :return: True if the key is in the hash map
+                 False otherwise
+        """
+        if self._size == 0:
+            return False
+
+        return self._find(key, self._hash_function(key), 'contains_key') >= 0
+
+    def remove(self, key: str) -> None:
+        """
+        Removes the entry with key from the hash map. Its bucket becomes
+        empty again if its group still has an empty bucket, since no
+        probe sequence can have continued past such a group, and a
+        tombstone otherwise. Does nothing if the key is not in the hash
+        map.
+
+        :param key: A string representing a hash key
+
+        :return: None
+        """
+        if self._size == 0:
+            return
+
+        address = self._find(key, self._hash_function(key), 'remove')
+
+        if address < 0:
+            return
+
+        start = address - address % GROUP_SIZE
+
+        if self._ctrl.find(CTRL_EMPTY, start, start + GROUP_SIZE) >= 0:
+            self._ctrl[address] = CTRL_EMPTY
+        else:
+            self._ctrl[address] = CTRL_DELETED
+            self._tombstones += 1
+
+        self._keys[address] = None
+        self._values[address] = None
+        self._size -= 1
+        self._version += 1
+
+    def clear(self) -> None:
+        """
+        Clears the contents of the hash map.
+
+        :return: None
+        """
+        if self._size != 0 or self._tombstones != 0:
+            self._allocate(self._capacity)
+            self._size = 0
+            self._version += 1
+            self._tombstones = 0
+
+    def get_keys_and_values(self) -> DynamicArray:
+        """
+        Creates a DynamicArray containing tuples of all key/value
+        pairs in the hash map.
+
+        :return elements: A DynamicArray as described above.
+        """
+        return DynamicArray(list(self.items()))
+
+    def _addresses(self):
+        """
+        Generates the address of every live entry. Raises RuntimeError
+        if the hash map gains or loses keys, or is resized, while the
+        generator is in use.
+        """
+        version = self._version
+        ctrl = self._ctrl
+
+        for pos in range(self._capacity):
+            if ctrl[pos] < 0x80:
+                yield pos
+
+                if self._version != version:
+                    raise RuntimeError("HashMap changed during iteration")
+
+    def keys(self):
+        """Generates every key in the hash map."""
+        keys = self._keys
+        for pos in self._addresses():
+            yield keys[pos]
+
+    def values(self):
+        """Generates every value in the hash map."""
+        values = self._values
+        for pos in self._addresses():
+            yield values[pos]
+
+    def items(self):
+        """Generates every (key, value) pair in the hash map."""
+        keys, values = self._keys, self._values
+        for pos in self._addresses():
+            yield keys[pos], values[pos]
+
+    def put_many(self, pairs) -> None:
+        """
+        Adds every key/value pair in pairs, as calling put for each one
+        in order would, resizing at most once for the whole batch.
+
+        :param pairs: An iterable of (key, value) tuples
+
+        :return: None
+        """
+        pairs = pairs if isinstance(pairs, list) else list(pairs)
+        needed = self._size + len(pairs)
+
+        if needed > self._capacity - self._capacity // 8:
+            self.resize_table(needed + needed // 7 + 1)
+
+        for key, value in pairs:
+            self.put(key, value)
+
+    def get_many(self, keys) -> list:
+        """
+        :param keys: An iterable of string keys
+
+        :return: A list holding, for each key in order, its value or None
+                 if the key is not in the hash map
+        """
+        return [self.get(key) for key in keys]
+
+    def remove_many(self, keys) -> None:
+        """
+        Removes each key in keys that is present in the hash map.
+
+        :param keys: An iterable of string keys
+
+        :return: None
+        """
+        for key in keys:
+            self.remove(key)
+
+    def dump(self, path: str) -> None:
+        """
+        Writes every entry to a snapshot file at path. load puts every
+        key again.
+
+        :param path: Path of the file to write
+
+        :return: None
+        """
+        positions = array('q', self._addresses())
+        hashes = array('q', (self._hashes[pos] for pos in positions))
+
+        write_snapshot(path, OPEN_ADDRESSING, self._capacity_policy,
+                       self._capacity,
+                       function_name(self._hash_function), '',
+                       positions, hashes,
+                       [self._keys[pos] for pos in positions],
+                       [self._values[pos] for pos in positions])
+
+    @classmethod
+    def load(cls, path: str) -> "SwissHashMap":
+        """
+        Restores a hash map from a snapshot written by dump, or by any
+        open addressing map, by putting every key again.
+
+        :param path: Path of the snapshot file
+
+        :return: The restored hash map
+        """
+        snapshot = read_snapshot(path, OPEN_ADDRESSING)
+        hashMap = cls(snapshot['capacity'], snapshot['function'])
+
+        keys = [key for key in snapshot['keys'] if key is not None]
+        hashMap.put_many(zip(keys, snapshot['values']))
+        return hashMap
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+if __name__ == "__main__":
+
+    print("\nSwiss - put example 1")
+    print("---------------------")
+    m = SwissHashMap(53, hash_function_1)
+    for i in range(150):
+        m.put('str' + str(i), i * 100)
+        if i % 25 == 24:
+            print(m.empty_buckets(), round(m.table_load(), 2), m.get_size(), m.get_capacity())
+
+    print("\nSwiss - remove example 1")
+    print("------------------------")
+    m = SwissHashMap(11, hash_function_2)
+    for i in range(1, 10):
+        m.put(str(i), i * 10)
+    for i in range(1, 10, 2):
+        m.remove(str(i))
+    print(m.get_size(), m.get_capacity(), m.tombstone_count())
+    print(m.get_keys_and_values())
@@ -0,0 +1,216 @@
+# Course: CS261 - Data Structures
+# Assignment: 6
+# Description: A streaming frequency counter that keeps a bounded number
+#              of counters in a chaining HashMap, using the Space-Saving
+#              algorithm to report approximate top-k items and heavy
+#              hitters of an unbounded stream with error bounds. Includes
+#              a basic test suite that runs when file is run as a script.
+#              Depends on hash_map_sc.py and a6_include.py.
+
+
+import heapq
+
+from a6_include import hash_function_1
+from hash_map_sc import HashMap
+
+
+class SpaceSaving:
+    """
+    Represents a Space-Saving summary of a stream, monitoring at most
+    capacity items. Each monitored item has a count and an error: its
+    true frequency lies between count - error and count. When a new item
+    arrives and every counter is taken, the item with the smallest count
+    is replaced, and the newcomer inherits that count as its error.
+    Every item whose true frequency exceeds total / capacity is always
+    monitored.
+
+    Counters live in a HashMap from item to a [count, error] list. The
+    smallest count is found with a min-heap holding one (count, item)
+    entry per monitored item. Counts only grow, so a heap entry can be
+    stale but never too large; stale entries are refreshed as they reach
+    the top.
+    """
+    def __init__(self, capacity: int = 100,
+                 function: callable = hash_function_1) -> None:
+        """
+        Initialize new summary
+
+        :param capacity: Maximum number of items monitored at once
+        :param function: Hash function of the counter HashMap
+        """
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+
+        self._capacity = capacity
+        self._counters = HashMap(capacity, function)
+        self._heap = []
+        self._total = 0
+
+    def get_capacity(self) -> int:
+        """
+        Return maximum number of monitored items
+        """
+        return self._capacity
+
+    def get_total(self) -> int:
+        """
+        Return total count of all items added
+        """
+        return self._total
+
+    def error_bound(self) -> float:
+        """
+        :return: The largest possible overestimate of any count,
+                 total / capacity
+        """
+        return self._total / self._capacity
+
+    def _pop_min(self) -> tuple:
+        """
+        Removes the heap entry of the monitored item with the smallest
+        count, refreshing stale entries on the way.
+
+        :return: A tuple of that count and item
+        """
+        heap, counters = self._heap, self._counters
+
+        while True:
+            count, item = heap[0]
+            actual = counters.get(item)[0]
+
+            if actual == count:
+                return heapq.heappop(heap)
+
+            heapq.heapreplace(heap, (actual, item))
+
+    def add(self, item: str, count: int = 1) -> None:
+        """
+        Records count occurrences of item.
+
+        :param item: A string from the stream
+        :param count: Number of occurrences, at least 1
+
+        :return: None
+        """
+        self._total += count
+        counters = self._counters
+        counter = counters.get(item)
+
+        if counter is not None:
+            counter[0] += count
+            return
+
+        if counters.get_size() < self._capacity:
+            counters.put(item, [count, 0])
+            heapq.heappush(self._heap, (count, item))
+            return
+
+        # Replace the item with the smallest count
+        minCount, victim = self._pop_min()
+        counters.remove(victim)
+        counters.put(item, [minCount + count, minCount])
+        heapq.heappush(self._heap, (minCount + count, item))
+
+    def add_many(self, items) -> None:
+        """
+        Records one occurrence of each element of items, which may be
+        any iterable, including an unbounded generator.
+
+        :return: None
+        """
+        add = self.add
+        for item in items:
+            add(item)
+
+    def estimate(self, item: str) -> tuple:
+        """
+        :return: A tuple of the estimated count of item and its maximum
+                 error, so its true frequency lies between count - error
+                 and count. For an item that is not monitored both are
+                 the smallest monitored count, or 0 while counters are
+                 still free.
+        """
+        counter = self._counters.get(item)
+
+        if counter is not None:
+            return counter[0], counter[1]
+
+        if self._counters.get_size() < self._capacity:
+            return 0, 0
+
+        minCount = self._min_count()
+        return minCount, minCount
+
+    def _min_count(self) -> int:
+        """
+        :return: The smallest monitored count, leaving it in the heap
+        """
+        count, item = self._pop_min()
+        heapq.heappush(self._heap, (count, item))
+        return count
+
+    def top_k(self, k: int = None) -> list:
+        """
+        :param k: Number of items to return, defaulting to all monitored
+
+        :return: A list of up to k (item, count, error, guaranteed)
+                 tuples by descending count. guaranteed is True when the
+                 item is certainly among the true top k of the stream:
+                 its lowest possible count, count - error, is at least
+                 the count of every item ranked below it.
+        """
+        ranked = sorted(((counter[0], counter[1], item)
+                         for item, counter in self._counters.items()),
+                        key=lambda entry: -entry[0])
+
+        if k is None or k > len(ranked):
+            k = len(ranked)
+
+        # Largest count an item below position k could have
+        if k < len(ranked):
+            below = ranked[k][0]
+        elif self._counters.get_size() < self._capacity:
+            below = 0
+        else:
+            below = self._min_count()
+
+        return [(item, count, error, count - error >= below)
+                for count, error, item in ranked[:k]]
+
+    def heavy_hitters(self, fraction: float) -> list:
+        """
+        :param fraction: Share of the total, between 0 and 1
+
+        :return: A list of (item, count, error, guaranteed) tuples by
+                 descending count, holding every item whose true
+                 frequency may exceed fraction * total. guaranteed is True
+                 when its frequency certainly does. The list contains
+                 all true heavy hitters when fraction >= 1 / capacity.
+        """
+        threshold = fraction * self._total
+
+        return [(item, count, error, count - error > threshold)
+                for item, count, error, _ in self.top_k()
+                if count > threshold]
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+if __name__ == "__main__":
+
+    import random
+
+    print("\nSpaceSaving - top_k example 1")
+    print("-----------------------------")
+    generator = random.Random(0)
+    summary = SpaceSaving(50)
+    summary.add_many('item' + str(int(generator.paretovariate(1.0)))
+                     for _ in range(100000))
+    print(summary.get_total(), round(summary.error_bound(), 1))
+    for row in summary.top_k(5):
+        print(row)
+
+    print("\nSpaceSaving - heavy_hitters example 1")
+    print("-------------------------------------")
+    for row in summary.heavy_hitters(0.05):
+        print(row)
@@ -0,0 +1,144 @@
+# Course: CS261 - Data Structures
+# Assignment: 6
+# Description: Reading and writing the binary snapshot format used by the
+#              dump and load methods of both HashMaps. A snapshot stores
+#              the capacity, hash function name and bucket layout, so a
+#              table can be restored without rehashing its keys. Depends
+#              on hash_functions.py.
+
+
+import pickle
+import struct
+import sys
+from array import array
+
+from hash_functions import hash_function_name
+
+
+MAGIC = b'HMSNAP\r\n'
+FORMAT_VERSION = 1
+
+# Map kinds
+SEPARATE_CHAINING = 0
+OPEN_ADDRESSING = 1
+
+# magic, format version, map kind, capacity policy, capacity,
+# entry count, hash function name, probe function name
+_HEADER = struct.Struct('<8sHBBQQ32s32s')
+
+
+def _pack_array(values: array) -> bytes:
+    """
+    :return: The bytes of values in little endian order
+    """
+    if sys.byteorder == 'big':
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def _unpack_array(typecode: str, data: bytes) -> array:
+    """
+    :return: An array of typecode read from little endian data
+    """
+    values = array(typecode, data)
+    if sys.byteorder == 'big':
+        values.byteswap()
+    return values
+
+
+def function_name(function: callable) -> str:
+    """
+    :return: The registered name of a map's hash function, looking
+             through the mixing wrapper added by the 'pow2' policy
+
+    Raises ValueError if the function is not registered, since a
+    snapshot could not name it.
+    """
+    name = hash_function_name(getattr(function, '__wrapped__', function))
+
+    if name is None:
+        raise ValueError("Only maps using a hash function registered in "
+                         "hash_functions.HASH_FUNCTIONS can be dumped")
+
+    return name
+
+
+def write_snapshot(path: str, kind: int, policy: str, capacity: int,
+                   function: str, probe: str, positions: array,
+                   hashes: array, keys: list, values: list) -> None:
+    """
+    Writes a snapshot file. Entry i is at bucket positions[i] with cached
+    hash hashes[i] and key keys[i]. A key of None marks an open
+    addressing tombstone, which has no value. values holds the values of
+    the other entries in order.
+
+    :param kind: SEPARATE_CHAINING or OPEN_ADDRESSING
+    :param policy: The capacity policy, 'prime' or 'pow2'
+    :param function: Registered name of the hash function
+    :param probe: Name of the probe function, '' for chaining
+
+    :return: None
+    """
+    encoded = [b'' if key is None else key.encode() for key in keys]
+    lengths = array('q', [-1 if key is None else len(data)
+                          for key, data in zip(keys, encoded)])
+
+    with open(path, 'wb') as out:
+        out.write(_HEADER.pack(MAGIC, FORMAT_VERSION, kind,
+                               ('prime', 'pow2').index(policy), capacity,
+                               len(keys), function.encode(), probe.encode()))
+        out.write(_pack_array(positions))
+        out.write(_pack_array(hashes))
+        out.write(_pack_array(lengths))
+        out.write(b''.join(encoded))
+        pickle.dump(values, out, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def read_snapshot(path: str, kind: int) -> dict:
+    """
+    Reads a snapshot file written by write_snapshot.
+
+    :param kind: The map kind the caller expects
+
+    :return: A dictionary with the header fields (policy, capacity,
+             function, probe) and the positions, hashes, keys and values
+             given to write_snapshot
+    """
+    with open(path, 'rb') as source:
+        data = source.read()
+
+    magic, version, fileKind, policy, capacity, count, function, probe = \
+        _HEADER.unpack_from(data, 0)
+
+    if magic != MAGIC or version != FORMAT_VERSION:
+        raise ValueError(f"{path} is not a HashMap snapshot")
+
+    if fileKind != kind:
+        raise ValueError(f"{path} holds a different kind of HashMap")
+
+    offset = _HEADER.size
+    width = 8 * count
+    positions = _unpack_array('q', data[offset:offset + width])
+    hashes = _unpack_array('q', data[offset + width:offset + 2 * width])
+    lengths = _unpack_array('q', data[offset + 2 * width:offset + 3 * width])
+    offset += 3 * width
+
+    keys = []
+    for length in lengths:
+        if length < 0:
+            keys.append(None)
+        else:
+            keys.append(data[offset:offset + length].decode())
+            offset += length
+
+    return {
+        'policy': ('prime', 'pow2')[policy],
+        'capacity': capacity,
+        'function': function.rstrip(b'\0').decode(),
+        'probe': probe.rstrip(b'\0').decode(),
+        'positions': positions,
+        'hashes': hashes,
+        'keys': keys,
+        'values': pickle.loads(data[offset:]),
+    }
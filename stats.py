@@ -0,0 +1,145 @@
+# Course: CS261 - Data Structures
+# Assignment: 6
+# Description: Opt-in instrumentation for the hash maps. A map collects
+#              per-operation probe counts and resize timings in an
+#              OpStats object once its enable_stats method is called, and
+#              the helpers here summarize chain lengths and clusters of
+#              occupied buckets for get_stats. Includes a basic test suite
+#              that runs when file is run as a script.
+
+
+# Bucket states reported by the open addressing maps' _occupancy
+EMPTY = 0
+FULL = 1
+DELETED = 2
+
+
+class OpStats:
+    """
+    Records, for each kind of operation, how many were performed and
+    how many buckets (open addressing) or chain nodes (chaining) each
+    one had to consider, plus the number and total duration of resizes.
+    """
+    def __init__(self) -> None:
+        """Initialize empty counters."""
+        # Operation name -> [count, total probes, most probes]
+        self._ops = {}
+        self.resizes = 0
+        self.resize_seconds = 0.0
+
+    def record(self, op: str, probes: int) -> None:
+        """
+        Records one operation that considered probes buckets or nodes.
+
+        :return: None
+        """
+        counters = self._ops.get(op)
+
+        if counters is None:
+            self._ops[op] = [1, probes, probes]
+            return
+
+        counters[0] += 1
+        counters[1] += probes
+        if probes > counters[2]:
+            counters[2] = probes
+
+    def record_resize(self, seconds: float) -> None:
+        """
+        Records one resize that took seconds.
+
+        :return: None
+        """
+        self.resizes += 1
+        self.resize_seconds += seconds
+
+    def summary(self) -> dict:
+        """
+        :return: A dictionary with an 'operations' entry mapping each
+                 operation name to its count, mean probes and most
+                 probes, plus the resize count and total seconds
+        """
+        operations = {}
+
+        for op, (count, total, most) in self._ops.items():
+            operations[op] = {'count': count, 'mean_probes': total / count,
+                              'max_probes': most}
+
+        return {'operations': operations, 'resizes': self.resizes,
+                'resize_seconds': self.resize_seconds}
+
+
+def length_summary(lengths) -> dict:
+    """
+    :param lengths: An iterable of non-negative lengths, such as chain
+                    lengths or cluster sizes
+
+    :return: A dictionary holding the largest length, the mean of the
+             non-zero lengths and a histogram mapping each length to how
+             often it occurs
+    """
+    histogram = {}
+    total = nonZero = longest = 0
+
+    for length in lengths:
+        histogram[length] = histogram.get(length, 0) + 1
+
+        if length:
+            total += length
+            nonZero += 1
+            if length > longest:
+                longest = length
+
+    return {'max': longest, 'mean': total / nonZero if nonZero else 0.0,
+            'histogram': dict(sorted(histogram.items()))}
+
+
+def cluster_sizes(occupancy) -> list:
+    """
+    Measures runs of consecutive non-empty buckets, which are what
+    linear and quadratic probes walk through. Tombstones count as
+    occupied. A run reaching the end of the table continues at the
+    start.
+
+    :param occupancy: A sequence of bucket states (EMPTY, FULL or
+                      DELETED)
+
+    :return: A list of run lengths
+    """
+    sizes = []
+    run = 0
+
+    for state in occupancy:
+        if state == EMPTY:
+            if run:
+                sizes.append(run)
+            run = 0
+        else:
+            run += 1
+
+    if run:
+        if sizes and occupancy[0] != EMPTY:
+            sizes[0] += run
+        else:
+            sizes.append(run)
+
+    return sizes
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+if __name__ == "__main__":
+
+    print("\nstats - cluster example 1")
+    print("-------------------------")
+    occupancy = [FULL, FULL, EMPTY, DELETED, FULL, FULL, EMPTY, EMPTY, FULL]
+    print(cluster_sizes(occupancy))
+    print(length_summary(cluster_sizes(occupancy)))
+
+    print("\nstats - OpStats example 1")
+    print("-------------------------")
+    stats = OpStats()
+    for probes in (1, 1, 3, 2):
+        stats.record('get', probes)
+    stats.record_resize(0.25)
+    print(stats.summary())
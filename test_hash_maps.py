@@ -0,0 +1,355 @@
+# Course: CS261 - Data Structures
+# Assignment: 6
+# Description: Unit tests run against every hash map class, checking the
+#              features each one inherits from hash_map_sc.HashMap or
+#              hash_map_oa.HashMap, and how ShardedHashMap stops its
+#              workers. Run with python -m unittest or python -m pytest.
+
+
+import os
+import shutil
+import signal
+import tempfile
+import unittest
+from unittest import mock
+
+from a6_include import hash_function_2
+from cache import Cache
+from hash_map_concurrent import ConcurrentHashMap
+from hash_map_cuckoo import CuckooHashMap
+from hash_map_disk import DiskHashMap
+from hash_map_oa import HashMap as OAHashMap
+from hash_map_oa import linear_probe, triangular_probe
+from hash_map_oa import IncrementalHashMap as OAIncrementalHashMap
+from hash_map_oa_compact import CompactHashMap as OACompactHashMap
+from hash_map_rh import RobinHoodHashMap
+from hash_map_sc import HashMap as SCHashMap
+from hash_map_sc import IncrementalHashMap as SCIncrementalHashMap
+from hash_map_sc_compact import CompactHashMap as SCCompactHashMap
+import hash_map_sharded
+from hash_map_swiss import SwissHashMap
+
+try:
+    from hash_map_np import IntHashMap
+except ImportError:
+    IntHashMap = None
+
+
+# Classes whose lookups consult a Bloom filter once enable_bloom is called
+BLOOM_MAPS = (SCHashMap, SCIncrementalHashMap, OAHashMap,
+              OAIncrementalHashMap)
+
+
+class MapTestCase(unittest.TestCase):
+    """Provides a new, empty instance of every hash map class."""
+
+    def setUp(self) -> None:
+        """Create a directory for the on-disk maps."""
+        self.tmp = tempfile.mkdtemp()
+
+    def tearDown(self) -> None:
+        """Remove the on-disk maps."""
+        shutil.rmtree(self.tmp)
+
+    def make_maps(self) -> list:
+        """
+        :return: A list holding an empty map of every class with string
+                 keys, hashed with hash_function_2
+        """
+        function = hash_function_2
+        maps = [SCHashMap(11, function),
+                SCIncrementalHashMap(11, function, migration_step=2),
+                SCCompactHashMap(11, function),
+                ConcurrentHashMap(11, function),
+                Cache(256, function=function),
+                OAHashMap(11, function),
+                OAIncrementalHashMap(11, function, migration_step=2),
+                OACompactHashMap(11, function),
+                RobinHoodHashMap(11, function),
+                CuckooHashMap(11, function),
+                SwissHashMap(11, function),
+                DiskHashMap(os.path.join(self.tmp, 'disk'), 11, 'crc32')]
+        self.addCleanup(maps[-1].close)
+        return maps
+
+
+class TestStats(MapTestCase):
+    """get_stats on every map class."""
+
+    def test_get_stats(self) -> None:
+        for hash_map in self.make_maps():
+            with self.subTest(cls=type(hash_map).__name__):
+                for i in range(40):
+                    hash_map.put('key' + str(i), i)
+
+                stats = hash_map.get_stats()
+                self.assertEqual(stats['size'], 40)
+                self.assertEqual(stats['capacity'], hash_map.get_capacity())
+
+    def test_records_operations(self) -> None:
+        for hash_map in self.make_maps():
+            with self.subTest(cls=type(hash_map).__name__):
+                hash_map.enable_stats()
+                for i in range(40):
+                    hash_map.put('key' + str(i), i)
+                hash_map.get('key1')
+                hash_map.contains_key('miss')
+                hash_map.remove('key2')
+                hash_map.resize_table(500)
+
+                stats = hash_map.get_stats()
+                self.assertEqual(stats['operations']['put']['count'], 40)
+                for op in ('get', 'contains_key', 'remove'):
+                    self.assertEqual(stats['operations'][op]['count'], 1)
+                self.assertGreaterEqual(stats['resizes'], 1)
+
+    def test_records_batches(self) -> None:
+        for hash_map in self.make_maps():
+            with self.subTest(cls=type(hash_map).__name__):
+                hash_map.enable_stats()
+                hash_map.put_many(('key' + str(i), i) for i in range(40))
+                hash_map.get_many(['key1', 'miss'])
+                hash_map.remove_many(['key2', 'key3', 'miss'])
+
+                operations = hash_map.get_stats()['operations']
+                self.assertEqual(operations['put']['count'], 40)
+                self.assertEqual(operations['get']['count'], 2)
+                self.assertEqual(operations['remove']['count'], 3)
+
+    def test_cache_records_operations(self) -> None:
+        cache = Cache(4)
+        cache.enable_stats()
+        cache.put('a', 1)
+        cache.get('a')
+        cache.increment('a')
+        cache.remove('a')
+        cache.resize_table(20)
+
+        stats = cache.get_stats()
+        self.assertEqual(sorted(stats['operations']),
+                         ['get', 'increment', 'put', 'remove'])
+        self.assertEqual(stats['resizes'], 1)
+
+    @unittest.skipIf(IntHashMap is None, "NumPy is not installed")
+    def test_get_stats_int_keys(self) -> None:
+        hash_map = IntHashMap(11)
+        for i in range(40):
+            hash_map.put(i, i)
+
+        self.assertEqual(hash_map.get_stats()['size'], 40)
+        with self.assertRaises(NotImplementedError):
+            hash_map.enable_stats()
+
+
+class TestBloom(MapTestCase):
+    """enable_bloom on every map class."""
+
+    def test_enable_bloom(self) -> None:
+        for hash_map in self.make_maps():
+            with self.subTest(cls=type(hash_map).__name__):
+                if type(hash_map) not in BLOOM_MAPS:
+                    with self.assertRaises(NotImplementedError):
+                        hash_map.enable_bloom()
+                    continue
+
+                hash_map.enable_bloom()
+                for i in range(200):
+                    hash_map.put('key' + str(i), i)
+                for i in range(0, 200, 2):
+                    hash_map.remove('key' + str(i))
+
+                for i in range(200):
+                    self.assertEqual(hash_map.contains_key('key' + str(i)),
+                                     i % 2 == 1)
+                    self.assertIsNone(hash_map.get('miss' + str(i)))
+                self.assertEqual(hash_map.get_stats()['bloom']['size'], 100)
+
+    @unittest.skipIf(IntHashMap is None, "NumPy is not installed")
+    def test_enable_bloom_int_keys(self) -> None:
+        with self.assertRaises(NotImplementedError):
+            IntHashMap(11).enable_bloom()
+
+    def test_bloom_during_incremental_resize(self) -> None:
+        for cls in (SCIncrementalHashMap, OAIncrementalHashMap):
+            with self.subTest(cls=cls.__name__):
+                hash_map = cls(11, hash_function_2, migration_step=1)
+                hash_map.enable_bloom()
+                for i in range(100):
+                    hash_map.put('key' + str(i), i)
+
+                # Remove keys from both arrays while a resize is running
+                hash_map.resize_table(1000)
+                self.assertTrue(hash_map.is_resizing())
+                for i in range(0, 100, 2):
+                    hash_map.remove('key' + str(i))
+                    self.assertFalse(hash_map.contains_key('key' + str(i)))
+                    self.assertTrue(hash_map.contains_key(
+                        'key' + str(i + 1)))
+
+                # The new array's filter covers every key once migrated
+                while hash_map.is_resizing():
+                    hash_map.get('key1')
+                self.assertEqual(hash_map.get_stats()['bloom']['size'], 50)
+
+
+class TestSnapshots(MapTestCase):
+    """dump and load on every map class."""
+
+    def test_round_trip(self) -> None:
+        path = os.path.join(self.tmp, 'snapshot')
+
+        for hash_map in self.make_maps():
+            cls = type(hash_map)
+            with self.subTest(cls=cls.__name__):
+                if cls is DiskHashMap:
+                    continue
+
+                for i in range(100):
+                    hash_map.put('key' + str(i), i)
+                for i in range(0, 100, 3):
+                    hash_map.remove('key' + str(i))
+
+                hash_map.dump(path)
+                loaded = cls.load(path)
+
+                self.assertIs(type(loaded), cls)
+                self.assertEqual(loaded.get_size(), hash_map.get_size())
+                self.assertEqual(sorted(loaded.items()),
+                                 sorted(hash_map.items()))
+                for i in range(100):
+                    self.assertEqual(loaded.contains_key('key' + str(i)),
+                                     i % 3 != 0)
+
+    def test_cache_keeps_eviction_order(self) -> None:
+        path = os.path.join(self.tmp, 'snapshot')
+        cache = Cache(4, 'lru')
+        for key in 'abcd':
+            cache.put(key, key.upper())
+        cache.get('a')
+        cache.dump(path)
+
+        # b is now the least recently used entry, so it goes first
+        loaded = Cache.load(path, maxsize=4)
+        loaded.put('e', 'E')
+        self.assertEqual(sorted(loaded.keys()), ['a', 'c', 'd', 'e'])
+
+    def test_robin_hood_loads_other_layouts(self) -> None:
+        path = os.path.join(self.tmp, 'snapshot')
+        hash_map = OAHashMap(11, hash_function_2, probe=linear_probe)
+        for i in range(100):
+            hash_map.put('key' + str(i), i)
+        hash_map.dump(path)
+
+        loaded = RobinHoodHashMap.load(path)
+        for i in range(100):
+            self.assertEqual(loaded.get('key' + str(i)), i)
+
+    def test_compact_loads_pow2(self) -> None:
+        path = os.path.join(self.tmp, 'snapshot')
+        hash_map = OAHashMap(16, 'crc32', capacity_policy='pow2')
+        for i in range(100):
+            hash_map.put('key' + str(i), i)
+        for i in range(0, 100, 3):
+            hash_map.remove('key' + str(i))
+        hash_map.dump(path)
+
+        loaded = OACompactHashMap.load(path)
+        self.assertEqual(sorted(loaded.items()), sorted(hash_map.items()))
+        for i in range(100):
+            self.assertEqual(loaded.get('key' + str(i)),
+                             None if i % 3 == 0 else i)
+
+        with self.assertRaises(ValueError):
+            OACompactHashMap(11, 'crc32', probe=triangular_probe)
+
+    def test_cuckoo_any_function(self) -> None:
+        path = os.path.join(self.tmp, 'snapshot')
+        hash_map = CuckooHashMap(11, lambda key: len(key))
+        for i in range(100):
+            hash_map.put('key' + str(i), i)
+        hash_map.dump(path)
+
+        loaded = CuckooHashMap.load(path)
+        self.assertEqual(sorted(loaded.items()), sorted(hash_map.items()))
+
+    def test_unsupported(self) -> None:
+        path = os.path.join(self.tmp, 'snapshot')
+        hash_map = self.make_maps()[-1]
+
+        with self.assertRaises(NotImplementedError):
+            hash_map.dump(path)
+        with self.assertRaises(NotImplementedError):
+            DiskHashMap.load(path)
+
+    @unittest.skipIf(IntHashMap is None, "NumPy is not installed")
+    def test_unsupported_int_keys(self) -> None:
+        path = os.path.join(self.tmp, 'snapshot')
+
+        with self.assertRaises(NotImplementedError):
+            IntHashMap(11).dump(path)
+        with self.assertRaises(NotImplementedError):
+            IntHashMap.load(path)
+
+
+class TestProbes(unittest.TestCase):
+    """Probe strategies and the capacity policies they need."""
+
+    def test_pow2_triangular(self) -> None:
+        hash_map = OAHashMap(16, 'crc32', probe=triangular_probe,
+                             capacity_policy='pow2')
+        for i in range(300):
+            hash_map.put('key' + str(i), i)
+        for i in range(0, 300, 2):
+            hash_map.remove('key' + str(i))
+        hash_map.resize_table(4000)
+
+        self.assertEqual(hash_map.get_capacity(), 4096)
+        self.assertEqual(hash_map.get_size(), 150)
+        for i in range(300):
+            self.assertEqual(hash_map.get('key' + str(i)),
+                             i if i % 2 else None)
+
+    def test_mismatched_probe(self) -> None:
+        with self.assertRaises(ValueError):
+            OAHashMap(11, 'crc32', probe=triangular_probe)
+
+    def test_exhausted_probe(self) -> None:
+        # A probe that never leaves the home bucket cannot place a collision
+        def stuck(hashPos: int, offset: int, capacity: int) -> int:
+            return hashPos
+
+        pairs = [('key' + str(i), i) for i in range(20)]
+        with self.assertRaises(RuntimeError):
+            OAHashMap(2, 'crc32', probe=stuck).put_many(pairs)
+
+        hash_map = OAHashMap(2, 'crc32', probe=stuck)
+        with self.assertRaises(RuntimeError):
+            for key, value in pairs:
+                hash_map.put(key, value)
+
+
+class TestShardedClose(unittest.TestCase):
+    """ShardedHashMap.close with workers that cannot answer."""
+
+    def test_dead_worker(self) -> None:
+        hash_map = hash_map_sharded.ShardedHashMap(2)
+        workers = list(hash_map._workers)
+        workers[0].kill()
+        workers[0].join()
+
+        hash_map.close()
+        self.assertFalse(any(worker.is_alive() for worker in workers))
+
+    @unittest.skipUnless(hasattr(signal, 'SIGSTOP'), "needs SIGSTOP")
+    def test_stuck_worker(self) -> None:
+        hash_map = hash_map_sharded.ShardedHashMap(2)
+        workers = list(hash_map._workers)
+        os.kill(workers[0].pid, signal.SIGSTOP)
+
+        with mock.patch.object(hash_map_sharded, 'CLOSE_TIMEOUT', 0.2):
+            hash_map.close()
+        self.assertFalse(any(worker.is_alive() for worker in workers))
+
+
+if __name__ == "__main__":
+    unittest.main()